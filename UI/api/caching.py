@@ -0,0 +1,121 @@
+"""Conditional GET (ETag / 304) and a short-lived response cache for the chart API.
+
+The validator of a city is the `observation_time` of its latest observation
+(a covered, indexed lookup), combined with the route parameters and the
+aligned start of the route's window, so an ETag changes as soon as a new
+observation is written or the window slides onto a new bucket.
+
+`ResponseCache` keeps rendered bodies per (route, city, params, format,
+encoding) for UI_RESPONSE_CACHE_TTL_SECONDS. An entry is only served while its ETag still
+matches the current validator, so writes from other processes (the gRPC
+server) invalidate it on the next request; `invalidate(city)` drops a
+city's entries immediately for in-process writers.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Tuple
+
+from fastapi import Request, Response
+
+from core.settings import settings
+from UI.api.encoding import MEDIA_TYPES, compress, encode, negotiate_encoding
+
+CacheKey = Tuple[Hashable, ...]  # (route, city or tuple of cities, *params)
+
+
+class ResponseCache:
+    """TTL + LRU cache of rendered responses (any value, e.g. body + encoding) tagged with their ETag."""
+
+    def __init__(self, ttl: float | None = None, max_entries: int | None = None, *, clock: Callable[[], float] = time.monotonic):
+        self._ttl = settings.UI_RESPONSE_CACHE_TTL_SECONDS if ttl is None else ttl
+        self._max_entries = max(1, max_entries or settings.UI_RESPONSE_CACHE_MAX_ENTRIES)
+        self._clock = clock
+        self._lock = threading.Lock()
+        # key -> (expires_at, etag, value)
+        self._entries: "OrderedDict[CacheKey, Tuple[float, str, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: CacheKey, etag: str) -> Any | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= self._clock() or entry[1] != etag:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, key: CacheKey, etag: str, value: Any) -> None:
+        if self._ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (self._clock() + self._ttl, etag, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, city: str) -> None:
+        """Drop every cached response of a city, including multi-city ones (new observation written)."""
+        with self._lock:
+            for key in [k for k in self._entries if k[1] == city or (isinstance(k[1], tuple) and city in k[1])]:
+                del self._entries[key]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+def make_etag(key: CacheKey, validator: Any) -> str:
+    digest = hashlib.sha1(repr((key, validator)).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = {tag.strip() for tag in header.split(",")}
+    # Weak comparison: W/"x" and "x" match
+    return "*" in candidates or etag in candidates or etag.removeprefix("W/") in candidates
+
+
+async def latest_observation_time(repo, city: str | List[str]) -> datetime | None:
+    doc = await repo.get_latest_observation(city, fields=("observation_time",))
+    return doc.get("observation_time") if doc else None
+
+
+async def conditional_response(
+    request: Request,
+    cache: ResponseCache,
+    key: CacheKey,
+    validator: Any,
+    build: Callable[[], Awaitable[Any]],
+    fmt: str = "json",
+) -> Response:
+    """Answer 304 if the client's ETag is current, else serve the cached or freshly built body.
+
+    The representation (`fmt`, see `UI.api.encoding`) and the negotiated
+    compression are part of the cache key and ETag. `build` may raise
+    `HTTPException` (e.g. 404); errors are not cached.
+    """
+    encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+    key = key + (fmt, encoding)
+    etag = make_etag(key, validator)
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    cached = cache.get(key, etag)
+    if cached is None:
+        cached = compress(encode(await build(), fmt), encoding)
+        cache.put(key, etag, cached)
+    body, content_encoding = cached
+    if content_encoding:
+        headers["Content-Encoding"] = content_encoding
+    return Response(content=body, media_type=MEDIA_TYPES[fmt], headers=headers)
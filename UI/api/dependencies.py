@@ -0,0 +1,56 @@
+"""FastAPI dependencies shared by the chart API routers.
+
+The async repository wraps the process-wide Motor client from `db.clients`;
+both are created lazily on the first request (not at import time, and inside
+the serving event loop) and the client is closed by the app lifespan
+(`UI.chart_api.lifespan`). Dependencies are `async def` so FastAPI runs
+them on the event loop instead of its threadpool.
+"""
+
+from __future__ import annotations
+
+from fastapi import Depends, Request
+
+from db.async_mongo_repository import AsyncMongoRepository
+from db.clients import get_async_client
+from UI.api.caching import ResponseCache
+from UI.services.current_weather_service import CurrentWeatherService
+from UI.services.live_feed import LiveFeedHub
+from UI.services.weather_series_service import WeatherSeriesService
+
+
+async def get_repository(request: Request) -> AsyncMongoRepository:
+    state = request.app.state
+    repo = getattr(state, "repo", None)
+    if repo is None:
+        repo = state.repo = AsyncMongoRepository(client=get_async_client())
+    return repo
+
+
+async def get_series_service(repo: AsyncMongoRepository = Depends(get_repository)) -> WeatherSeriesService:
+    return WeatherSeriesService(repo)
+
+
+async def get_current_service(repo: AsyncMongoRepository = Depends(get_repository)) -> CurrentWeatherService:
+    return CurrentWeatherService(repo)
+
+
+async def get_response_cache(request: Request) -> ResponseCache:
+    state = request.app.state
+    cache = getattr(state, "response_cache", None)
+    if cache is None:
+        cache = state.response_cache = ResponseCache()
+    return cache
+
+
+async def get_live_feed(
+    request: Request,
+    repo: AsyncMongoRepository = Depends(get_repository),
+    cache: ResponseCache = Depends(get_response_cache),
+) -> LiveFeedHub:
+    state = request.app.state
+    hub = getattr(state, "live_feed", None)
+    if hub is None:
+        # New observations also drop the city's cached API responses
+        hub = state.live_feed = LiveFeedHub(repo, on_change=cache.invalidate)
+    return hub
@@ -0,0 +1,70 @@
+"""Response representations and compression for the chart API.
+
+`format=json` is the regular per-point response. `format=columnar` returns
+parallel arrays (epoch-second timestamps, temperatures, dictionary-encoded
+icons, see `SeriesArrays.to_columns`), and `format=msgpack` the same columns
+as MessagePack. Bodies are compressed with brotli or gzip according
+to `Accept-Encoding`; msgpack and brotli are optional dependencies
+(`pip install msgpack brotli`), used only when installed.
+"""
+
+from __future__ import annotations
+
+import gzip
+from typing import Any, Tuple
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+
+from core.settings import settings
+
+try:  # optional dependency
+    import msgpack
+except ImportError:  # pragma: no cover - exercised when msgpack is not installed
+    msgpack = None
+
+try:  # optional dependency
+    import brotli
+except ImportError:  # pragma: no cover - exercised when brotli is not installed
+    brotli = None
+
+FORMATS = ("json", "columnar", "msgpack")
+MEDIA_TYPES = {"json": "application/json", "columnar": "application/json", "msgpack": "application/msgpack"}
+
+
+def encode(payload: Any, fmt: str) -> bytes:
+    if fmt == "msgpack":
+        if msgpack is None:
+            raise HTTPException(status_code=406, detail="format=msgpack requires the optional 'msgpack' package")
+        return msgpack.packb(payload, use_bin_type=True)
+    return JSONResponse(content=payload).body
+
+
+def negotiate_encoding(accept_encoding: str | None) -> str | None:
+    """Pick `br` (if brotli is installed) or `gzip` from an Accept-Encoding header."""
+    offered = {}
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            offered[name.lower()] = quality
+    for name in ("br", "gzip"):
+        if name == "br" and brotli is None:
+            continue
+        if offered.get(name, offered.get("*", 0.0)) > 0:
+            return name
+    return None
+
+
+def compress(body: bytes, encoding: str | None) -> Tuple[bytes, str | None]:
+    """Compress `body` with the negotiated encoding; small bodies are sent as-is."""
+    if encoding is None or len(body) < settings.UI_COMPRESS_MIN_BYTES:
+        return body, None
+    if encoding == "br":
+        return brotli.compress(body, quality=5), "br"
+    return gzip.compress(body, compresslevel=6), "gzip"
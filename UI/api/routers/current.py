@@ -1,18 +1,26 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, HTTPException, Query
-from core.settings import settings
-from db.mongo_repository import MongoRepository
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from db.async_mongo_repository import AsyncMongoRepository
+from UI.api.caching import ResponseCache, conditional_response, latest_observation_time
+from UI.api.dependencies import get_current_service, get_repository, get_response_cache
 from UI.services.current_weather_service import CurrentWeatherService
 
-repo = MongoRepository(settings.MONGO_URI)
-service = CurrentWeatherService(repo)
-
 router = APIRouter(prefix="/api", tags=["current"])
 
 @router.get("/current")
-def get_current(city: str = Query(..., min_length=1)):
-    data = service.get_current(city)
-    if not data:
-        raise HTTPException(status_code=404, detail="No current observation for city")
-    return data
+async def get_current(
+    request: Request,
+    city: str = Query(..., min_length=1),
+    service: CurrentWeatherService = Depends(get_current_service),
+    repo: AsyncMongoRepository = Depends(get_repository),
+    cache: ResponseCache = Depends(get_response_cache),
+):
+    async def build():
+        data = await service.get_current(city)
+        if not data:
+            raise HTTPException(status_code=404, detail="No current observation for city")
+        return data
+
+    validator = await latest_observation_time(repo, city)
+    return await conditional_response(request, cache, ("current", city), validator, build)
@@ -1,25 +1,41 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, HTTPException, Query
-from db.mongo_repository import MongoRepository
-from core.settings import settings
-from UI.services.weather_series_service import WeatherSeriesService
+from datetime import datetime
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
-repo = MongoRepository(settings.MONGO_URI)
-service = WeatherSeriesService(repo)
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from db.async_mongo_repository import AsyncMongoRepository
+from UI.api.caching import ResponseCache, conditional_response, latest_observation_time
+from UI.api.dependencies import get_repository, get_response_cache, get_series_service
+from UI.services.weather_series_service import WeatherSeriesService
 
 router = APIRouter(prefix="/api", tags=["daily"])
 
 @router.get("/daily")
-def get_daily(
+async def get_daily(
+    request: Request,
     city: str = Query(..., min_length=1),
     days: int = Query(7, ge=1, le=60),
+    tz: str = Query("UTC", description="IANA timezone whose calendar days are grouped, e.g. Europe/Oslo"),
+    service: WeatherSeriesService = Depends(get_series_service),
+    repo: AsyncMongoRepository = Depends(get_repository),
+    cache: ResponseCache = Depends(get_response_cache),
 ):
-    points = service.get_daily_series(city, days)
-    if not points:
-        raise HTTPException(status_code=404, detail="No daily data for city")
-    return {
-        "city": city,
-        "points": [p.as_response() for p in points],
-        "window_days": days,
-    }
+    try:
+        zone = ZoneInfo(tz)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise HTTPException(status_code=422, detail=f"Unknown timezone: {tz}")
+
+    async def build():
+        points = await service.get_daily_series(city, days, tz=tz)
+        if not points:
+            raise HTTPException(status_code=404, detail="No daily data for city")
+        return {
+            "city": city,
+            "points": [p.as_response() for p in points],
+            "window_days": days,
+            "tz": tz,
+        }
+
+    validator = (await latest_observation_time(repo, city), datetime.now(zone).date())
+    return await conditional_response(request, cache, ("daily", city, days, tz), validator, build)
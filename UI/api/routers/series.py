@@ -1,27 +1,81 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, HTTPException, Query
-from db.mongo_repository import MongoRepository
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from core.settings import settings
-from UI.services.weather_series_service import WeatherSeriesService
-
-repo = MongoRepository(settings.MONGO_URI)
-service = WeatherSeriesService(repo)
+from db.async_mongo_repository import AsyncMongoRepository
+from UI.api.caching import ResponseCache, conditional_response, latest_observation_time
+from UI.api.dependencies import get_repository, get_response_cache, get_series_service
+from UI.services.downsampling import downsample as downsample_series
+from UI.services.series_arrays import align_series, iso_timestamps
+from UI.services.weather_series_service import WeatherSeriesService, series_window
 
 router = APIRouter(prefix="/api", tags=["series"])
 
 @router.get("/series")
-def get_series(
+async def get_series(
+    request: Request,
     city: str = Query(..., min_length=1),
-    minutes: int = Query(60, ge=1, le=1440),
-    bucket: int = Query(5, ge=1, le=60),
+    minutes: int = Query(60, ge=1, le=settings.UI_SERIES_MAX_MINUTES),
+    bucket: int = Query(5, ge=1, le=10080, description="Bucket size in minutes (e.g. 5, 60, 1440)"),
+    max_points: int | None = Query(None, ge=4, le=20000, description="Downsample to at most this many points"),
+    downsample: str = Query("lttb", pattern="^(lttb|minmax)$", description="lttb | minmax"),
+    format: str = Query("json", pattern="^(json|columnar|msgpack)$", description="json | columnar | msgpack"),
+    service: WeatherSeriesService = Depends(get_series_service),
+    repo: AsyncMongoRepository = Depends(get_repository),
+    cache: ResponseCache = Depends(get_response_cache),
+):
+    # Long windows are always bounded by the default point budget
+    limit = max_points or settings.UI_SERIES_MAX_POINTS
+
+    async def build():
+        # Both representations are rendered from columns, without per-point models
+        arrays = await service.get_series_arrays(city, minutes, bucket)
+        if not len(arrays):
+            raise HTTPException(status_code=404, detail="No data for city/time range")
+        source_points = len(arrays)
+        arrays = downsample_series(arrays, limit, downsample)
+        meta = {"bucket_minutes": bucket, "window_minutes": minutes, "source_points": source_points}
+        if len(arrays) < source_points:
+            meta["downsample"] = downsample
+        if format != "json":
+            return {"city": city, **meta, **arrays.to_columns()}
+        return {"city": city, "points": arrays.to_points(), **meta}
+
+    # Changes with a new observation or when the window start moves to the next 5-minute boundary
+    validator = (await latest_observation_time(repo, city), series_window(minutes)[0])
+    return await conditional_response(request, cache, ("series", city, minutes, bucket, limit, downsample), validator, build, fmt=format)
+
+
+@router.get("/series/multi")
+async def get_series_multi(
+    request: Request,
+    cities: str = Query(..., min_length=1, description="Comma-separated city names"),
+    minutes: int = Query(60, ge=1, le=settings.UI_SERIES_MAX_MINUTES),
+    bucket: int = Query(5, ge=1, le=10080, description="Bucket size in minutes (e.g. 5, 60, 1440)"),
+    format: str = Query("json", pattern="^(json|columnar|msgpack)$", description="json | columnar | msgpack"),
+    service: WeatherSeriesService = Depends(get_series_service),
+    repo: AsyncMongoRepository = Depends(get_repository),
+    cache: ResponseCache = Depends(get_response_cache),
 ):
-    points = service.get_bucketed_series(city, minutes, bucket)
-    if not points:
-        raise HTTPException(status_code=404, detail="No data for city/time range")
-    return {
-        "city": city,
-        "points": [p.as_response() for p in points],
-        "bucket_minutes": bucket,
-        "window_minutes": minutes,
-    }
+    names = tuple(dict.fromkeys(c.strip() for c in cities.split(",") if c.strip()))
+    if not names:
+        raise HTTPException(status_code=422, detail="No cities given")
+    if len(names) > settings.UI_SERIES_MAX_CITIES:
+        raise HTTPException(status_code=422, detail=f"At most {settings.UI_SERIES_MAX_CITIES} cities per request")
+
+    async def build():
+        series = await service.get_multi_series_arrays(list(names), minutes, bucket)
+        if not any(len(arrays) for arrays in series.values()):
+            raise HTTPException(status_code=404, detail="No data for cities/time range")
+        axis, aligned = align_series(series)
+        return {
+            "cities": list(names),
+            "timestamps": iso_timestamps(axis) if format == "json" else axis,
+            "series": aligned,
+            "bucket_minutes": bucket,
+            "window_minutes": minutes,
+        }
+
+    # Latest observation across all requested cities (one indexed lookup)
+    validator = (await latest_observation_time(repo, list(names)), series_window(minutes)[0])
+    return await conditional_response(request, cache, ("series_multi", names, minutes, bucket), validator, build, fmt=format)
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+from core.settings import settings
+from UI.api.dependencies import get_live_feed
+from UI.services.live_feed import LiveFeedHub
+
+router = APIRouter(prefix="/api", tags=["stream"])
+
+@router.get("/stream")
+async def stream(
+    request: Request,
+    city: str = Query(..., min_length=1),
+    hub: LiveFeedHub = Depends(get_live_feed),
+):
+    """Server-Sent Events: `observation` and `current` events for new observations of `city`."""
+    async def events():
+        queue = hub.subscribe(city)
+        try:
+            yield f"retry: {int(settings.UI_STREAM_RETRY_MS)}\n\n"
+            while True:
+                try:
+                    name, payload = await asyncio.wait_for(queue.get(), settings.UI_STREAM_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: {name}\ndata: {json.dumps(payload)}\n\n"
+        finally:
+            hub.unsubscribe(city, queue)
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(events(), media_type="text/event-stream", headers=headers)
@@ -3,6 +3,7 @@ Matches requirement: provide UI chart of temperature fluctuations over time.
 
 Endpoint:
   GET /api/series?city=London&minutes=60&bucket=5
+  GET /api/stream?city=London  (Server-Sent Events for new observations)
 Returns JSON: {"city": "London", "points": [{"timestamp": "2025-11-17T10:00:00Z", "avg_temp_c": 12.3}, ...]}
 
 To run:
@@ -10,19 +11,37 @@ To run:
 
 Static UI (index.html) will fetch this endpoint and render a chart.
 """
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.responses import FileResponse, JSONResponse
 from pathlib import Path
 import logging
 from core.settings import settings
+from db.clients import close_async_client
 
 from UI.api.routers.series import router as series_router
 from UI.api.routers.daily import router as daily_router
 from UI.api.routers.current import router as current_router
+from UI.api.routers.stream import router as stream_router
 
 settings.configure_logging()
 logger = logging.getLogger("ui.chart")
-app = FastAPI(title="Weather Chart API", version="1.0.0")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+  # The shared Mongo client is created lazily by UI.api.dependencies on first use
+  yield
+  live_feed = getattr(app.state, "live_feed", None)
+  if live_feed is not None:
+    await live_feed.stop()
+    app.state.live_feed = None
+  app.state.repo = None
+  close_async_client()
+  logger.info("Closed shared Mongo client")
+
+
+app = FastAPI(title="Weather Chart API", version="1.0.0", lifespan=lifespan)
 
 STATIC_DIR = Path(__file__).parent / 'static'
 INDEX_FILE = STATIC_DIR / 'index.html'
@@ -38,3 +57,4 @@ def root():
 app.include_router(series_router)
 app.include_router(daily_router)
 app.include_router(current_router)
+app.include_router(stream_router)
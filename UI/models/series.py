@@ -19,7 +19,7 @@ class SeriesPoint(BaseModel):
         }
 
 class DailyPoint(BaseModel):
-    date: str = Field(description="ISO date YYYY-MM-DD (UTC day)")
+    date: str = Field(description="ISO date YYYY-MM-DD (calendar day in the requested timezone, UTC by default)")
     avg_temp_c: float = Field(description="Average temperature in Celsius for the day")
     icon: Optional[str] = Field(default=None, description="Representative weather icon code for the day")
 
@@ -3,17 +3,26 @@ from __future__ import annotations
 from typing import Any, Dict
 from datetime import datetime
 
-from db.mongo_repository import MongoRepository
+from db.async_mongo_repository import AsyncMongoRepository
+
+# Only fields read by `get_current`
+CURRENT_FIELDS = ("city", "observation_time", "raw")
+
 
 class CurrentWeatherService:
     """Provide transformation of latest observation into enriched response structure."""
-    def __init__(self, repo: MongoRepository):
+    def __init__(self, repo: AsyncMongoRepository):
         self.repo = repo
 
-    def get_current(self, city: str) -> Dict[str, Any] | None:
-        doc = self.repo.get_latest_observation(city)
+    async def get_current(self, city: str) -> Dict[str, Any] | None:
+        doc = await self.repo.get_latest_observation(city, fields=CURRENT_FIELDS)
         if not doc:
             return None
+        return self.from_observation(doc, city)
+
+    @staticmethod
+    def from_observation(doc: Dict[str, Any], city: str) -> Dict[str, Any]:
+        """Build the `/api/current` payload from an observation document."""
         raw: Dict[str, Any] = doc.get("raw", {}) if isinstance(doc.get("raw"), dict) else {}
         main = raw.get("main", {})
         wind = raw.get("wind", {})
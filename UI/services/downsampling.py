@@ -0,0 +1,83 @@
+"""Visually faithful downsampling of long temperature series.
+
+Both algorithms return the sorted indices of the points to keep, always
+including the first and last point, so `SeriesArrays.take` can subset every
+column consistently:
+
+  - `lttb_indices`: Largest-Triangle-Three-Buckets (Steinarsson, 2013); keeps
+    the point of each bucket forming the largest triangle with its neighbours,
+    which preserves the shape of the line.
+  - `minmax_indices`: the minimum and maximum of each bucket (one bucket per
+    two output points, i.e. per pixel column), which preserves every peak.
+
+Like `UI.services.series_arrays`, the inner loops use NumPy when installed.
+"""
+
+from __future__ import annotations
+
+from typing import List, Sequence
+
+from UI.services.series_arrays import SeriesArrays, np
+
+METHODS = ("lttb", "minmax")
+
+
+def _bucket_edges(start: int, stop: int, buckets: int) -> List[int]:
+    """Split the index range [start, stop) into `buckets` nearly equal slices."""
+    size = (stop - start) / buckets
+    return [start + int(i * size) for i in range(buckets)] + [stop]
+
+
+def lttb_indices(x: Sequence[float], y: Sequence[float], threshold: int) -> List[int]:
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return list(range(n))
+    if np is not None:
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+    # First and last points are kept; the rest is split into threshold - 2 buckets
+    edges = _bucket_edges(1, n - 1, threshold - 2)
+    keep = [0]
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Average of the next bucket (or the last point) is the third triangle vertex
+        nlo, nhi = (edges[i + 1], edges[i + 2]) if i + 2 < len(edges) else (n - 1, n)
+        if np is not None:
+            cx, cy = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+            areas = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+            a = lo + int(areas.argmax())
+        else:
+            cx = sum(x[nlo:nhi]) / (nhi - nlo)
+            cy = sum(y[nlo:nhi]) / (nhi - nlo)
+            ax, ay = x[a], y[a]
+            a = max(range(lo, hi), key=lambda j: abs((ax - cx) * (y[j] - ay) - (ax - x[j]) * (cy - ay)))
+        keep.append(a)
+    keep.append(n - 1)
+    return keep
+
+
+def minmax_indices(y: Sequence[float], max_points: int) -> List[int]:
+    n = len(y)
+    if max_points >= n or max_points < 4:
+        return list(range(n))
+    if np is not None:
+        y = np.asarray(y, dtype=np.float64)
+    edges = _bucket_edges(1, n - 1, (max_points - 2) // 2)
+    keep = {0, n - 1}
+    for lo, hi in zip(edges, edges[1:]):
+        if np is not None:
+            keep.update((lo + int(y[lo:hi].argmin()), lo + int(y[lo:hi].argmax())))
+        else:
+            window = range(lo, hi)
+            keep.update((min(window, key=y.__getitem__), max(window, key=y.__getitem__)))
+    return sorted(keep)
+
+
+def downsample(arrays: SeriesArrays, max_points: int, method: str = "lttb") -> SeriesArrays:
+    """Reduce `arrays` to at most `max_points` points (no-op for shorter series)."""
+    if len(arrays) <= max_points:
+        return arrays
+    if method == "minmax":
+        return arrays.take(minmax_indices(arrays.avg_temp, max_points))
+    return arrays.take(lttb_indices(arrays.timestamps, arrays.avg_temp, max_points))
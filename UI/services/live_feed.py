@@ -0,0 +1,135 @@
+"""Shared per-city live feed behind the `/api/stream` SSE endpoint.
+
+`LiveFeedHub` runs at most one watcher task per city, however many browsers
+are connected to it. A watcher follows a MongoDB change stream of inserts for
+its city and falls back to polling the latest `observation_time` every
+UI_STREAM_POLL_SECONDS when change streams are unavailable (standalone
+server, time-series collection) or disabled. Each new observation is turned
+into an `observation` event (the new series point) and a `current` event
+(the `/api/current` payload) and fanned out to every subscriber queue; slow
+subscribers drop their oldest events. The watcher stops with its last
+subscriber.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Tuple
+
+from core.settings import settings
+from UI.services.current_weather_service import CurrentWeatherService
+
+logger = logging.getLogger("ui.live_feed")
+
+Event = Tuple[str, Dict[str, Any]]  # (event name, JSON payload)
+
+
+def observation_events(doc: Dict[str, Any], city: str) -> List[Event]:
+    """Events published for one newly written observation."""
+    ts = doc.get("observation_time")
+    point = {
+        "city": city,
+        "timestamp": ts.isoformat() + "Z" if isinstance(ts, datetime) else None,
+        "temp_c": doc.get("temp_c"),
+        "icon": ((doc.get("raw") or {}).get("weather") or [{}])[0].get("icon") or doc.get("icon"),
+    }
+    return [("observation", point), ("current", CurrentWeatherService.from_observation(doc, city))]
+
+
+class _CityFeed:
+    def __init__(self, city: str):
+        self.city = city
+        self.subscribers: set = set()
+        self.task: asyncio.Task | None = None
+        self.mode = "starting"
+
+
+class LiveFeedHub:
+    """Fan-out of per-city observation watchers to SSE subscriber queues.
+
+    `on_change(city)` is called for every new observation (used to drop the
+    city's cached API responses).
+    """
+
+    def __init__(self, repo, *, on_change: Callable[[str], None] | None = None, poll_interval: float | None = None):
+        self._repo = repo
+        self._on_change = on_change
+        self._poll_interval = settings.UI_STREAM_POLL_SECONDS if poll_interval is None else poll_interval
+        self._feeds: Dict[str, _CityFeed] = {}
+        self.published = 0
+
+    def subscribe(self, city: str) -> asyncio.Queue:
+        """Register a subscriber queue for `city`, starting the city's watcher if needed."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=settings.UI_STREAM_QUEUE_SIZE)
+        feed = self._feeds.get(city)
+        if feed is None:
+            feed = self._feeds[city] = _CityFeed(city)
+            feed.task = asyncio.ensure_future(self._watch(feed))
+        feed.subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, city: str, queue: asyncio.Queue) -> None:
+        feed = self._feeds.get(city)
+        if feed is None:
+            return
+        feed.subscribers.discard(queue)
+        if not feed.subscribers:
+            del self._feeds[city]
+            feed.task.cancel()
+
+    def _publish(self, feed: _CityFeed, doc: Dict[str, Any]) -> None:
+        if self._on_change is not None:
+            self._on_change(feed.city)
+        for event in observation_events(doc, feed.city):
+            for queue in list(feed.subscribers):
+                if queue.full():
+                    queue.get_nowait()
+                queue.put_nowait(event)
+                self.published += 1
+
+    async def _watch(self, feed: _CityFeed) -> None:
+        if settings.UI_STREAM_CHANGE_STREAMS:
+            try:
+                feed.mode = "change_stream"
+                async for doc in self._repo.watch_observations(feed.city):
+                    self._publish(feed, doc)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.info("Change stream unavailable for %s (%s); polling every %.1fs", feed.city, e, self._poll_interval)
+        feed.mode = "polling"
+        await self._poll(feed)
+
+    async def _poll(self, feed: _CityFeed) -> None:
+        last: datetime | None = None
+        while True:
+            try:
+                latest = await self._repo.get_latest_observation(feed.city, fields=("observation_time",))
+                latest_ts = latest.get("observation_time") if latest else None
+                if latest_ts is not None and last is not None and latest_ts > last:
+                    for doc in await self._repo.get_observations(feed.city, last, latest_ts):
+                        if doc["observation_time"] > last:
+                            self._publish(feed, doc)
+                if latest_ts is not None:
+                    last = latest_ts if last is None else max(last, latest_ts)
+            except Exception as e:
+                logger.warning("Live feed poll failed for %s: %s", feed.city, e)
+            await asyncio.sleep(self._poll_interval)
+
+    async def stop(self) -> None:
+        """Cancel every watcher (app shutdown)."""
+        tasks = [feed.task for feed in self._feeds.values() if feed.task is not None]
+        self._feeds.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return watched cities (with their feed mode), subscriber count and published events."""
+        return {
+            "cities": {city: feed.mode for city, feed in self._feeds.items()},
+            "subscribers": sum(len(feed.subscribers) for feed in self._feeds.values()),
+            "published": self.published,
+        }
@@ -0,0 +1,192 @@
+"""Array-backed temperature series for the chart API.
+
+`SeriesArrays` holds a series as parallel columns (epoch-second bucket
+starts, average / min / max temperature, observation count, icon) instead of
+one `SeriesPoint` model per bucket. Client-side bucketing of raw
+observations (`bucket_observations`) and both response shapes (`to_points`,
+`to_columns`) are vectorized with NumPy when it is installed
+(`pip install numpy`); without it the same results are computed in plain
+Python, still without per-point models.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+from db import rollups
+
+try:  # optional dependency
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised when numpy is not installed
+    np = None
+
+ICON_URL_TEMPLATE = "https://openweathermap.org/img/wn/{icon}@2x.png"
+
+
+def epoch_seconds(ts: datetime) -> int:
+    # Repository datetimes are naive UTC
+    return int((ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc)).timestamp())
+
+
+# Bucket origin shared with the repository's `$dateTrunc` pipelines
+BUCKET_REFERENCE = epoch_seconds(rollups.BUCKET_REFERENCE)
+
+
+def bucket_start(seconds: int, bucket_minutes: int) -> int:
+    """Bucket start of an epoch-second timestamp, like `db.rollups.bucket_floor` / `$dateTrunc`."""
+    return seconds - (seconds - BUCKET_REFERENCE) % (bucket_minutes * 60)
+
+
+def iso_timestamps(seconds) -> List[str]:
+    """Epoch seconds as `SeriesPoint.as_response` timestamps (ISO 8601, `Z` suffix)."""
+    if np is not None:
+        return (np.datetime_as_string(np.asarray(seconds, dtype="datetime64[s]")) + "Z").tolist()
+    return [datetime.utcfromtimestamp(ts).isoformat() + "Z" for ts in seconds]
+
+
+class SeriesArrays:
+    """A bucketed series as parallel columns; `min_temp` / `max_temp` / `count` are None when unknown."""
+
+    def __init__(self, timestamps, avg_temp, icons: List[str | None], *, min_temp=None, max_temp=None, count=None):
+        self.timestamps = timestamps
+        self.avg_temp = avg_temp
+        self.icons = icons
+        self.min_temp = min_temp
+        self.max_temp = max_temp
+        self.count = count
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Dict[str, Any]]) -> "SeriesArrays":
+        """Wrap repository series rows (`timestamp`, `avg_temp_c`, `icon`)."""
+        timestamps = [epoch_seconds(row["timestamp"]) for row in rows]
+        temps = [float(row.get("avg_temp_c") or 0.0) for row in rows]
+        icons = [row.get("icon") for row in rows]
+        if np is not None:
+            return cls(np.asarray(timestamps, dtype=np.int64), np.asarray(temps, dtype=np.float64), icons)
+        return cls(timestamps, temps, icons)
+
+    def take(self, indices: Sequence[int]) -> "SeriesArrays":
+        """The points at `indices` (sorted), e.g. after downsampling."""
+        def pick(values):
+            if values is None:
+                return None
+            return values[np.asarray(indices, dtype=np.int64)] if np is not None else [values[i] for i in indices]
+
+        return SeriesArrays(
+            pick(self.timestamps), pick(self.avg_temp), [self.icons[i] for i in indices],
+            min_temp=pick(self.min_temp), max_temp=pick(self.max_temp), count=pick(self.count),
+        )
+
+    @staticmethod
+    def _list(values) -> list:
+        return np.asarray(values).tolist() if np is not None else list(values)
+
+    def _rounded(self, values) -> List[float]:
+        if np is None:
+            return [round(v, 2) for v in values]
+        values = np.asarray(values, dtype=np.float64)
+        rounded = np.round(values, 2)
+        # np.round scales by 100 first, so near-ties can differ from Python's correctly
+        # rounded `round` used by `SeriesPoint.as_response`; redo just those in Python
+        scaled = values * 100
+        ties = np.flatnonzero(np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6)
+        rounded[ties] = [round(v, 2) for v in values[ties].tolist()]
+        return rounded.tolist()
+
+    def to_rows(self) -> List[Dict[str, Any]]:
+        """Repository-shaped rows (naive UTC datetimes), e.g. for `SeriesPoint` models."""
+        return [
+            {"timestamp": datetime.utcfromtimestamp(ts), "avg_temp_c": temp, "icon": icon}
+            for ts, temp, icon in zip(self._list(self.timestamps), self._list(self.avg_temp), self.icons)
+        ]
+
+    def to_points(self) -> List[Dict[str, Any]]:
+        """Per-point dicts in the `SeriesPoint.as_response` shape."""
+        urls = {icon: ICON_URL_TEMPLATE.format(icon=icon) for icon in set(self.icons) if icon}
+        return [
+            {"timestamp": ts, "avg_temp_c": temp, "icon": icon, "icon_url": urls.get(icon)}
+            for ts, temp, icon in zip(iso_timestamps(self.timestamps), self._rounded(self.avg_temp), self.icons)
+        ]
+
+    def to_columns(self) -> Dict[str, Any]:
+        """Parallel arrays with dictionary-encoded icons; `icon_index` points into `icons` (None = no icon)."""
+        codes: Dict[str, int] = {}
+        icon_index = [None if icon is None else codes.setdefault(icon, len(codes)) for icon in self.icons]
+        columns: Dict[str, Any] = {
+            "timestamps": self._list(self.timestamps),
+            "avg_temp_c": self._rounded(self.avg_temp),
+        }
+        if self.min_temp is not None:
+            columns["min_temp_c"] = self._rounded(self.min_temp)
+            columns["max_temp_c"] = self._rounded(self.max_temp)
+            columns["count"] = self._list(self.count)
+        columns.update({"icons": list(codes), "icon_index": icon_index, "icon_url_template": ICON_URL_TEMPLATE})
+        return columns
+
+
+def bucket_observations(times: Iterable[int], temps: Iterable[float], bucket_minutes: int) -> SeriesArrays:
+    """Bucket raw observations (epoch seconds, sorted ascending) into avg / min / max / count columns."""
+    if np is not None:
+        ts = np.fromiter(times, dtype=np.int64)
+        values = np.fromiter(temps, dtype=np.float64, count=len(ts))
+        if not len(ts):
+            return SeriesArrays(ts, values, [], min_temp=values, max_temp=values, count=ts)
+        starts = ts - (ts - BUCKET_REFERENCE) % (bucket_minutes * 60)
+        # Sorted input: each bucket is a contiguous run
+        edges = np.flatnonzero(np.diff(starts)) + 1
+        offsets = np.concatenate(([0], edges))
+        counts = np.diff(np.append(offsets, len(ts)))
+        return SeriesArrays(
+            starts[offsets],
+            np.add.reduceat(values, offsets) / counts,
+            [None] * len(offsets),
+            min_temp=np.minimum.reduceat(values, offsets),
+            max_temp=np.maximum.reduceat(values, offsets),
+            count=counts,
+        )
+
+    starts: List[int] = []
+    sums: List[float] = []
+    mins: List[float] = []
+    maxs: List[float] = []
+    counts: List[int] = []
+    for ts, temp in zip(times, temps):
+        start = bucket_start(ts, bucket_minutes)
+        if starts and starts[-1] == start:
+            sums[-1] += temp
+            counts[-1] += 1
+            mins[-1] = min(mins[-1], temp)
+            maxs[-1] = max(maxs[-1], temp)
+        else:
+            starts.append(start)
+            sums.append(float(temp))
+            counts.append(1)
+            mins.append(temp)
+            maxs.append(temp)
+    return SeriesArrays(
+        starts, [s / c for s, c in zip(sums, counts)], [None] * len(starts), min_temp=mins, max_temp=maxs, count=counts
+    )
+
+
+def align_series(series: Dict[str, SeriesArrays]) -> Tuple[List[int], Dict[str, Dict[str, list]]]:
+    """Put several cities' series on one shared timestamp axis.
+
+    Returns the sorted union of bucket starts (epoch seconds) and, per city,
+    `avg_temp_c` / `icon` lists aligned to it (None where the city has no bucket).
+    """
+    axis = sorted({ts for arrays in series.values() for ts in SeriesArrays._list(arrays.timestamps)})
+    position = {ts: i for i, ts in enumerate(axis)}
+    aligned: Dict[str, Dict[str, list]] = {}
+    for city, arrays in series.items():
+        temps: List[float | None] = [None] * len(axis)
+        icons: List[str | None] = [None] * len(axis)
+        rounded = arrays._rounded(arrays.avg_temp)
+        for ts, temp, icon in zip(SeriesArrays._list(arrays.timestamps), rounded, arrays.icons):
+            temps[position[ts]] = temp
+            icons[position[ts]] = icon
+        aligned[city] = {"avg_temp_c": temps, "icon": icons}
+    return axis, aligned
@@ -1,44 +1,66 @@
 from __future__ import annotations
 
 from datetime import datetime, timedelta, timezone
-from typing import List
+from typing import Dict, List, Tuple
 
-from db.mongo_repository import MongoRepository
+from db.async_mongo_repository import AsyncMongoRepository
+from db.rollups import five_minute_start
 from UI.models.series import SeriesPoint, DailyPoint
+from UI.services.series_arrays import SeriesArrays, bucket_observations, epoch_seconds
+
+def series_window(minutes: int) -> Tuple[datetime, datetime]:
+    """Return the (start, end) UTC window of a series request ending now."""
+    end = datetime.utcnow().replace(tzinfo=timezone.utc)
+    # Start on a 5-minute boundary so aligned buckets can be served from rollups
+    return five_minute_start(end - timedelta(minutes=minutes)), end
+
 
 class WeatherSeriesService:
     """Application layer for producing temperature time series.
 
     Wraps repository queries and fallback logic, returning typed models.
     """
-    def __init__(self, repo: MongoRepository):
+    def __init__(self, repo: AsyncMongoRepository):
         self.repo = repo
 
-    def get_bucketed_series(self, city: str, minutes: int, bucket: int) -> List[SeriesPoint]:
-        end = datetime.utcnow().replace(tzinfo=timezone.utc)
-        start = end - timedelta(minutes=minutes)
+    async def get_series_arrays(self, city: str, minutes: int, bucket: int) -> SeriesArrays:
+        """Bucketed series as columns (see `UI.services.series_arrays`), without per-point models."""
+        start, end = series_window(minutes)
         # repository expects naive datetimes (assumed UTC)
-        observations = self.repo.get_temperature_series(city, start.replace(tzinfo=None), end.replace(tzinfo=None), bucket_minutes=bucket)
-        if not observations:
-            raw = self.repo.get_observations(city, start.replace(tzinfo=None), end.replace(tzinfo=None))
-            if not raw:
-                return []
-            observations = [
-                {"timestamp": data["observation_time"], "avg_temp_c": data.get("temp_c", 0.0)}
-                for data in raw
-            ]
+        rows = await self.repo.get_temperature_series(city, start.replace(tzinfo=None), end.replace(tzinfo=None), bucket_minutes=bucket)
+        if rows:
+            return SeriesArrays.from_rows(rows)
+        # Fallback: bucket raw observations client-side
+        times: List[int] = []
+        temps: List[float] = []
+        async for data in self.repo.iter_observations(
+            city, start.replace(tzinfo=None), end.replace(tzinfo=None), fields=("observation_time", "temp_c")
+        ):
+            if isinstance(data.get("temp_c"), (int, float)):
+                times.append(epoch_seconds(data["observation_time"]))
+                temps.append(data["temp_c"])
+        return bucket_observations(times, temps, bucket)
+
+    async def get_multi_series_arrays(self, cities: List[str], minutes: int, bucket: int) -> Dict[str, SeriesArrays]:
+        """Bucketed series of several cities from one repository query, keyed by city."""
+        start, end = series_window(minutes)
+        rows = await self.repo.get_temperature_series_multi(cities, start.replace(tzinfo=None), end.replace(tzinfo=None), bucket_minutes=bucket)
+        return {city: SeriesArrays.from_rows(rows.get(city, [])) for city in cities}
+
+    async def get_bucketed_series(self, city: str, minutes: int, bucket: int) -> List[SeriesPoint]:
+        arrays = await self.get_series_arrays(city, minutes, bucket)
         points: List[SeriesPoint] = [
             SeriesPoint(
                 timestamp=obs["timestamp"],
                 avg_temp_c=obs.get("avg_temp_c", 0.0),
                 icon=obs.get("icon")
             )
-            for obs in observations
+            for obs in arrays.to_rows()
         ]
         return points
 
-    def get_daily_series(self, city: str, days: int) -> List[DailyPoint]:
-        series = self.repo.get_daily_series(city, days)
+    async def get_daily_series(self, city: str, days: int, tz: str | None = None) -> List[DailyPoint]:
+        series = await self.repo.get_daily_series(city, days, tz=tz)
         if not series:
             return []
         return [
@@ -13,7 +13,8 @@ DEFAULT_ADDRESS = settings.GRPC_ADDRESS
 def get_current(stub, city: str):
     metadata = [('x-api-key', API_KEY)]
     resp = stub.GetCurrentWeather(weather_pb2.GetWeatherRequest(city=city), metadata=metadata)
-    print(f"Weather for {resp.city}:\n  Temp: {resp.temp_c:.1f} °C\n  Humidity: {resp.humidity_pct}%\n  Conditions: {resp.conditions}\n  Wind: {resp.wind_speed_ms:.1f} m/s\n  Fetched: {resp.fetched_at_iso}")
+    print(f"Weather for {resp.city}:\n  Temp: {resp.temp_c:.1f} °C\n  Humidity: {resp.humidity_pct}%\n  Conditions: {resp.conditions}\n  Wind: {resp.wind_speed_ms:.1f} m/s\n  Fetched: {resp.fetched_at_iso}"
+          + (" (stale: upstream unavailable)" if resp.stale else ""))
 
 
 def get_series(stub, city: str, start: str, end: str, bucket: int):
@@ -24,6 +25,14 @@ def get_series(stub, city: str, start: str, end: str, bucket: int):
         print(f"  {p.timestamp_iso}: {p.avg_temp_c:.2f} °C")
 
 
+def watch(stub, city: str, interval: int):
+    metadata = [('x-api-key', API_KEY)]
+    req = weather_pb2.SubscribeWeatherRequest(cities=[city], min_interval_seconds=interval)
+    for update in stub.SubscribeWeather(req, metadata=metadata):
+        w = update.weather
+        print(f"[{w.fetched_at_iso}] {w.city}: {w.temp_c:.1f} °C, {w.humidity_pct}%, {w.conditions}")
+
+
 def prompt_city_if_missing(arg_city: Optional[str]) -> str:
     if arg_city:
         return arg_city
@@ -39,6 +48,7 @@ def main():
     parser = argparse.ArgumentParser(description='Weather gRPC client')
     parser.add_argument('city', nargs='?', help='City name (optional; will prompt if omitted)')
     parser.add_argument('--address', default=DEFAULT_ADDRESS, help='Server address host:port')
+    parser.add_argument('--watch', type=int, metavar='SECONDS', help='Subscribe to updates (min interval in seconds) instead of a single fetch')
     args = parser.parse_args()
 
     city = prompt_city_if_missing(args.city)
@@ -47,7 +57,12 @@ def main():
     stub = weather_pb2_grpc.WeatherServiceStub(channel)
 
     try:
-        get_current(stub, city)
+        if args.watch is not None:
+            watch(stub, city, args.watch)
+        else:
+            get_current(stub, city)
+    except KeyboardInterrupt:
+        pass
     except grpc.RpcError as e:
         status = e.code()
         detail = e.details() or ''
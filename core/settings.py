@@ -36,9 +36,51 @@ class Settings(BaseSettings):
 
     Optional (sensible defaults provided here; override in .env if needed):
       - MONGO_APP_DB
+      - MONGO_ENSURE_INDEXES (create repository indexes at server startup)
+      - MONGO_TIMESERIES / MONGO_TIMESERIES_GRANULARITY (native time-series storage layout)
+      - MONGO_ROLLUPS (maintain and read 5-minute / daily temperature rollups)
+      - MONGO_RAW_ARCHIVE / MONGO_RAW_ARCHIVE_COMPRESS (store upstream payloads in a separate, zlib-compressed collection)
+      - MONGO_MAX_POOL_SIZE / MONGO_MIN_POOL_SIZE / MONGO_MAX_IDLE_TIME_MS (connection pool per client)
+      - MONGO_CONNECT_TIMEOUT_MS / MONGO_SERVER_SELECTION_TIMEOUT_MS / MONGO_SOCKET_TIMEOUT_MS (0 = no limit)
+      - UI_RESPONSE_CACHE_TTL_SECONDS (0 disables the chart API response cache) / UI_RESPONSE_CACHE_MAX_ENTRIES
+      - UI_STREAM_CHANGE_STREAMS / UI_STREAM_POLL_SECONDS (live feed source: change stream or polling fallback)
+      - UI_STREAM_HEARTBEAT_SECONDS / UI_STREAM_RETRY_MS / UI_STREAM_QUEUE_SIZE (SSE connection tuning)
+      - UI_COMPRESS_MIN_BYTES (smallest chart API body compressed with gzip / brotli)
+      - UI_SERIES_MAX_MINUTES (longest /api/series window)
+      - UI_SERIES_MAX_POINTS (default /api/series point budget; longer series are downsampled)
+      - UI_SERIES_MAX_CITIES (most cities per /api/series/multi request)
       - GRPC_PORT
       - GRPC_ADDRESS
       - OPENWEATHER_URL
+      - GRPC_MAX_WORKERS (also sizes the OpenWeather HTTP connection pool)
+      - GRPC_ASYNC (run the grpc.aio server instead of the thread pool one)
+      - GRPC_AIO_MAX_CONCURRENT_RPCS (0 = unlimited)
+      - GRPC_SHUTDOWN_GRACE_SECONDS
+      - OPENWEATHER_ASYNC_MAX_CONNECTIONS
+      - BATCH_MAX_CITIES / BATCH_MAX_PARALLELISM (GetCurrentWeatherBatch limits)
+      - SUBSCRIBE_* (SubscribeWeather polling interval floor/default, limits)
+      - SUBSCRIBE_MAX_STREAMS (concurrent SubscribeWeather streams; 0 = half of GRPC_MAX_WORKERS, unlimited on grpc.aio)
+      - WRITE_BEHIND_* (asynchronous batched observation persistence)
+      - WRITE_BEHIND_FLUSH_TIMEOUT_SECONDS (bound on one batch insert; 0 = no limit)
+      - OPENWEATHER_CONNECT_TIMEOUT / OPENWEATHER_READ_TIMEOUT (seconds)
+      - OPENWEATHER_MAX_RETRIES / OPENWEATHER_RETRY_BACKOFF
+      - WEATHER_PROVIDERS (comma-separated registered providers, e.g. "openweathermap,fake"; several form a composite)
+      - PROVIDER_COMPOSITE_MODE ("first" valid answer or "merge" of all) / PROVIDER_COMPOSITE_FANOUT (0 = query all)
+      - PROVIDER_CACHE_TTL_SECONDS (0 disables the provider cache)
+      - PROVIDER_CACHE_MAX_ENTRIES
+      - PROVIDER_CACHE_STALE_SECONDS (how long expired entries may still be served while rate limited)
+      - PROVIDER_RATE_LIMIT_PER_MINUTE (upstream calls per minute; 0 disables the limiter) / PROVIDER_RATE_LIMIT_BURST
+      - PROVIDER_RATE_LIMIT_BUDGETS (per-key overrides, e.g. "openweathermap=60,fake=600")
+      - PROVIDER_RATE_LIMIT_MAX_WAIT_SECONDS (longest queueing for a call before RESOURCE_EXHAUSTED / stale data)
+      - PROVIDER_RATE_LIMIT_STATE_FILE (share budgets between processes on one host; POSIX only)
+      - PROVIDER_BREAKER_FAILURE_THRESHOLD (consecutive failed / slow calls opening the circuit; 0 disables the breaker)
+      - PROVIDER_BREAKER_SLOW_CALL_SECONDS / PROVIDER_BREAKER_OPEN_SECONDS / PROVIDER_BREAKER_HALF_OPEN_PROBES
+      - PROVIDER_BREAKER_STALE_MAX_AGE_SECONDS (oldest stored observation served while open; 0 = any age)
+      - PROVIDER_HEDGE_ENABLED (send a second upstream request after the PROVIDER_HEDGE_QUANTILE latency)
+      - PROVIDER_HEDGE_INITIAL_DELAY_SECONDS / PROVIDER_HEDGE_MIN_DELAY_SECONDS / PROVIDER_HEDGE_WINDOW
+      - DEADLINE_PROPAGATION (cap upstream / Mongo timeouts at the client's gRPC deadline)
+      - DEADLINE_MIN_UPSTREAM_SECONDS (skip the upstream call with DEADLINE_EXCEEDED below this) / DEADLINE_MIN_WRITE_SECONDS
+        (the write budget only applies with WRITE_BEHIND_ENABLED=false; queued writes use WRITE_BEHIND_FLUSH_TIMEOUT_SECONDS)
     """
 
     # Required secrets / connection strings (no code defaults)
@@ -52,6 +94,100 @@ class Settings(BaseSettings):
     OPENWEATHER_URL: str
 
     APP_ENV: str = "local"
+    MONGO_ENSURE_INDEXES: bool = True
+    MONGO_TIMESERIES: bool = False
+    MONGO_TIMESERIES_GRANULARITY: str = "minutes"  # seconds | minutes | hours
+    MONGO_ROLLUPS: bool = False
+    MONGO_RAW_ARCHIVE: bool = False
+    MONGO_RAW_ARCHIVE_COMPRESS: bool = True
+    GRPC_MAX_WORKERS: int = 10
+    GRPC_ASYNC: bool = False
+    GRPC_AIO_MAX_CONCURRENT_RPCS: int = 0
+    GRPC_SHUTDOWN_GRACE_SECONDS: float = 5.0
+    BATCH_MAX_CITIES: int = 500
+    BATCH_MAX_PARALLELISM: int = 16
+    SUBSCRIBE_MIN_INTERVAL_SECONDS: float = 30.0
+    SUBSCRIBE_DEFAULT_INTERVAL_SECONDS: float = 60.0
+    SUBSCRIBE_MAX_CITIES: int = 100
+    SUBSCRIBE_QUEUE_SIZE: int = 32
+    SUBSCRIBE_POLL_WORKERS: int = 4
+    SUBSCRIBE_MAX_STREAMS: int = 0
+
+    # MongoDB connection pool (see db.clients)
+    MONGO_MAX_POOL_SIZE: int = 50
+    MONGO_MIN_POOL_SIZE: int = 0
+    MONGO_MAX_IDLE_TIME_MS: int = 300000
+    MONGO_CONNECT_TIMEOUT_MS: int = 5000
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = 5000
+    MONGO_SOCKET_TIMEOUT_MS: int = 0
+
+    # Chart API response cache (see UI.api.caching)
+    UI_RESPONSE_CACHE_TTL_SECONDS: float = 10.0
+    UI_RESPONSE_CACHE_MAX_ENTRIES: int = 512
+    UI_COMPRESS_MIN_BYTES: int = 1024
+    UI_SERIES_MAX_MINUTES: int = 60 * 24 * 92
+    UI_SERIES_MAX_POINTS: int = 2000
+    UI_SERIES_MAX_CITIES: int = 8
+
+    # Chart API live feed (see UI.services.live_feed)
+    UI_STREAM_CHANGE_STREAMS: bool = True
+    UI_STREAM_POLL_SECONDS: float = 5.0
+    UI_STREAM_HEARTBEAT_SECONDS: float = 15.0
+    UI_STREAM_RETRY_MS: int = 5000
+    UI_STREAM_QUEUE_SIZE: int = 16
+
+    # Write-behind persistence queue (see db.write_behind)
+    WRITE_BEHIND_ENABLED: bool = True
+    WRITE_BEHIND_MAX_QUEUE: int = 10000
+    WRITE_BEHIND_BATCH_SIZE: int = 500
+    WRITE_BEHIND_FLUSH_INTERVAL_SECONDS: float = 1.0
+    WRITE_BEHIND_POLICY: str = "block"  # block | drop_newest | drop_oldest
+    WRITE_BEHIND_BLOCK_TIMEOUT_SECONDS: float = 0.05
+    WRITE_BEHIND_SHUTDOWN_TIMEOUT_SECONDS: float = 10.0
+    WRITE_BEHIND_FLUSH_TIMEOUT_SECONDS: float = 10.0
+
+    # OpenWeather HTTP transport (see weather_service.providers.openweather_client)
+    OPENWEATHER_CONNECT_TIMEOUT: float = 3.05
+    OPENWEATHER_READ_TIMEOUT: float = 8.0
+    OPENWEATHER_MAX_RETRIES: int = 2
+    OPENWEATHER_RETRY_BACKOFF: float = 0.3
+    OPENWEATHER_ASYNC_MAX_CONNECTIONS: int = 200
+
+    # Weather providers (see weather_service.providers.base / .composite)
+    WEATHER_PROVIDERS: str = "openweathermap"
+    PROVIDER_COMPOSITE_MODE: str = "first"  # first | merge
+    PROVIDER_COMPOSITE_FANOUT: int = 0
+
+    # Provider response cache (see weather_service.providers.cache)
+    PROVIDER_CACHE_TTL_SECONDS: float = 60.0
+    PROVIDER_CACHE_MAX_ENTRIES: int = 1024
+    PROVIDER_CACHE_STALE_SECONDS: float = 600.0
+
+    # Upstream rate limiting (see weather_service.providers.rate_limit)
+    PROVIDER_RATE_LIMIT_PER_MINUTE: float = 0.0
+    PROVIDER_RATE_LIMIT_BURST: float = 0.0
+    PROVIDER_RATE_LIMIT_BUDGETS: str = ""
+    PROVIDER_RATE_LIMIT_MAX_WAIT_SECONDS: float = 2.0
+    PROVIDER_RATE_LIMIT_STATE_FILE: str = ""
+
+    # Provider circuit breaker (see weather_service.providers.circuit_breaker)
+    PROVIDER_BREAKER_FAILURE_THRESHOLD: int = 5
+    PROVIDER_BREAKER_SLOW_CALL_SECONDS: float = 3.0
+    PROVIDER_BREAKER_OPEN_SECONDS: float = 30.0
+    PROVIDER_BREAKER_HALF_OPEN_PROBES: int = 1
+    PROVIDER_BREAKER_STALE_MAX_AGE_SECONDS: float = 6 * 3600.0
+
+    # Hedged upstream requests (see weather_service.providers.hedging)
+    PROVIDER_HEDGE_ENABLED: bool = False
+    PROVIDER_HEDGE_QUANTILE: float = 0.95
+    PROVIDER_HEDGE_INITIAL_DELAY_SECONDS: float = 1.0
+    PROVIDER_HEDGE_MIN_DELAY_SECONDS: float = 0.05
+    PROVIDER_HEDGE_WINDOW: int = 200
+
+    # Client deadline propagation (see weather_service.deadlines)
+    DEADLINE_PROPAGATION: bool = True
+    DEADLINE_MIN_UPSTREAM_SECONDS: float = 0.05
+    DEADLINE_MIN_WRITE_SECONDS: float = 0.5
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -87,6 +223,22 @@ class Settings(BaseSettings):
             raise ValueError(f"Invalid LOG_LEVEL '{v}'. Expected one of DEBUG, INFO, WARNING, ERROR, CRITICAL")
         return name
 
+    @field_validator("MONGO_TIMESERIES_GRANULARITY")
+    def _validate_timeseries_granularity(cls, v: str) -> str:  # noqa: D401
+        """Ensure MONGO_TIMESERIES_GRANULARITY is a granularity Mongo accepts."""
+        name = (v or "minutes").lower()
+        if name not in {"seconds", "minutes", "hours"}:
+            raise ValueError(f"Invalid MONGO_TIMESERIES_GRANULARITY '{v}'. Expected one of seconds, minutes, hours")
+        return name
+
+    @field_validator("WRITE_BEHIND_POLICY")
+    def _validate_write_behind_policy(cls, v: str) -> str:  # noqa: D401
+        """Ensure WRITE_BEHIND_POLICY names a supported full-queue policy."""
+        name = (v or "block").lower()
+        if name not in {"block", "drop_newest", "drop_oldest"}:
+            raise ValueError(f"Invalid WRITE_BEHIND_POLICY '{v}'. Expected one of block, drop_newest, drop_oldest")
+        return name
+
     def resolved_log_level(self) -> int:
         """Return numeric logging level from LOG_LEVEL string with fallback to INFO."""
         return getattr(logging, self.LOG_LEVEL, logging.INFO)
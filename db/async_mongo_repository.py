@@ -0,0 +1,204 @@
+"""Asyncio MongoDB repository (Motor) for non-blocking persistence paths."""
+
+import logging
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Sequence
+
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorCollection
+from pymongo.errors import BulkWriteError
+
+from core.settings import settings
+from db.clients import client_options
+from db.mongo_repository import (
+    MONGO_URI,
+    DB_NAME,
+    COLLECTION_NAME,
+    ObservationLayout,
+    ObservationQueries,
+    PartialInsertError,
+    daily_points,
+    combine_buckets_by_city,
+    daily_rollup_day,
+    inserted_positions,
+    prepare_observation,
+    series_points,
+    series_points_by_city,
+)
+from db.raw_archive import RAW_ARCHIVE_COLLECTION, attach_raw
+from db.rollups import (
+    ROLLUP_5M_COLLECTION,
+    ROLLUP_DAILY_COLLECTION,
+    ROLLUP_INDEXES,
+    combine_buckets,
+    is_rollup_aligned,
+    rollup_operations,
+)
+
+logger = logging.getLogger("db.async_mongo_repository")
+
+
+class AsyncMongoRepository(ObservationQueries):
+    """Async counterpart of `MongoRepository` used by the `grpc.aio` server and the chart API.
+
+    Writes the same document shape (and storage layout) to the same collection,
+    so sync and async processes can share one database, and runs the same
+    read queries without blocking the event loop.
+    """
+
+    def __init__(
+        self,
+        uri: str = MONGO_URI,
+        db_name: str | None = DB_NAME,
+        *,
+        timeseries: bool | None = None,
+        rollups: bool | None = None,
+        raw_archive: bool | None = None,
+        client: AsyncIOMotorClient | None = None,
+    ):
+        # A passed-in client (e.g. `db.clients.get_async_client()`) is shared and not closed by `close()`
+        self._owns_client = client is None
+        self._client = client if client is not None else AsyncIOMotorClient(uri, **client_options())
+        self._db = self._client[(db_name or "weatherdb")]
+        self._col: AsyncIOMotorCollection = self._db[COLLECTION_NAME]
+        self._archive: AsyncIOMotorCollection = self._db[RAW_ARCHIVE_COLLECTION]
+        self._rollup_5m: AsyncIOMotorCollection = self._db[ROLLUP_5M_COLLECTION]
+        self._rollup_daily: AsyncIOMotorCollection = self._db[ROLLUP_DAILY_COLLECTION]
+        self._layout = ObservationLayout(
+            settings.MONGO_TIMESERIES if timeseries is None else timeseries,
+            raw_archive=settings.MONGO_RAW_ARCHIVE if raw_archive is None else raw_archive,
+            compress=settings.MONGO_RAW_ARCHIVE_COMPRESS,
+        )
+        self._rollups = settings.MONGO_ROLLUPS if rollups is None else rollups
+
+    async def ensure_collection(self) -> bool:
+        """Create the observation collection with layout options if missing; return True if created."""
+        existing = await self._db.list_collections(filter={"name": COLLECTION_NAME}).to_list(None)
+        if existing:
+            self._layout.check_existing(existing[0])
+            return False
+        await self._db.create_collection(COLLECTION_NAME, **self._layout.collection_options())
+        return True
+
+    async def ensure_indexes(self) -> List[str]:
+        """Create the indexes repository queries rely on (idempotent); return their names."""
+        names = await self._col.create_indexes(self._layout.indexes())
+        if self._rollups:
+            for name in (ROLLUP_5M_COLLECTION, ROLLUP_DAILY_COLLECTION):
+                names += [f"{name}.{ix}" for ix in await self._db[name].create_indexes(ROLLUP_INDEXES)]
+        return names
+
+    async def insert_observation(self, doc: Dict[str, Any]) -> str:
+        stored, archived = self._layout.for_write(prepare_observation(doc))
+        res = await self._col.insert_one(stored)
+        await self._archive_raw([archived] if archived else [])
+        await self._update_rollups([doc])
+        return str(res.inserted_id)
+
+    async def insert_observations(self, docs: List[Dict[str, Any]]) -> List[str]:
+        """Insert many observations with a single unordered bulk write (`PartialInsertError` if some fail)."""
+        if not docs:
+            return []
+        writes = [self._layout.for_write(prepare_observation(d)) for d in docs]
+        try:
+            res = await self._col.insert_many([stored for stored, _ in writes], ordered=False)
+        except BulkWriteError as e:
+            kept = inserted_positions(len(writes), e)
+            await self._archive_raw([writes[i][1] for i in kept if writes[i][1]])
+            await self._update_rollups([docs[i] for i in kept])
+            raise PartialInsertError([str(writes[i][0]["_id"]) for i in kept], len(writes) - len(kept), e) from e
+        await self._archive_raw([archived for _, archived in writes if archived])
+        await self._update_rollups(docs)
+        return [str(i) for i in res.inserted_ids]
+
+    async def _archive_raw(self, archived: List[Dict[str, Any]]) -> None:
+        if not archived:
+            return
+        try:
+            await self._archive.insert_many(archived, ordered=False)
+        except Exception as e:
+            logger.warning("Failed to archive %d raw payloads: %s", len(archived), e)
+
+    async def _update_rollups(self, docs: List[Dict[str, Any]]) -> None:
+        # Same rollups as `MongoRepository`; failures are repaired by `rebuild_rollups`
+        if not self._rollups:
+            return
+        try:
+            targets = {ROLLUP_5M_COLLECTION: self._rollup_5m, ROLLUP_DAILY_COLLECTION: self._rollup_daily}
+            for name, ops in rollup_operations(docs).items():
+                if ops:
+                    await targets[name].bulk_write(ops, ordered=False)
+        except Exception as e:
+            logger.warning("Failed to update rollups for %d observations: %s", len(docs), e)
+
+    async def get_observations(self, city: str, start: datetime, end: datetime, fields: Sequence[str] | None = None) -> List[Dict[str, Any]]:
+        """Observations in the window, oldest first; `fields` limits the returned fields."""
+        return [doc async for doc in self.iter_observations(city, start, end, fields=fields)]
+
+    async def iter_observations(
+        self,
+        city: str,
+        start: datetime,
+        end: datetime,
+        fields: Sequence[str] | None = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream observations in the window from the cursor, `batch_size` documents per round trip."""
+        cursor = self._col.find(self._window_filter(city, start, end), self._layout.projection(fields))
+        async for doc in cursor.sort("observation_time", 1).batch_size(batch_size):
+            yield self._layout.from_storage(doc)
+
+    async def get_temperature_series(self, city: str, start: datetime, end: datetime, bucket_minutes: int = 5) -> List[Dict[str, Any]]:
+        """See `MongoRepository.get_temperature_series`."""
+        if self._rollups and is_rollup_aligned(start, bucket_minutes):
+            rollups = await self._rollup_5m.find(self._rollup_filter(city, start, end)).sort("bucket_start", 1).to_list(None)
+            return series_points(combine_buckets(rollups, bucket_minutes))
+        pipeline = self._temperature_series_pipeline(city, start, end, bucket_minutes)
+        return series_points(await self._col.aggregate(pipeline).to_list(None))
+
+    async def get_temperature_series_multi(
+        self, cities: Sequence[str], start: datetime, end: datetime, bucket_minutes: int = 5
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """See `MongoRepository.get_temperature_series_multi`."""
+        if self._rollups and is_rollup_aligned(start, bucket_minutes):
+            rollups = await self._rollup_5m.find(self._rollup_filter(cities, start, end)).sort("bucket_start", 1).to_list(None)
+            return series_points_by_city(combine_buckets_by_city(rollups, bucket_minutes), cities)
+        pipeline = self._temperature_series_pipeline(cities, start, end, bucket_minutes, by_city=True)
+        return series_points_by_city(await self._col.aggregate(pipeline).to_list(None), cities)
+
+    async def get_daily_series(self, city: str, days: int, tz: str | None = None) -> List[Dict[str, Any]]:
+        """See `MongoRepository.get_daily_series`."""
+        if days < 1:
+            return []
+        tz = None if tz in (None, "UTC") else tz
+        start, end = self._daily_window(days, tz)
+        if self._rollups and tz is None:
+            rollups = await self._rollup_daily.find(self._rollup_filter(city, start, end)).sort("bucket_start", 1).to_list(None)
+            return daily_points(map(daily_rollup_day, rollups))
+        return daily_points(await self._col.aggregate(self._daily_series_pipeline(city, start, end, tz)).to_list(None))
+
+    async def watch_observations(self, city: str) -> AsyncIterator[Dict[str, Any]]:
+        """Yield observations of `city` as they are inserted (MongoDB change stream).
+
+        Change streams need a replica set and are not available on time-series
+        collections; the server error is raised on the first iteration then.
+        """
+        pipeline = [{"$match": {"operationType": "insert", f"fullDocument.{self._layout.city_field}": city}}]
+        async with self._col.watch(pipeline) as stream:
+            async for change in stream:
+                yield self._layout.from_storage(change["fullDocument"])
+
+    async def get_latest_observation(
+        self, city: str | Sequence[str], fields: Sequence[str] | None = None, *, ignore_case: bool = False
+    ) -> Dict[str, Any] | None:
+        """Return the most recent observation document for a city or several (optionally projected to `fields`)."""
+        doc = await self._col.find_one(
+            {self._layout.city_field: self._city_match(city)}, self._layout.projection(fields), **self._latest_options(ignore_case)
+        )
+        if doc and doc.get("raw_archived") and (fields is None or "raw" in fields):
+            return attach_raw(self._layout.from_storage(doc), await self._archive.find_one({"_id": doc["_id"]}))
+        return self._layout.from_storage(doc)
+
+    def close(self) -> None:
+        """Close the client unless it was passed in (shared)."""
+        if self._owns_client:
+            self._client.close()
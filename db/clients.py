@@ -0,0 +1,76 @@
+"""Process-wide MongoDB clients.
+
+A client owns a connection pool plus monitoring threads, so a process should
+create one and share it between repositories. `get_client()` (pymongo) and
+`get_async_client()` (Motor) create theirs lazily on first use (importing this
+module never connects) with pool sizing and timeouts from settings;
+`close_client()` / `close_async_client()` release them, e.g. from the FastAPI
+lifespan on shutdown. Motor is only imported by `get_async_client()`, so the
+pymongo-only users of this module (the thread-pool gRPC server) do not need it.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import TYPE_CHECKING, Any, Dict
+
+from pymongo import MongoClient
+
+from core.settings import settings
+
+if TYPE_CHECKING:
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+_lock = threading.Lock()
+_client: MongoClient | None = None
+_async_client: AsyncIOMotorClient | None = None
+
+
+def client_options() -> Dict[str, Any]:
+    """Pool / timeout keyword arguments shared by pymongo and Motor clients."""
+    return {
+        "maxPoolSize": settings.MONGO_MAX_POOL_SIZE,
+        "minPoolSize": settings.MONGO_MIN_POOL_SIZE,
+        "maxIdleTimeMS": settings.MONGO_MAX_IDLE_TIME_MS or None,
+        "connectTimeoutMS": settings.MONGO_CONNECT_TIMEOUT_MS,
+        "serverSelectionTimeoutMS": settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "socketTimeoutMS": settings.MONGO_SOCKET_TIMEOUT_MS or None,
+    }
+
+
+def get_client() -> MongoClient:
+    """Return the shared client, creating it on first use."""
+    global _client
+    with _lock:
+        if _client is None:
+            _client = MongoClient(settings.MONGO_URI, **client_options())
+        return _client
+
+
+def close_client() -> None:
+    """Close the shared client (a later `get_client()` creates a new one)."""
+    global _client
+    with _lock:
+        client, _client = _client, None
+    if client is not None:
+        client.close()
+
+
+def get_async_client() -> AsyncIOMotorClient:
+    """Return the shared Motor client, creating it on first use (inside the serving event loop)."""
+    global _async_client
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    with _lock:
+        if _async_client is None:
+            _async_client = AsyncIOMotorClient(settings.MONGO_URI, **client_options())
+        return _async_client
+
+
+def close_async_client() -> None:
+    """Close the shared Motor client (a later `get_async_client()` creates a new one)."""
+    global _async_client
+    with _lock:
+        client, _async_client = _async_client, None
+    if client is not None:
+        client.close()
@@ -1,127 +1,538 @@
+import logging
 from datetime import datetime, timedelta, UTC
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Iterator, Sequence, Set, Tuple
+from zoneinfo import ZoneInfo
 
-from pymongo import MongoClient
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, IndexModel, MongoClient
+from pymongo.collation import Collation
 from pymongo.collection import Collection
+from pymongo.errors import BulkWriteError
 from core.settings import settings
+from db.clients import client_options
+from db.raw_archive import HOT_EXTRA_FIELDS, RAW_ARCHIVE_COLLECTION, attach_raw, raw_view, split_observation
+from db.rollups import (
+    ROLLUP_5M_COLLECTION,
+    ROLLUP_DAILY_COLLECTION,
+    ROLLUP_INDEXES,
+    combine_buckets,
+    day_start,
+    is_rollup_aligned,
+    rollup_operations,
+)
+
+logger = logging.getLogger("db.mongo_repository")
 
 MONGO_URI = settings.MONGO_URI
 DB_NAME = settings.MONGO_APP_DB
 COLLECTION_NAME = "weather_observations"
 
-class MongoRepository:
-    def __init__(self, uri: str = MONGO_URI, db_name: str | None = DB_NAME):
-        self._client = MongoClient(uri)
-        # Fallback if db_name is None
-        self._db = self._client[(db_name or "weatherdb")]
-        self._col: Collection = self._db[COLLECTION_NAME]
+TIMESERIES_META_FIELD = "meta"
+# Fields moved into the time-series metaField (they identify the series, not the measurement)
+TIMESERIES_META_KEYS = ("city", "provider")
+# Case-insensitive city matching ("london" finds "London"); backed by its own index
+CITY_COLLATION = Collation(locale="en", strength=2)
 
-    def insert_observation(self, doc: Dict[str, Any]) -> str:
-        # Ensure required fields
-        doc.setdefault("fetched_at", datetime.now(UTC))
-        if not isinstance(doc.get("observation_time"), datetime):
-            doc["observation_time"] = doc.get("fetched_at", datetime.now(UTC))
-        res = self._col.insert_one(doc)
-        return str(res.inserted_id)
+def prepare_observation(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Fill in required timestamp fields before a document is written."""
+    doc.setdefault("fetched_at", datetime.now(UTC))
+    if not isinstance(doc.get("observation_time"), datetime):
+        doc["observation_time"] = doc.get("fetched_at", datetime.now(UTC))
+    return doc
 
-    def get_observations(self, city: str, start: datetime, end: datetime) -> List[Dict[str, Any]]:
-        cursor = self._col.find({
-            "city": city,
-            "observation_time": {"$gte": start, "$lte": end}
-        }).sort("observation_time", 1)
-        return list(cursor)
 
-    def get_temperature_series(self, city: str, start: datetime, end: datetime, bucket_minutes: int = 5) -> List[Dict[str, Any]]:
+class PartialInsertError(Exception):
+    """Some documents of an unordered bulk insert failed; the others were stored (with archive and rollups)."""
+
+    def __init__(self, inserted_ids: List[str], failed: int, cause: BulkWriteError):
+        super().__init__(f"{failed} of {len(inserted_ids) + failed} observations not inserted: {cause}")
+        self.inserted_ids = inserted_ids
+        self.failed = failed
+
+
+def inserted_positions(count: int, error: BulkWriteError) -> List[int]:
+    """Positions of an unordered `insert_many` of `count` documents stored despite `error`."""
+    failed = {write_error["index"] for write_error in error.details.get("writeErrors", [])}
+    return [i for i in range(count) if i not in failed]
+
+
+class ObservationLayout:
+    """Maps logical observation documents to the way they are stored.
+
+    Regular layout stores documents as-is. Time-series layout targets a native
+    time-series collection (`observation_time` as timeField) and moves `city`
+    and `provider` under the `meta` metaField; documents read back are lifted
+    to the regular shape so callers see the same documents in both layouts.
+
+    With `raw_archive`, the upstream payload is split out of the stored
+    document (see `db.raw_archive`) and read back as a `raw` view.
+    """
+
+    def __init__(self, timeseries: bool = False, raw_archive: bool = False, compress: bool = True):
+        self.timeseries = timeseries
+        self.raw_archive = raw_archive
+        self.compress = compress
+        self.city_field = f"{TIMESERIES_META_FIELD}.city" if timeseries else "city"
+
+    def indexes(self) -> List[IndexModel]:
+        # Every repository query filters on city and ranges / sorts on `observation_time`.
+        # The `_ci` twin serves case-insensitive lookups (`CITY_COLLATION`), e.g. the stale fallback.
+        keys = [(self.city_field, ASCENDING), ("observation_time", DESCENDING)]
+        name = f"{self.city_field}_1_observation_time_-1"
+        return [IndexModel(keys, name=name), IndexModel(keys, name=f"{name}_ci", collation=CITY_COLLATION)]
+
+    def collection_options(self) -> Dict[str, Any]:
+        """Options for `create_collection` (empty for the regular layout)."""
+        if not self.timeseries:
+            return {}
+        return {"timeseries": {
+            "timeField": "observation_time",
+            "metaField": TIMESERIES_META_FIELD,
+            "granularity": settings.MONGO_TIMESERIES_GRANULARITY,
+        }}
+
+    def check_existing(self, info: Dict[str, Any]) -> None:
+        """Warn when an existing collection (listCollections entry) does not match the layout."""
+        is_timeseries = info.get("type") == "timeseries"
+        if self.timeseries and not is_timeseries:
+            logger.warning(
+                "MONGO_TIMESERIES is enabled but '%s' is a regular collection; run python -m scripts.migrate_timeseries",
+                info.get("name"),
+            )
+        elif is_timeseries and not self.timeseries:
+            logger.warning("'%s' is a time-series collection; set MONGO_TIMESERIES=true", info.get("name"))
+
+    def to_storage(self, doc: Dict[str, Any]) -> Dict[str, Any]:
+        if not self.timeseries:
+            return doc
+        stored = {k: v for k, v in doc.items() if k not in TIMESERIES_META_KEYS}
+        stored[TIMESERIES_META_FIELD] = {k: doc.get(k) for k in TIMESERIES_META_KEYS}
+        return stored
+
+    def projection(self, fields: Sequence[str] | None) -> Dict[str, int] | None:
+        """Translate logical field names into a stored-document projection (None = whole document).
+
+        `_id` is only returned when requested; asking for `raw` also fetches
+        what `from_storage` needs to rebuild it for archived documents.
+        """
+        if fields is None:
+            return None
+        projection: Dict[str, int] = {"_id": 0}
+        for field in fields:
+            if field in TIMESERIES_META_KEYS and self.timeseries:
+                projection[TIMESERIES_META_FIELD] = 1
+            elif field == "raw" and self.raw_archive:
+                projection.update({"_id": 1, "raw": 1, "raw_archived": 1}, **{extra: 1 for extra in HOT_EXTRA_FIELDS})
+            else:
+                projection[field] = 1
+        return projection
+
+    def for_write(self, doc: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any] | None]:
+        """Return the stored document and its archived raw payload (None unless archiving applies)."""
+        archived = None
+        if self.raw_archive:
+            doc.setdefault("_id", ObjectId())
+            doc, archived = split_observation(doc, self.compress)
+        return self.to_storage(doc), archived
+
+    def from_storage(self, doc: Dict[str, Any] | None) -> Dict[str, Any] | None:
+        if doc and isinstance(doc.get(TIMESERIES_META_FIELD), dict):
+            meta = doc.pop(TIMESERIES_META_FIELD)
+            for key in TIMESERIES_META_KEYS:
+                doc.setdefault(key, meta.get(key))
+        return raw_view(doc)
+
+
+# Indexes for the default (regular collection) layout
+OBSERVATION_INDEXES = ObservationLayout().indexes()
+
+
+def winning_plan_stages(explain: Dict[str, Any]) -> Set[str]:
+    """Collect every plan stage name (IXSCAN, COLLSCAN, ...) from winning plans in explain output.
+
+    Handles find and aggregate explain shapes (top-level `queryPlanner` or
+    per-stage `$cursor` sections); rejected plans are ignored.
+    """
+    stages: Set[str] = set()
+
+    def walk(node: Any, in_winning: bool) -> None:
+        if isinstance(node, dict):
+            if in_winning and isinstance(node.get("stage"), str):
+                stages.add(node["stage"])
+            for key, value in node.items():
+                if key == "rejectedPlans":
+                    continue
+                walk(value, in_winning or key in ("winningPlan", "queryPlan"))
+        elif isinstance(node, list):
+            for item in node:
+                walk(item, in_winning)
+
+    walk(explain, False)
+    return stages
+
+
+def _first_icon(doc: Dict[str, Any]) -> str | None:
+    icon_raw = doc.get("first_icon")
+    if isinstance(icon_raw, list):
+        return icon_raw[0] if icon_raw else None
+    return icon_raw if isinstance(icon_raw, str) else None
+
+
+def series_points(buckets: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Shape series buckets (raw pipeline or combined rollups) into repository results."""
+    return [
+        {"timestamp": bucket["timestamp"], "avg_temp_c": bucket.get("avg_temp", 0.0), "icon": _first_icon(bucket)}
+        for bucket in buckets
+    ]
+
+
+def series_points_by_city(buckets: Iterable[Dict[str, Any]], cities: Sequence[str]) -> Dict[str, List[Dict[str, Any]]]:
+    """Split per-city series buckets (sorted by timestamp) into repository results keyed by city."""
+    out: Dict[str, List[Dict[str, Any]]] = {city: [] for city in cities}
+    for bucket in buckets:
+        out.setdefault(bucket["city"], []).extend(series_points([bucket]))
+    return out
+
+
+def combine_buckets_by_city(rollups: Iterable[Dict[str, Any]], bucket_minutes: int) -> List[Dict[str, Any]]:
+    """`combine_buckets` for 5-minute rollups of several cities, tagging each bucket with its city."""
+    per_city: Dict[str, List[Dict[str, Any]]] = {}
+    for doc in rollups:
+        per_city.setdefault(doc["city"], []).append(doc)
+    return [
+        {**bucket, "city": city}
+        for city, docs in per_city.items()
+        for bucket in combine_buckets(docs, bucket_minutes)
+    ]
+
+
+def daily_rollup_day(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Daily rollup document in the daily pipeline's output shape."""
+    avg = doc["sum_temp"] / doc["count"] if doc.get("count") else 0.0
+    return {"day_start": doc["bucket_start"], "avg_temp": avg, "first_icon": doc.get("first_icon")}
+
+
+def daily_points(days: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Shape daily groups into repository results."""
+    return [
+        {
+            "date": day.get("date") or day["day_start"].date().isoformat(),
+            "avg_temp_c": day.get("avg_temp", 0.0),
+            "icon": _first_icon(day),
+        }
+        for day in days
+    ]
+
+
+class ObservationQueries:
+    """Query filters and aggregation pipelines shared by the sync and async repositories.
+
+    Subclasses set `_layout` (an `ObservationLayout`).
+    """
+
+    _layout: ObservationLayout
+
+    @staticmethod
+    def _city_match(city: str | Sequence[str]) -> Any:
+        # One city, or several (`$in`) for multi-city queries
+        return city if isinstance(city, str) else {"$in": list(city)}
+
+    @staticmethod
+    def _latest_options(ignore_case: bool) -> Dict[str, Any]:
+        # `find_one` options selecting the newest observation, optionally matching the city case-insensitively
+        options: Dict[str, Any] = {"sort": [("observation_time", -1)]}
+        if ignore_case:
+            options["collation"] = CITY_COLLATION
+        return options
+
+    def _window_filter(self, city: str | Sequence[str], start: datetime, end: datetime) -> Dict[str, Any]:
+        return {self._layout.city_field: self._city_match(city), "observation_time": {"$gte": start, "$lte": end}}
+
+    def _temperature_series_pipeline(
+        self, city: str | Sequence[str], start: datetime, end: datetime, bucket_minutes: int, *, by_city: bool = False
+    ) -> List[Dict[str, Any]]:
         # Aggregation pipeline to bucket by N minutes and average temperature
-        pipeline = [
-            {"$match": {"city": city, "observation_time": {"$gte": start, "$lte": end}}},
+        # (per city and bucket with `by_city`). `$dateTrunc` bins are counted
+        # from 2000-01-01T00:00Z, so any bucket size works (see `bucket_floor`).
+        group_id: Dict[str, Any] = {
+            "timestamp": {"$dateTrunc": {"date": "$observation_time", "unit": "minute", "binSize": bucket_minutes}}
+        }
+        if by_city:
+            group_id["city"] = f"${self._layout.city_field}"
+        project: Dict[str, Any] = {"_id": 0, "timestamp": "$_id.timestamp", "avg_temp": 1, "first_icon": 1}
+        if by_city:
+            project["city"] = "$_id.city"
+        return [
+            {"$match": self._window_filter(city, start, end)},
             {"$group": {
-                "_id": {
-                    "y": {"$year": "$observation_time"},
-                    "m": {"$month": "$observation_time"},
-                    "d": {"$dayOfMonth": "$observation_time"},
-                    "h": {"$hour": "$observation_time"},
-                    "slice": {"$floor": {"$divide": [{"$minute": "$observation_time"}, bucket_minutes]}}
-                },
+                "_id": group_id,
                 "avg_temp": {"$avg": "$temp_c"},
-                "first_icon": {"$first": "$raw.weather.0.icon"}
-            }},
-            {"$project": {
-                "timestamp": {
-                    "$dateFromParts": {
-                        "year": "$_id.y", "month": "$_id.m", "day": "$_id.d", "hour": "$_id.h",
-                        "minute": {"$multiply": ["$_id.slice", bucket_minutes]}
-                    }
-                },
-                "avg_temp": 1,
-                "first_icon": 1
+                "first_icon": {"$first": {"$ifNull": ["$icon", "$raw.weather.0.icon"]}}
             }},
+            {"$project": project},
             {"$sort": {"timestamp": 1}}
         ]
-        out = []
-        for bucket in self._col.aggregate(pipeline):
-            icon_raw = bucket.get("first_icon")
-            if isinstance(icon_raw, list):
-                icon_raw = icon_raw[0] if icon_raw else None
-            elif not isinstance(icon_raw, str):
-                icon_raw = None
-            out.append({
-                "timestamp": bucket["timestamp"],
-                "avg_temp_c": bucket.get("avg_temp", 0.0),
-                "icon": icon_raw
-            })
-        return out
-
-    def get_daily_series(self, city: str, days: int) -> List[Dict[str, Any]]:
-        """Return average temperature per day for the last `days` days (inclusive of today).
 
-        Groups observations by calendar day (UTC) and computes average `temp_c`.
-        """
-        if days < 1:
-            return []
+    def _rollup_filter(self, city: str | Sequence[str], start: datetime, end: datetime) -> Dict[str, Any]:
+        return {"city": self._city_match(city), "bucket_start": {"$gte": start, "$lte": end}}
+
+    @staticmethod
+    def _daily_window(days: int, tz: str | None = None) -> Tuple[datetime, datetime]:
         end = datetime.now(UTC)
-        start = end.replace(hour=0, minute=0, second=0, microsecond=0)  # today 00:00
-        start = start - timedelta(days=days - 1)
-        pipeline = [
-            {"$match": {"city": city, "observation_time": {"$gte": start, "$lte": end}}},
+        local = end.astimezone(ZoneInfo(tz)) if tz else end
+        start = local.replace(hour=0, minute=0, second=0, microsecond=0)  # today 00:00 (local)
+        return (start - timedelta(days=days - 1)).astimezone(UTC), end
+
+    def _daily_series_pipeline(self, city: str, start: datetime, end: datetime, tz: str | None = None) -> List[Dict[str, Any]]:
+        # Days are calendar days in `tz` (UTC by default)
+        return [
+            {"$match": self._window_filter(city, start, end)},
             {"$group": {
-                "_id": {
-                    "y": {"$year": "$observation_time"},
-                    "m": {"$month": "$observation_time"},
-                    "d": {"$dayOfMonth": "$observation_time"},
-                },
+                "_id": {"day_start": {"$dateTrunc": {"date": "$observation_time", "unit": "day", "timezone": tz or "UTC"}}},
                 "avg_temp": {"$avg": "$temp_c"},
                 "first_ts": {"$min": "$observation_time"},
-                "first_icon": {"$first": "$raw.weather.0.icon"}
+                "first_icon": {"$first": {"$ifNull": ["$icon", "$raw.weather.0.icon"]}}
             }},
             {"$project": {
-                "day_start": {"$dateFromParts": {"year": "$_id.y", "month": "$_id.m", "day": "$_id.d"}},
+                "_id": 0,
+                "day_start": "$_id.day_start",
+                "date": {"$dateToString": {"format": "%Y-%m-%d", "date": "$_id.day_start", "timezone": tz or "UTC"}},
                 "avg_temp": 1,
                 "first_ts": 1,
                 "first_icon": 1
             }},
             {"$sort": {"day_start": 1}}
         ]
-        out: List[Dict[str, Any]] = []
-        for doc in self._col.aggregate(pipeline):
-            icon_raw = doc.get("first_icon")
-            if isinstance(icon_raw, list):
-                icon_raw = icon_raw[0] if icon_raw else None
-            elif not isinstance(icon_raw, str):
-                icon_raw = None
-            out.append({
-                "date": doc["day_start"].date().isoformat(),
-                "avg_temp_c": doc.get("avg_temp", 0.0),
-                "icon": icon_raw
-            })
-        return out
-
-    def get_latest_observation(self, city: str) -> Dict[str, Any] | None:
-        """Return the most recent raw observation document for a city.
+
+
+class MongoRepository(ObservationQueries):
+    def __init__(
+        self,
+        uri: str = MONGO_URI,
+        db_name: str | None = DB_NAME,
+        *,
+        timeseries: bool | None = None,
+        rollups: bool | None = None,
+        raw_archive: bool | None = None,
+        client: MongoClient | None = None,
+    ):
+        # A passed-in client (e.g. `db.clients.get_client()`) is shared and not closed by `close()`
+        self._owns_client = client is None
+        self._client = client if client is not None else MongoClient(uri, **client_options())
+        # Fallback if db_name is None
+        self._db = self._client[(db_name or "weatherdb")]
+        self._col: Collection = self._db[COLLECTION_NAME]
+        self._archive: Collection = self._db[RAW_ARCHIVE_COLLECTION]
+        self._layout = ObservationLayout(
+            settings.MONGO_TIMESERIES if timeseries is None else timeseries,
+            raw_archive=settings.MONGO_RAW_ARCHIVE if raw_archive is None else raw_archive,
+            compress=settings.MONGO_RAW_ARCHIVE_COMPRESS,
+        )
+        self._rollups = settings.MONGO_ROLLUPS if rollups is None else rollups
+        self._rollup_5m: Collection = self._db[ROLLUP_5M_COLLECTION]
+        self._rollup_daily: Collection = self._db[ROLLUP_DAILY_COLLECTION]
+
+    def ensure_collection(self) -> bool:
+        """Create the observation collection with layout options if missing; return True if created.
+
+        Required before the first insert in time-series mode, otherwise Mongo
+        would implicitly create a regular collection.
+        """
+        existing = list(self._db.list_collections(filter={"name": COLLECTION_NAME}))
+        if existing:
+            self._layout.check_existing(existing[0])
+            return False
+        self._db.create_collection(COLLECTION_NAME, **self._layout.collection_options())
+        return True
+
+    def ensure_indexes(self) -> List[str]:
+        """Create the indexes repository queries rely on (idempotent); return their names."""
+        names = self._col.create_indexes(self._layout.indexes())
+        if self._rollups:
+            for col in (self._rollup_5m, self._rollup_daily):
+                names += [f"{col.name}.{name}" for name in col.create_indexes(ROLLUP_INDEXES)]
+        return names
+
+    def insert_observation(self, doc: Dict[str, Any]) -> str:
+        stored, archived = self._layout.for_write(prepare_observation(doc))
+        res = self._col.insert_one(stored)
+        self._archive_raw([archived] if archived else [])
+        self._update_rollups([doc])
+        return str(res.inserted_id)
+
+    def insert_observations(self, docs: List[Dict[str, Any]]) -> List[str]:
+        """Insert many observations with a single unordered bulk write.
+
+        Raises `PartialInsertError` (carrying the stored ids) when only some documents fail.
+        """
+        if not docs:
+            return []
+        writes = [self._layout.for_write(prepare_observation(d)) for d in docs]
+        try:
+            res = self._col.insert_many([stored for stored, _ in writes], ordered=False)
+        except BulkWriteError as e:
+            # Unordered: every document without a write error was stored and still needs its archive / rollups
+            kept = inserted_positions(len(writes), e)
+            self._archive_raw([writes[i][1] for i in kept if writes[i][1]])
+            self._update_rollups([docs[i] for i in kept])
+            raise PartialInsertError([str(writes[i][0]["_id"]) for i in kept], len(writes) - len(kept), e) from e
+        self._archive_raw([archived for _, archived in writes if archived])
+        self._update_rollups(docs)
+        return [str(i) for i in res.inserted_ids]
+
+    def _archive_raw(self, archived: List[Dict[str, Any]]) -> None:
+        # The hot document is already stored; a lost payload only degrades `raw` to its view
+        if not archived:
+            return
+        try:
+            self._archive.insert_many(archived, ordered=False)
+        except Exception as e:
+            logger.warning("Failed to archive %d raw payloads: %s", len(archived), e)
+
+    def _update_rollups(self, docs: List[Dict[str, Any]]) -> None:
+        # Raw observations are the source of truth: a failed rollup update is
+        # logged and repaired later by `rebuild_rollups`.
+        if not self._rollups:
+            return
+        try:
+            targets = {ROLLUP_5M_COLLECTION: self._rollup_5m, ROLLUP_DAILY_COLLECTION: self._rollup_daily}
+            for name, ops in rollup_operations(docs).items():
+                if ops:
+                    targets[name].bulk_write(ops, ordered=False)
+        except Exception as e:
+            logger.warning("Failed to update rollups for %d observations: %s", len(docs), e)
+
+    def rebuild_rollups(self, city: str | None = None, days: int | None = None, batch_size: int = 1000) -> int:
+        """Recompute rollups from raw observations; return the number of observations read.
+
+        Limited to one city and / or the last `days` days (whole UTC days)
+        when given, otherwise every rollup is rebuilt.
+        """
+        raw_filter: Dict[str, Any] = {}
+        rollup_filter: Dict[str, Any] = {}
+        if city is not None:
+            raw_filter[self._layout.city_field] = city
+            rollup_filter["city"] = city
+        if days is not None:
+            start = day_start(datetime.now(UTC)) - timedelta(days=max(days, 1) - 1)
+            raw_filter["observation_time"] = {"$gte": start}
+            rollup_filter["bucket_start"] = {"$gte": start}
+        for col in (self._rollup_5m, self._rollup_daily):
+            col.delete_many(rollup_filter)
+        read = 0
+        batch: List[Dict[str, Any]] = []
+        for doc in self._col.find(raw_filter).sort("observation_time", 1).batch_size(batch_size):
+            batch.append(self._layout.from_storage(doc))
+            if len(batch) >= batch_size:
+                read += len(batch)
+                self._update_rollups(batch)
+                batch = []
+        if batch:
+            read += len(batch)
+            self._update_rollups(batch)
+        return read
+
+    def get_observations(self, city: str, start: datetime, end: datetime, fields: Sequence[str] | None = None) -> List[Dict[str, Any]]:
+        """Observations in the window, oldest first; `fields` limits the returned fields."""
+        return list(self.iter_observations(city, start, end, fields=fields))
+
+    def iter_observations(
+        self,
+        city: str,
+        start: datetime,
+        end: datetime,
+        fields: Sequence[str] | None = None,
+        batch_size: int = 1000,
+    ) -> Iterator[Dict[str, Any]]:
+        """Stream observations in the window from the cursor, `batch_size` documents per round trip."""
+        cursor = self._col.find(self._window_filter(city, start, end), self._layout.projection(fields))
+        for doc in cursor.sort("observation_time", 1).batch_size(batch_size):
+            yield self._layout.from_storage(doc)
+
+    def get_temperature_series(self, city: str, start: datetime, end: datetime, bucket_minutes: int = 5) -> List[Dict[str, Any]]:
+        """Average temperature per `bucket_minutes` bucket between `start` and `end`.
+
+        Served from 5-minute rollups when the bucket is a multiple of 5 minutes
+        and `start` falls on a 5-minute boundary (the last bucket then covers
+        its full 5 minutes); otherwise raw observations are aggregated.
+        """
+        if self._rollups and is_rollup_aligned(start, bucket_minutes):
+            rollups = self._rollup_5m.find(self._rollup_filter(city, start, end)).sort("bucket_start", 1)
+            buckets = combine_buckets(rollups, bucket_minutes)
+        else:
+            buckets = self._col.aggregate(self._temperature_series_pipeline(city, start, end, bucket_minutes))
+        return series_points(buckets)
+
+    def get_temperature_series_multi(
+        self, cities: Sequence[str], start: datetime, end: datetime, bucket_minutes: int = 5
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """`get_temperature_series` for several cities in one query, keyed by city.
+
+        One rollup read (or one aggregation grouped by city and bucket) with
+        `$in` on the city; cities without data map to an empty list.
+        """
+        if self._rollups and is_rollup_aligned(start, bucket_minutes):
+            rollups = self._rollup_5m.find(self._rollup_filter(cities, start, end)).sort("bucket_start", 1)
+            buckets = combine_buckets_by_city(rollups, bucket_minutes)
+        else:
+            buckets = self._col.aggregate(self._temperature_series_pipeline(cities, start, end, bucket_minutes, by_city=True))
+        return series_points_by_city(buckets, cities)
+
+    def get_daily_series(self, city: str, days: int, tz: str | None = None) -> List[Dict[str, Any]]:
+        """Return average temperature per day for the last `days` days (inclusive of today).
+
+        Groups observations by calendar day in `tz` (an IANA name, UTC by
+        default) and computes average `temp_c`; UTC days are read from the
+        daily rollups when they are enabled.
+        """
+        if days < 1:
+            return []
+        tz = None if tz in (None, "UTC") else tz
+        start, end = self._daily_window(days, tz)
+        if self._rollups and tz is None:
+            days_docs = map(daily_rollup_day, self._rollup_daily.find(self._rollup_filter(city, start, end)).sort("bucket_start", 1))
+        else:
+            days_docs = self._col.aggregate(self._daily_series_pipeline(city, start, end, tz))
+        return daily_points(days_docs)
+
+    def get_latest_observation(
+        self, city: str | Sequence[str], fields: Sequence[str] | None = None, *, ignore_case: bool = False
+    ) -> Dict[str, Any] | None:
+        """Return the most recent raw observation document for a city (or the latest across several cities).
 
         The server stores a `raw` field containing the upstream OpenWeather payload.
         This method surfaces the whole document so the API layer can extract
         extended metrics (pressure, humidity, wind, sunrise/sunset, etc.).
+        With raw archiving the payload is read back from the archive collection.
+        `fields` limits the returned fields (e.g. `("observation_time", "temp_c")`);
+        `ignore_case` matches the city name case-insensitively.
         """
-        doc = self._col.find_one({"city": city}, sort=[("observation_time", -1)])
-        return doc
+        doc = self._col.find_one(
+            {self._layout.city_field: self._city_match(city)}, self._layout.projection(fields), **self._latest_options(ignore_case)
+        )
+        if doc and doc.get("raw_archived") and (fields is None or "raw" in fields):
+            return attach_raw(self._layout.from_storage(doc), self._archive.find_one({"_id": doc["_id"]}))
+        return self._layout.from_storage(doc)
+
+    def close(self) -> None:
+        """Close the client unless it was passed in (shared)."""
+        if self._owns_client:
+            self._client.close()
+
+    def explain_queries(self, city: str, start: datetime, end: datetime, bucket_minutes: int = 5, days: int = 7) -> Dict[str, Dict[str, Any]]:
+        """Run `explain` for every read query this repository issues, keyed by method name."""
+        daily_start, daily_end = self._daily_window(days)
+
+        def explain_aggregate(pipeline: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+            return self._db.command("aggregate", self._col.name, pipeline=list(pipeline), explain=True)
+
+        plans = {
+            "get_observations": self._col.find(self._window_filter(city, start, end)).sort("observation_time", 1).explain(),
+            "get_temperature_series": explain_aggregate(self._temperature_series_pipeline(city, start, end, bucket_minutes)),
+            "get_daily_series": explain_aggregate(self._daily_series_pipeline(city, daily_start, daily_end)),
+            "get_latest_observation": self._col.find({self._layout.city_field: city}).sort("observation_time", -1).limit(1).explain(),
+        }
+        if self._rollups:
+            plans["get_temperature_series (rollup)"] = self._rollup_5m.find(self._rollup_filter(city, start, end)).sort("bucket_start", 1).explain()
+            plans["get_daily_series (rollup)"] = self._rollup_daily.find(self._rollup_filter(city, daily_start, daily_end)).sort("bucket_start", 1).explain()
+        return plans
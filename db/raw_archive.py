@@ -0,0 +1,103 @@
+"""Split upstream payloads out of hot observation documents.
+
+With MONGO_RAW_ARCHIVE enabled, the repositories store a compact hot
+document (normalized fields plus the few extras the UI reads: icon,
+pressure, feels-like temperature, sunrise / sunset and coordinates) in
+`weather_observations` and the full upstream payload in
+`weather_observations_raw` under the same `_id`, zlib-compressed BSON when
+MONGO_RAW_ARCHIVE_COMPRESS is on.
+
+Reads stay compatible: `raw_view` rebuilds an OpenWeather-shaped `raw`
+from the extras, and `get_latest_observation` reattaches the archived
+payload (`attach_raw`).
+"""
+
+from __future__ import annotations
+
+import zlib
+from typing import Any, Dict, Tuple
+
+import bson
+from bson import Binary
+
+RAW_ARCHIVE_COLLECTION = "weather_observations_raw"
+ZLIB_ENCODING = "zlib+bson"
+
+# hot field -> (raw section, raw key); `weather.0` is the first weather entry
+HOT_EXTRA_FIELDS: Dict[str, Tuple[str, str]] = {
+    "icon": ("weather.0", "icon"),
+    "description": ("weather.0", "description"),
+    "pressure_hpa": ("main", "pressure"),
+    "feels_like_c": ("main", "feels_like"),
+    "sunrise": ("sys", "sunrise"),
+    "sunset": ("sys", "sunset"),
+    "lat": ("coord", "lat"),
+    "lon": ("coord", "lon"),
+}
+
+
+def _section(raw: Dict[str, Any], name: str) -> Dict[str, Any]:
+    if name == "weather.0":
+        weather = raw.get("weather") or [{}]
+        return weather[0] if isinstance(weather[0], dict) else {}
+    value = raw.get(name)
+    return value if isinstance(value, dict) else {}
+
+
+def hot_extras(raw: Dict[str, Any]) -> Dict[str, Any]:
+    """Extract the extra hot fields present in an upstream payload."""
+    extras = {}
+    for field, (section, key) in HOT_EXTRA_FIELDS.items():
+        value = _section(raw, section).get(key)
+        if value is not None:
+            extras[field] = value
+    return extras
+
+
+def encode_payload(raw: Dict[str, Any], compress: bool) -> Dict[str, Any]:
+    if compress:
+        return {"payload": Binary(zlib.compress(bson.encode(raw))), "encoding": ZLIB_ENCODING}
+    return {"payload": raw, "encoding": None}
+
+
+def decode_payload(archived: Dict[str, Any]) -> Dict[str, Any]:
+    payload = archived.get("payload")
+    if archived.get("encoding") == ZLIB_ENCODING:
+        return bson.decode(zlib.decompress(payload))
+    return payload if isinstance(payload, dict) else {}
+
+
+def split_observation(doc: Dict[str, Any], compress: bool) -> Tuple[Dict[str, Any], Dict[str, Any] | None]:
+    """Return `(hot, archived)`; `doc` must already carry its `_id`.
+
+    Documents without a `raw` payload are stored as-is (`archived` is None).
+    """
+    raw = doc.get("raw")
+    if not isinstance(raw, dict):
+        return doc, None
+    hot = {k: v for k, v in doc.items() if k != "raw"}
+    hot.update(hot_extras(raw))
+    hot["raw_archived"] = True
+    archived = {"_id": doc["_id"], "city": doc.get("city"), "observation_time": doc.get("observation_time")}
+    archived.update(encode_payload(raw, compress))
+    return hot, archived
+
+
+def raw_view(doc: Dict[str, Any] | None) -> Dict[str, Any] | None:
+    """Give a hot document a `raw` built from its extras (no-op for regular documents)."""
+    if not doc or "raw" in doc or not doc.get("raw_archived"):
+        return doc
+    raw: Dict[str, Any] = {}
+    for field, (section, key) in HOT_EXTRA_FIELDS.items():
+        if field in doc:
+            target = raw.setdefault("weather", [{}])[0] if section == "weather.0" else raw.setdefault(section, {})
+            target[key] = doc[field]
+    doc["raw"] = raw
+    return doc
+
+
+def attach_raw(doc: Dict[str, Any] | None, archived: Dict[str, Any] | None) -> Dict[str, Any] | None:
+    """Reattach an archived payload to its hot document, falling back to `raw_view`."""
+    if doc and archived:
+        doc["raw"] = decode_payload(archived)
+    return raw_view(doc)
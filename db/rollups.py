@@ -0,0 +1,132 @@
+"""Pre-aggregated temperature rollups for the series and daily queries.
+
+Each rollup document covers one city and one bucket (5 minutes or one UTC
+day) and stores `sum_temp`, `count`, `min_temp`, `max_temp`, the first
+observation time and the icon of the first observation written to the
+bucket. Buckets are upserted incrementally as observations are inserted
+(`rollup_operations`) and can be rebuilt from raw observations with
+`scripts/rebuild_rollups.py`.
+
+Because sums and counts compose, any series bucket that is a multiple of 5
+minutes can be served by combining 5-minute rollups (`combine_buckets`),
+matching the raw `$dateTrunc` pipeline of `MongoRepository` bucket for bucket.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Tuple
+
+from pymongo import ASCENDING, IndexModel, UpdateOne
+
+ROLLUP_STEP_MINUTES = 5
+# `$dateTrunc` counts `binSize` bins from this instant
+BUCKET_REFERENCE = datetime(2000, 1, 1)
+ROLLUP_5M_COLLECTION = "weather_rollups_5m"
+ROLLUP_DAILY_COLLECTION = "weather_rollups_daily"
+
+ROLLUP_INDEXES = [
+    IndexModel([("city", ASCENDING), ("bucket_start", ASCENDING)], name="city_1_bucket_start_1", unique=True),
+]
+
+
+def five_minute_start(ts: datetime) -> datetime:
+    return ts.replace(minute=ts.minute - ts.minute % ROLLUP_STEP_MINUTES, second=0, microsecond=0)
+
+
+def day_start(ts: datetime) -> datetime:
+    return ts.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def bucket_floor(ts: datetime, bucket_minutes: int) -> datetime:
+    """Start of the `bucket_minutes` bucket holding `ts`, as `$dateTrunc` (unit minute, binSize) computes it."""
+    reference = BUCKET_REFERENCE.replace(tzinfo=ts.tzinfo)
+    size = timedelta(minutes=bucket_minutes)
+    return reference + (ts - reference) // size * size
+
+
+def is_rollup_aligned(start: datetime, bucket_minutes: int) -> bool:
+    """True if a series query can be answered from 5-minute rollups exactly.
+
+    The bucket must be a whole number of rollup steps and the window must
+    start on a rollup boundary, otherwise the first bucket would include
+    observations from before `start`.
+    """
+    return bucket_minutes > 0 and bucket_minutes % ROLLUP_STEP_MINUTES == 0 and start == five_minute_start(start)
+
+
+def observation_icon(doc: Dict[str, Any]) -> str | None:
+    if isinstance(doc.get("icon"), str):  # compact documents (raw archiving)
+        return doc["icon"]
+    raw = doc.get("raw") if isinstance(doc.get("raw"), dict) else {}
+    weather = raw.get("weather") or [{}]
+    icon = weather[0].get("icon") if isinstance(weather[0], dict) else None
+    return icon if isinstance(icon, str) else None
+
+
+def _accumulate(docs: Iterable[Dict[str, Any]], bucket_of) -> Dict[Tuple[str, datetime], Dict[str, Any]]:
+    buckets: Dict[Tuple[str, datetime], Dict[str, Any]] = {}
+    for doc in sorted(docs, key=lambda d: d["observation_time"]):
+        temp = doc.get("temp_c")
+        if doc.get("city") is None or not isinstance(temp, (int, float)):
+            continue
+        key = (doc["city"], bucket_of(doc["observation_time"]))
+        acc = buckets.get(key)
+        if acc is None:
+            buckets[key] = {
+                "sum_temp": float(temp), "count": 1, "min_temp": temp, "max_temp": temp,
+                "first_ts": doc["observation_time"], "first_icon": observation_icon(doc),
+            }
+        else:
+            acc["sum_temp"] += temp
+            acc["count"] += 1
+            acc["min_temp"] = min(acc["min_temp"], temp)
+            acc["max_temp"] = max(acc["max_temp"], temp)
+    return buckets
+
+
+def _upserts(buckets: Dict[Tuple[str, datetime], Dict[str, Any]]) -> List[UpdateOne]:
+    return [
+        UpdateOne(
+            {"city": city, "bucket_start": start},
+            {
+                "$inc": {"sum_temp": acc["sum_temp"], "count": acc["count"]},
+                "$min": {"min_temp": acc["min_temp"], "first_ts": acc["first_ts"]},
+                "$max": {"max_temp": acc["max_temp"]},
+                "$setOnInsert": {"first_icon": acc["first_icon"]},
+            },
+            upsert=True,
+        )
+        for (city, start), acc in buckets.items()
+    ]
+
+
+def rollup_operations(docs: Iterable[Dict[str, Any]]) -> Dict[str, List[UpdateOne]]:
+    """Bulk upserts (one per touched bucket) keyed by rollup collection name.
+
+    `docs` are logical observation documents (regular layout) with
+    `observation_time` already set.
+    """
+    docs = list(docs)
+    return {
+        ROLLUP_5M_COLLECTION: _upserts(_accumulate(docs, five_minute_start)),
+        ROLLUP_DAILY_COLLECTION: _upserts(_accumulate(docs, day_start)),
+    }
+
+
+def combine_buckets(rollups: Iterable[Dict[str, Any]], bucket_minutes: int) -> List[Dict[str, Any]]:
+    """Merge 5-minute rollups (sorted by `bucket_start`) into `bucket_minutes` buckets (see `bucket_floor`)."""
+    out: List[Dict[str, Any]] = []
+    for doc in rollups:
+        timestamp = bucket_floor(doc["bucket_start"], bucket_minutes)
+        if out and out[-1]["timestamp"] == timestamp:
+            bucket = out[-1]
+            bucket["sum_temp"] += doc["sum_temp"]
+            bucket["count"] += doc["count"]
+        else:
+            out.append({"timestamp": timestamp, "sum_temp": doc["sum_temp"], "count": doc["count"], "first_icon": doc.get("first_icon")})
+    return [
+        {"timestamp": b["timestamp"], "avg_temp": b["sum_temp"] / b["count"] if b["count"] else 0.0, "first_icon": b["first_icon"]}
+        for b in out
+    ]
+
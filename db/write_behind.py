@@ -0,0 +1,207 @@
+"""Write-behind persistence queue for observation inserts.
+
+`WriteBehindRepository` wraps a repository and takes `insert_observation(s)`
+off the RPC critical path: documents are appended to a bounded in-process
+queue and a background thread writes them with `insert_observations`
+(`insert_many(ordered=False)`) once `batch_size` documents are pending or the
+oldest pending document has waited `flush_interval` seconds. Read methods are
+delegated to the wrapped repository unchanged.
+
+A flush serves many RPCs and runs after they answered, so no client deadline
+applies to it; each flush is bounded by `flush_timeout` (`pymongo.timeout`)
+instead, so a stalled primary cannot hold the worker indefinitely.
+
+When the queue is full the configured policy applies:
+  - "block": wait up to `block_timeout` seconds for room, then drop the new document
+  - "drop_newest": drop the new document immediately
+  - "drop_oldest": evict the oldest pending document to make room
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Tuple
+
+import pymongo
+
+from core.settings import settings
+from db.mongo_repository import PartialInsertError
+
+logger = logging.getLogger("db.write_behind")
+
+POLICIES = ("block", "drop_newest", "drop_oldest")
+
+
+class WriteBehindRepository:
+    """Repository wrapper persisting observations asynchronously in batches."""
+
+    def __init__(
+        self,
+        repo,
+        *,
+        max_queue: int | None = None,
+        batch_size: int | None = None,
+        flush_interval: float | None = None,
+        policy: str | None = None,
+        block_timeout: float | None = None,
+        flush_timeout: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._repo = repo
+        self._max_queue = max(1, max_queue or settings.WRITE_BEHIND_MAX_QUEUE)
+        self._batch_size = max(1, batch_size or settings.WRITE_BEHIND_BATCH_SIZE)
+        self._flush_interval = settings.WRITE_BEHIND_FLUSH_INTERVAL_SECONDS if flush_interval is None else flush_interval
+        self._policy = policy or settings.WRITE_BEHIND_POLICY
+        if self._policy not in POLICIES:
+            raise ValueError(f"Unknown write-behind policy '{self._policy}'. Expected one of {', '.join(POLICIES)}")
+        self._block_timeout = settings.WRITE_BEHIND_BLOCK_TIMEOUT_SECONDS if block_timeout is None else block_timeout
+        self._flush_timeout = settings.WRITE_BEHIND_FLUSH_TIMEOUT_SECONDS if flush_timeout is None else flush_timeout
+        self._clock = clock
+        # (enqueued_at, document)
+        self._pending: Deque[Tuple[float, Dict[str, Any]]] = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._flush_requested = False
+        self._writing = 0
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.flushes = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+
+    # --- write path -------------------------------------------------------
+    def insert_observation(self, doc: Dict[str, Any]) -> None:
+        """Queue one observation; returns immediately (no inserted id is available)."""
+        self._enqueue(doc)
+
+    def insert_observations(self, docs: List[Dict[str, Any]]) -> None:
+        """Queue many observations (each subject to the full-queue policy)."""
+        for doc in docs:
+            self._enqueue(doc)
+
+    def _enqueue(self, doc: Dict[str, Any]) -> None:
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Write-behind queue is closed")
+            if len(self._pending) >= self._max_queue:
+                if self._policy == "drop_oldest":
+                    self._pending.popleft()
+                    self.dropped += 1
+                elif self._policy == "block":
+                    deadline = self._clock() + self._block_timeout
+                    while len(self._pending) >= self._max_queue and not self._closed:
+                        remaining = deadline - self._clock()
+                        if remaining <= 0 or not self._cond.wait(remaining):
+                            break
+                if len(self._pending) >= self._max_queue:
+                    self.dropped += 1
+                    logger.warning("Write-behind queue full (%d); dropping observation", self._max_queue)
+                    return
+            self._pending.append((self._clock(), doc))
+            self.enqueued += 1
+            # First pending document arms the flush timer; a full batch flushes right away
+            if len(self._pending) == 1 or len(self._pending) >= self._batch_size:
+                self._cond.notify_all()
+
+    # --- background flushing ---------------------------------------------
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while True:
+                    if self._pending and (self._closed or self._flush_requested or len(self._pending) >= self._batch_size):
+                        break
+                    if self._pending:
+                        wait = self._pending[0][0] + self._flush_interval - self._clock()
+                        if wait <= 0:
+                            break
+                    elif self._closed:
+                        return
+                    else:
+                        wait = None
+                    self._cond.wait(wait)
+                batch = [self._pending.popleft()[1] for _ in range(min(self._batch_size, len(self._pending)))]
+                self._writing = len(batch)
+                if not self._pending:
+                    self._flush_requested = False
+                # Room was freed: wake producers blocked on a full queue
+                self._cond.notify_all()
+            written, elapsed_ms = self._write(batch)
+            with self._cond:
+                # Counters change together so `stats()` sees a consistent snapshot
+                self.written += written
+                self.failed += len(batch) - written
+                self.flushes += 1
+                self.last_flush_ms = elapsed_ms
+                self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+                self._total_flush_ms += elapsed_ms
+                self._writing = 0
+                self._cond.notify_all()
+
+    def _write(self, batch: List[Dict[str, Any]]) -> Tuple[int, float]:
+        """Insert `batch` outside the lock; return (documents written, elapsed ms)."""
+        started = time.perf_counter()
+        try:
+            with pymongo.timeout(self._flush_timeout or None):
+                self._repo.insert_observations(batch)
+        except PartialInsertError as e:
+            logger.warning("Failed to persist %d of %d queued observations: %s", e.failed, len(batch), e)
+            written = len(e.inserted_ids)
+        except Exception as e:
+            logger.warning("Failed to persist %d queued observations: %s", len(batch), e, exc_info=True)
+            written = 0
+        else:
+            written = len(batch)
+        return written, (time.perf_counter() - started) * 1000
+
+    # --- lifecycle / metrics ---------------------------------------------
+    def flush(self, timeout: float | None = None) -> bool:
+        """Write everything queued so far; return False if `timeout` elapsed first."""
+        deadline = None if timeout is None else self._clock() + timeout
+        with self._cond:
+            self._flush_requested = True
+            self._cond.notify_all()
+            while self._pending or self._writing:
+                remaining = None if deadline is None else deadline - self._clock()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self, timeout: float | None = None) -> None:
+        """Stop accepting writes, flush what is queued and stop the worker thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(settings.WRITE_BEHIND_SHUTDOWN_TIMEOUT_SECONDS if timeout is None else timeout)
+        if self._thread.is_alive():
+            with self._cond:
+                depth = len(self._pending)
+            logger.warning("Write-behind flush did not finish; %d observations still queued", depth)
+        logger.info("Write-behind queue closed: %s", self.stats())
+
+    def stats(self) -> Dict[str, Any]:
+        """Return queue depth, throughput counters and flush latency (ms)."""
+        with self._cond:
+            return {
+                "depth": len(self._pending),
+                "enqueued": self.enqueued,
+                "written": self.written,
+                "dropped": self.dropped,
+                "failed": self.failed,
+                "flushes": self.flushes,
+                "last_flush_ms": round(self.last_flush_ms, 3),
+                "avg_flush_ms": round(self._total_flush_ms / self.flushes, 3) if self.flushes else 0.0,
+                "max_flush_ms": round(self.max_flush_ms, 3),
+            }
+
+    def __getattr__(self, name: str):
+        # Reads (get_observations, get_latest_observation, ...) go straight to the wrapped repository
+        return getattr(self._repo, name)
@@ -24,7 +24,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\rweather.proto\x12\x07weather\"!\n\x11GetWeatherRequest\x12\x0c\n\x04\x63ity\x18\x01 \x01(\t\"\x8b\x01\n\x12GetWeatherResponse\x12\x0c\n\x04\x63ity\x18\x01 \x01(\t\x12\x0e\n\x06temp_c\x18\x02 \x01(\x01\x12\x14\n\x0chumidity_pct\x18\x03 \x01(\x05\x12\x12\n\nconditions\x18\x04 \x01(\t\x12\x15\n\rwind_speed_ms\x18\x05 \x01(\x01\x12\x16\n\x0e\x66\x65tched_at_iso\x18\x06 \x01(\t2^\n\x0eWeatherService\x12L\n\x11GetCurrentWeather\x12\x1a.weather.GetWeatherRequest\x1a\x1b.weather.GetWeatherResponseb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\rweather.proto\x12\x07weather\"!\n\x11GetWeatherRequest\x12\x0c\n\x04\x63ity\x18\x01 \x01(\t\"\x9a\x01\n\x12GetWeatherResponse\x12\x0c\n\x04\x63ity\x18\x01 \x01(\t\x12\x0e\n\x06temp_c\x18\x02 \x01(\x01\x12\x14\n\x0chumidity_pct\x18\x03 \x01(\x05\x12\x12\n\nconditions\x18\x04 \x01(\t\x12\x15\n\rwind_speed_ms\x18\x05 \x01(\x01\x12\x16\n\x0e\x66\x65tched_at_iso\x18\x06 \x01(\t\x12\r\n\x05stale\x18\x07 \x01(\x08\"A\n\x16GetWeatherBatchRequest\x12\x0e\n\x06\x63ities\x18\x01 \x03(\t\x12\x17\n\x0fmax_parallelism\x18\x02 \x01(\x05\"}\n\x11\x43ityWeatherResult\x12\x16\n\x0erequested_city\x18\x01 \x01(\t\x12\x13\n\x0bstatus_code\x18\x02 \x01(\x05\x12\r\n\x05\x65rror\x18\x03 \x01(\t\x12,\n\x07weather\x18\x04 \x01(\x0b\x32\x1b.weather.GetWeatherResponse\"F\n\x17GetWeatherBatchResponse\x12+\n\x07results\x18\x01 \x03(\x0b\x32\x1a.weather.CityWeatherResult\"G\n\x17SubscribeWeatherRequest\x12\x0e\n\x06\x63ities\x18\x01 \x03(\t\x12\x1c\n\x14min_interval_seconds\x18\x02 \x01(\x05\"U\n\rWeatherUpdate\x12\x16\n\x0erequested_city\x18\x01 \x01(\t\x12,\n\x07weather\x18\x02 \x01(\x0b\x32\x1b.weather.GetWeatherResponse2\x8b\x02\n\x0eWeatherService\x12L\n\x11GetCurrentWeather\x12\x1a.weather.GetWeatherRequest\x1a\x1b.weather.GetWeatherResponse\x12[\n\x16GetCurrentWeatherBatch\x12\x1f.weather.GetWeatherBatchRequest\x1a .weather.GetWeatherBatchResponse\x12N\n\x10SubscribeWeather\x12 .weather.SubscribeWeatherRequest\x1a\x16.weather.WeatherUpdate0\x01\x62\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -34,7 +34,17 @@ if not _descriptor._USE_C_DESCRIPTORS:
   _globals['_GETWEATHERREQUEST']._serialized_start=26
   _globals['_GETWEATHERREQUEST']._serialized_end=59
   _globals['_GETWEATHERRESPONSE']._serialized_start=62
-  _globals['_GETWEATHERRESPONSE']._serialized_end=201
-  _globals['_WEATHERSERVICE']._serialized_start=203
-  _globals['_WEATHERSERVICE']._serialized_end=297
+  _globals['_GETWEATHERRESPONSE']._serialized_end=216
+  _globals['_GETWEATHERBATCHREQUEST']._serialized_start=218
+  _globals['_GETWEATHERBATCHREQUEST']._serialized_end=283
+  _globals['_CITYWEATHERRESULT']._serialized_start=285
+  _globals['_CITYWEATHERRESULT']._serialized_end=410
+  _globals['_GETWEATHERBATCHRESPONSE']._serialized_start=412
+  _globals['_GETWEATHERBATCHRESPONSE']._serialized_end=482
+  _globals['_SUBSCRIBEWEATHERREQUEST']._serialized_start=484
+  _globals['_SUBSCRIBEWEATHERREQUEST']._serialized_end=555
+  _globals['_WEATHERUPDATE']._serialized_start=557
+  _globals['_WEATHERUPDATE']._serialized_end=642
+  _globals['_WEATHERSERVICE']._serialized_start=645
+  _globals['_WEATHERSERVICE']._serialized_end=912
 # @@protoc_insertion_point(module_scope)
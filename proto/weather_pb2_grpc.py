@@ -26,7 +26,7 @@ if _version_not_supported:
 
 
 class WeatherServiceStub(object):
-    """Minimal service per requirements: only current weather retrieval.
+    """Current weather retrieval for a single city, a batch of cities or a live subscription.
     """
 
     def __init__(self, channel):
@@ -40,10 +40,20 @@ class WeatherServiceStub(object):
                 request_serializer=weather__pb2.GetWeatherRequest.SerializeToString,
                 response_deserializer=weather__pb2.GetWeatherResponse.FromString,
                 _registered_method=True)
+        self.GetCurrentWeatherBatch = channel.unary_unary(
+                '/weather.WeatherService/GetCurrentWeatherBatch',
+                request_serializer=weather__pb2.GetWeatherBatchRequest.SerializeToString,
+                response_deserializer=weather__pb2.GetWeatherBatchResponse.FromString,
+                _registered_method=True)
+        self.SubscribeWeather = channel.unary_stream(
+                '/weather.WeatherService/SubscribeWeather',
+                request_serializer=weather__pb2.SubscribeWeatherRequest.SerializeToString,
+                response_deserializer=weather__pb2.WeatherUpdate.FromString,
+                _registered_method=True)
 
 
 class WeatherServiceServicer(object):
-    """Minimal service per requirements: only current weather retrieval.
+    """Current weather retrieval for a single city, a batch of cities or a live subscription.
     """
 
     def GetCurrentWeather(self, request, context):
@@ -52,6 +62,18 @@ class WeatherServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def GetCurrentWeatherBatch(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def SubscribeWeather(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_WeatherServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -60,6 +82,16 @@ def add_WeatherServiceServicer_to_server(servicer, server):
                     request_deserializer=weather__pb2.GetWeatherRequest.FromString,
                     response_serializer=weather__pb2.GetWeatherResponse.SerializeToString,
             ),
+            'GetCurrentWeatherBatch': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetCurrentWeatherBatch,
+                    request_deserializer=weather__pb2.GetWeatherBatchRequest.FromString,
+                    response_serializer=weather__pb2.GetWeatherBatchResponse.SerializeToString,
+            ),
+            'SubscribeWeather': grpc.unary_stream_rpc_method_handler(
+                    servicer.SubscribeWeather,
+                    request_deserializer=weather__pb2.SubscribeWeatherRequest.FromString,
+                    response_serializer=weather__pb2.WeatherUpdate.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'weather.WeatherService', rpc_method_handlers)
@@ -69,7 +101,7 @@ def add_WeatherServiceServicer_to_server(servicer, server):
 
  # This class is part of an EXPERIMENTAL API.
 class WeatherService(object):
-    """Minimal service per requirements: only current weather retrieval.
+    """Current weather retrieval for a single city, a batch of cities or a live subscription.
     """
 
     @staticmethod
@@ -98,3 +130,57 @@ class WeatherService(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def GetCurrentWeatherBatch(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/weather.WeatherService/GetCurrentWeatherBatch',
+            weather__pb2.GetWeatherBatchRequest.SerializeToString,
+            weather__pb2.GetWeatherBatchResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def SubscribeWeather(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/weather.WeatherService/SubscribeWeather',
+            weather__pb2.SubscribeWeatherRequest.SerializeToString,
+            weather__pb2.WeatherUpdate.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
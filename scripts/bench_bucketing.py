@@ -0,0 +1,145 @@
+"""Validate and benchmark the `$dateTrunc` series bucketing against the old `$dateFromParts` one.
+
+Seeds a scratch collection (`bench_bucketing` by default) with one
+observation per minute for one city, then for each bucket size:
+  1. runs the previous pipeline (year / month / day / hour / floor(minute / N)
+     rebuilt with `$dateFromParts`) and the repository's `$dateTrunc` pipeline
+  2. checks both return the same buckets (only for N dividing 60: the old
+     pipeline restarted buckets every hour and could not go beyond 60 minutes)
+  3. prints the best wall time of each over `--repeat` runs
+
+Needs MongoDB 5.0+ (`$dateTrunc`). The scratch collection is reused between
+runs unless `--reseed` is given and dropped with `--drop`.
+
+Usage (PowerShell):
+  python -m scripts.bench_bucketing --docs 1000000
+  python -m scripts.bench_bucketing --buckets 5 15 60 120 1440 --repeat 5 --drop
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from datetime import datetime, timedelta, UTC
+from typing import Any, Dict, List
+
+from pymongo import MongoClient
+
+from core.settings import settings
+from db.mongo_repository import MongoRepository, OBSERVATION_INDEXES
+
+CITY = "BenchCity"
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Compare $dateTrunc and $dateFromParts series bucketing.")
+    p.add_argument("--mongo-uri", default=settings.MONGO_URI, help="Mongo connection URI.")
+    p.add_argument("--db-name", default=settings.MONGO_APP_DB, help="Target database name.")
+    p.add_argument("--collection", default="bench_bucketing", help="Scratch collection (never the live one).")
+    p.add_argument("--docs", type=int, default=1_000_000, help="Observations to seed (one per minute).")
+    p.add_argument("--buckets", type=int, nargs="+", default=[5, 15, 60, 120, 1440], help="Bucket sizes in minutes.")
+    p.add_argument("--repeat", type=int, default=3, help="Runs per pipeline (best is reported).")
+    p.add_argument("--reseed", action="store_true", help="Drop and reseed the scratch collection.")
+    p.add_argument("--drop", action="store_true", help="Drop the scratch collection when done.")
+    return p.parse_args()
+
+
+def legacy_pipeline(match: Dict[str, Any], bucket_minutes: int) -> List[Dict[str, Any]]:
+    """The series pipeline before `$dateTrunc` (kept here for comparison only)."""
+    return [
+        {"$match": match},
+        {"$group": {
+            "_id": {
+                "y": {"$year": "$observation_time"},
+                "m": {"$month": "$observation_time"},
+                "d": {"$dayOfMonth": "$observation_time"},
+                "h": {"$hour": "$observation_time"},
+                "slice": {"$floor": {"$divide": [{"$minute": "$observation_time"}, bucket_minutes]}}
+            },
+            "avg_temp": {"$avg": "$temp_c"},
+            "first_icon": {"$first": {"$ifNull": ["$icon", "$raw.weather.0.icon"]}}
+        }},
+        {"$project": {
+            "_id": 0,
+            "timestamp": {
+                "$dateFromParts": {
+                    "year": "$_id.y", "month": "$_id.m", "day": "$_id.d", "hour": "$_id.h",
+                    "minute": {"$multiply": ["$_id.slice", bucket_minutes]}
+                }
+            },
+            "avg_temp": 1,
+            "first_icon": 1
+        }},
+        {"$sort": {"timestamp": 1}}
+    ]
+
+
+def seed(col, docs: int, start: datetime) -> None:
+    col.create_indexes(OBSERVATION_INDEXES)
+    batch = []
+    for i in range(docs):
+        batch.append({
+            "city": CITY,
+            "temp_c": round(10 + (i % 1440) / 100, 2),
+            "observation_time": start + timedelta(minutes=i),
+            "icon": "01d",
+        })
+        if len(batch) == 10_000:
+            col.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        col.insert_many(batch, ordered=False)
+
+
+def same_buckets(old: List[Dict[str, Any]], new: List[Dict[str, Any]]) -> bool:
+    # `$avg` may sum in a different order: compare averages with a tolerance
+    return len(old) == len(new) and all(
+        a["timestamp"] == b["timestamp"] and abs(a["avg_temp"] - b["avg_temp"]) < 1e-9 and a.get("first_icon") == b.get("first_icon")
+        for a, b in zip(old, new)
+    )
+
+
+def timed(col, pipeline: List[Dict[str, Any]], repeat: int):
+    best, result = float("inf"), []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = list(col.aggregate(pipeline, allowDiskUse=True))
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main() -> int:
+    args = parse_args()
+    db = MongoClient(args.mongo_uri)[args.db_name or "weatherdb"]
+    col = db[args.collection]
+    start = datetime(2024, 1, 1, tzinfo=UTC)
+    if args.reseed:
+        col.drop()
+    if col.estimated_document_count() < args.docs:
+        col.drop()
+        print(f"Seeding {args.docs} observations into '{args.collection}'...")
+        seed(col, args.docs, start)
+    end = start + timedelta(minutes=args.docs)
+
+    repo = MongoRepository(args.mongo_uri, args.db_name, timeseries=False, rollups=False)
+    match = repo._window_filter(CITY, start, end)
+    failures = 0
+    print(f"{'bucket':>8} {'buckets':>9} {'dateFromParts (s)':>18} {'dateTrunc (s)':>14} {'speedup':>8}  check")
+    for bucket in args.buckets:
+        new_time, new = timed(col, repo._temperature_series_pipeline(CITY, start, end, bucket), args.repeat)
+        if 60 % bucket:
+            print(f"{bucket:>8} {len(new):>9} {'n/a':>18} {new_time:>14.3f} {'':>8}  not comparable")
+            continue
+        old_time, old = timed(col, legacy_pipeline(match, bucket), args.repeat)
+        same = same_buckets(old, new)
+        failures += not same
+        print(f"{bucket:>8} {len(new):>9} {old_time:>18.3f} {new_time:>14.3f} {old_time / new_time:>7.1f}x  {'ok' if same else 'MISMATCH'}")
+
+    if args.drop:
+        col.drop()
+        print(f"Dropped '{args.collection}'.")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
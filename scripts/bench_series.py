@@ -0,0 +1,86 @@
+"""Benchmark the array-backed series path against the model-per-point path.
+
+For each size, synthetic 1-minute observations are bucketed client-side and
+rendered as the `/api/series` points payload twice:
+  - models: bucket in Python, build one `SeriesPoint` per bucket, `as_response()`
+  - arrays: `bucket_observations` + `SeriesArrays.to_points()`
+  - columns: `bucket_observations` + `SeriesArrays.to_columns()` (format=columnar)
+The arrays path is vectorized when NumPy is installed; the header says which
+backend ran. No MongoDB is needed.
+
+Usage (PowerShell):
+  python -m scripts.bench_series
+  python -m scripts.bench_series --sizes 10000 100000 1000000 --bucket 1 --repeat 3
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from datetime import datetime
+
+import UI.services.series_arrays as series_arrays
+from UI.models.series import SeriesPoint
+from UI.services.series_arrays import bucket_observations, bucket_start, epoch_seconds
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Compare series rendering with and without per-point models.")
+    p.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000], help="Observation counts.")
+    p.add_argument("--bucket", type=int, default=5, help="Bucket size in minutes.")
+    p.add_argument("--repeat", type=int, default=3, help="Runs per measurement (best is reported).")
+    return p.parse_args()
+
+
+def observations(n: int):
+    start = epoch_seconds(datetime(2024, 1, 1))
+    rng = random.Random(n)
+    return [start + i * 60 for i in range(n)], [round(rng.uniform(-10, 30), 2) for _ in range(n)]
+
+
+def model_path(times, temps, bucket: int):
+    buckets = {}
+    for ts, temp in zip(times, temps):
+        buckets.setdefault(bucket_start(ts, bucket), []).append(temp)
+    points = [
+        SeriesPoint(timestamp=datetime.utcfromtimestamp(start), avg_temp_c=sum(values) / len(values))
+        for start, values in buckets.items()
+    ]
+    return [p.as_response() for p in points]
+
+
+def arrays_path(times, temps, bucket: int):
+    return bucket_observations(times, temps, bucket).to_points()
+
+
+def columns_path(times, temps, bucket: int):
+    return bucket_observations(times, temps, bucket).to_columns()
+
+
+def best_of(repeat: int, fn, *args) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(*args)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main() -> int:
+    args = parse_args()
+    backend = "numpy" if series_arrays.np is not None else "python (numpy not installed)"
+    print(f"arrays backend: {backend}; bucket={args.bucket} min")
+    print(f"{'points':>10} {'models (s)':>12} {'arrays (s)':>12} {'columns (s)':>12} {'speedup':>8}")
+    for n in args.sizes:
+        times, temps = observations(n)
+        assert model_path(times, temps, args.bucket) == arrays_path(times, temps, args.bucket)
+        models = best_of(args.repeat, model_path, times, temps, args.bucket)
+        arrays = best_of(args.repeat, arrays_path, times, temps, args.bucket)
+        columns = best_of(args.repeat, columns_path, times, temps, args.bucket)
+        print(f"{n:>10} {models:>12.4f} {arrays:>12.4f} {columns:>12.4f} {models / arrays:>7.1f}x")
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
@@ -0,0 +1,57 @@
+"""Explain every MongoRepository read query and fail on collection scans.
+
+Runs `explain` for get_observations, get_temperature_series, get_daily_series
+and get_latest_observation against the configured database and prints the
+winning plan stages of each. Exits with status 1 if any winning plan contains
+a COLLSCAN (e.g. the indexes are missing), so it can gate CI / deployments.
+
+Usage (PowerShell):
+  python -m scripts.check_query_plans --city London
+  python -m scripts.check_query_plans --city London --ensure-indexes --minutes 1440 --bucket 5
+"""
+
+from __future__ import annotations
+
+import argparse
+from datetime import datetime, timedelta, timezone
+
+from core.settings import settings
+from db.mongo_repository import MongoRepository, winning_plan_stages
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Fail if any repository query plan is a COLLSCAN.")
+    p.add_argument("--city", default="London", help="City used in query filters.")
+    p.add_argument("--minutes", type=int, default=1440, help="Window size for observation/series queries.")
+    p.add_argument("--bucket", type=int, default=5, help="Bucket size (minutes) for the series aggregation.")
+    p.add_argument("--days", type=int, default=7, help="Window size for the daily aggregation.")
+    p.add_argument("--mongo-uri", default=settings.MONGO_URI, help="Mongo connection URI.")
+    p.add_argument("--db-name", default=settings.MONGO_APP_DB, help="Target database name.")
+    p.add_argument("--ensure-indexes", action="store_true", help="Create repository indexes before explaining.")
+    return p.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    repo = MongoRepository(args.mongo_uri, args.db_name)
+    if args.ensure_indexes:
+        print(f"Ensured indexes: {repo.ensure_indexes()}")
+    end = datetime.now(timezone.utc).replace(tzinfo=None)
+    start = end - timedelta(minutes=args.minutes)
+    plans = repo.explain_queries(args.city, start, end, bucket_minutes=args.bucket, days=args.days)
+    failed = []
+    for name, explain in plans.items():
+        stages = winning_plan_stages(explain)
+        status = "FAIL" if "COLLSCAN" in stages else "ok"
+        if status == "FAIL":
+            failed.append(name)
+        print(f"[{status:>4}] {name}: {', '.join(sorted(stages)) or 'no plan stages reported'}")
+    if failed:
+        print(f"COLLSCAN detected in: {', '.join(failed)}. Run with --ensure-indexes or check OBSERVATION_INDEXES.")
+        return 1
+    print("All repository queries use indexes.")
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
@@ -23,7 +23,8 @@ Usage examples (PowerShell):
   python scripts/ingest_mock_data.py --cities Cluj --days 2 --dry-run
 
 Design considerations to avoid blocking MongoDB:
-  - Inserts performed in small batches (`--batch-size`) using `insert_many(..., ordered=False)`.
+  - Inserts performed in small batches (`--batch-size`) using `insert_many(..., ordered=False)`
+    through `MongoRepository.insert_observations`, which also updates the rollup collections.
   - Optional throttling between batches (`--throttle-ms`).
   - Document generation performed in memory prior to each batch write only.
 
@@ -42,10 +43,11 @@ from pymongo import MongoClient
 
 try:
     from core.settings import settings  # type: ignore
-    from db.mongo_repository import COLLECTION_NAME  # type: ignore
+    from db.mongo_repository import COLLECTION_NAME, MongoRepository  # type: ignore
 except Exception:  # pragma: no cover - fallback if imports fail
     settings = None
     COLLECTION_NAME = "weather_observations"
+    MongoRepository = None
 
 
 ICON_CHOICES_DAY = ["01d", "02d", "03d", "04d", "09d", "10d", "11d", "13d", "50d"]
@@ -173,14 +175,17 @@ def ingest(
     if dry_run:
         print(f"[DRY-RUN] Would insert {len(docs)} documents into database '{db_name}' collection '{COLLECTION_NAME}'.")
         return 0
-    client = MongoClient(mongo_uri)
-    col = client[db_name][COLLECTION_NAME]
+    # Through the repository when available so the storage layout and rollups stay consistent
+    repo = MongoRepository(mongo_uri, db_name) if MongoRepository is not None else None
+    col = MongoClient(mongo_uri)[db_name][COLLECTION_NAME] if repo is None else None
     inserted = 0
     for batch in chunked(docs, batch_size):
         if not batch:
             continue
-        res = col.insert_many(batch, ordered=False)
-        inserted += len(res.inserted_ids)
+        if repo is not None:
+            inserted += len(repo.insert_observations(batch))
+        else:
+            inserted += len(col.insert_many(batch, ordered=False).inserted_ids)
         if throttle_ms > 0:
             # Lightweight sleep without importing time earlier if unused
             import time
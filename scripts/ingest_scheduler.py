@@ -0,0 +1,270 @@
+"""Concurrent multi-city ingestion scheduler (replaces one `ingest_weather.py` process per city).
+
+Polls every city in a list once per `--interval` through the gRPC
+WeatherService (which persists each observation), over one shared
+`grpc.aio` channel:
+  - polls are spread evenly over the interval (city i starts at i * interval / N)
+    with +/- `--jitter` of the per-city slot, so 2,000 cities do not fire at once
+  - at most `--concurrency` RPCs are in flight
+  - a global token bucket caps the request rate at `--rate` per second
+    (the upstream calls-per-minute budget)
+  - a city answering UNAVAILABLE or NOT_FOUND backs off exponentially
+    (`--backoff-base` seconds doubling per failure, NOT_FOUND starting at one
+    interval), capped at `--max-backoff`; any success resets it
+  - every `--report-every` seconds the achieved poll rate is printed next to
+    the target rate (cities / interval), with errors, lag and backed-off cities
+
+Usage (PowerShell):
+  $env:GRPC_API_KEY="your_key"
+  python -m scripts.ingest_scheduler --cities-file cities.txt --interval 600 --rate 50 --concurrency 64
+  python -m scripts.ingest_scheduler --city London --city Paris --interval 120
+
+Stop with Ctrl+C.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import heapq
+import random
+import time
+from typing import Awaitable, Callable, Dict, Iterable, List, Tuple
+
+import grpc
+
+import proto.weather_pb2 as weather_pb2
+import proto.weather_pb2_grpc as weather_pb2_grpc
+from core.settings import settings
+
+BACKOFF_CODES = (grpc.StatusCode.UNAVAILABLE, grpc.StatusCode.NOT_FOUND)
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Poll many cities concurrently through the gRPC WeatherService.")
+    p.add_argument("--cities-file", help="File with one city per line (blank lines and # comments ignored).")
+    p.add_argument("--city", action="append", default=[], help="City to poll (repeatable).")
+    p.add_argument("--interval", type=float, default=600.0, help="Seconds between polls of the same city.")
+    p.add_argument("--address", default=settings.GRPC_ADDRESS, help="gRPC server host:port.")
+    p.add_argument("--concurrency", type=int, default=32, help="Maximum RPCs in flight.")
+    p.add_argument("--rate", type=float, default=1.0, help="Global request budget per second (0 = unlimited).")
+    p.add_argument("--jitter", type=float, default=0.2, help="Random offset as a fraction of the per-city slot.")
+    p.add_argument("--backoff-base", type=float, default=30.0, help="First UNAVAILABLE backoff in seconds.")
+    p.add_argument("--max-backoff", type=float, default=3600.0, help="Upper bound of a city's backoff in seconds.")
+    p.add_argument("--timeout", type=float, default=10.0, help="Deadline of each RPC in seconds.")
+    p.add_argument("--report-every", type=float, default=60.0, help="Seconds between rate reports.")
+    return p.parse_args()
+
+
+def load_cities(path: str | None, extra: Iterable[str] = ()) -> List[str]:
+    """Cities from `path` and `extra`, stripped and de-duplicated in order."""
+    names: List[str] = []
+    if path:
+        with open(path, encoding="utf-8") as fh:
+            names.extend(line.split("#", 1)[0].strip() for line in fh)
+    names.extend(c.strip() for c in extra)
+    return list(dict.fromkeys(name for name in names if name))
+
+
+class TokenBucket:
+    """Asyncio token bucket: `rate` tokens per second, bursts up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float | None = None, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._clock = clock
+        self._updated = clock()
+        self._lock = asyncio.Lock()
+        self.waited = 0.0
+
+    async def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        async with self._lock:  # FIFO: one waiter refills at a time
+            while True:
+                now = self._clock()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                delay = (1 - self._tokens) / self.rate
+                self.waited += delay
+                await asyncio.sleep(delay)
+
+
+class IngestScheduler:
+    """Schedules `fetch(city)` coroutines for every city once per `interval`.
+
+    `fetch` raises `grpc.aio.AioRpcError` (or any `grpc.RpcError` with a
+    `code()`) on failure.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[str], Awaitable[object]],
+        cities: List[str],
+        *,
+        interval: float,
+        concurrency: int = 32,
+        rate: float = 0.0,
+        jitter: float = 0.2,
+        backoff_base: float = 30.0,
+        max_backoff: float = 3600.0,
+        clock: Callable[[], float] = time.monotonic,
+        rng: random.Random | None = None,
+    ):
+        self._fetch = fetch
+        self.cities = cities
+        self.interval = interval
+        self._semaphore = asyncio.Semaphore(max(1, concurrency))
+        self._bucket = TokenBucket(rate, clock=clock)
+        self._jitter = jitter
+        self._backoff_base = backoff_base
+        self._max_backoff = max_backoff
+        self._clock = clock
+        self._rng = rng or random.Random()
+        self._failures: Dict[str, int] = {}
+        self._queue: List[Tuple[float, str]] = []
+        self._tasks: set = set()
+        self.polls = 0
+        self.errors: Dict[str, int] = {}
+        self.max_lag = 0.0
+
+    @property
+    def target_rate(self) -> float:
+        return len(self.cities) / self.interval if self.interval > 0 else 0.0
+
+    def _jittered(self, due: float) -> float:
+        slot = self.interval / max(1, len(self.cities))
+        return due + self._rng.uniform(-self._jitter, self._jitter) * slot
+
+    def initial_schedule(self, now: float) -> List[Tuple[float, str]]:
+        """Spread the first poll of every city evenly over one interval."""
+        slot = self.interval / max(1, len(self.cities))
+        self._queue = [(max(now, self._jittered(now + i * slot)), city) for i, city in enumerate(self.cities)]
+        heapq.heapify(self._queue)
+        return sorted(self._queue)
+
+    def next_due(self, city: str, due: float, code: grpc.StatusCode | None) -> float:
+        """When to poll `city` again after a poll scheduled at `due` ended with `code` (None = OK)."""
+        if code not in BACKOFF_CODES:
+            self._failures.pop(city, None)
+            return self._jittered(due + self.interval)
+        failures = self._failures[city] = self._failures.get(city, 0) + 1
+        # An unknown city will not appear within seconds: start NOT_FOUND at one interval
+        base = self.interval if code == grpc.StatusCode.NOT_FOUND else self._backoff_base
+        return self._clock() + min(self._max_backoff, base * 2 ** (failures - 1))
+
+    async def _poll(self, due: float, city: str) -> None:
+        code = None
+        try:
+            await self._fetch(city)
+        except grpc.RpcError as e:
+            code = e.code()
+            self.errors[code.name] = self.errors.get(code.name, 0) + 1
+        except Exception as e:  # keep the scheduler alive on client-side bugs
+            code = grpc.StatusCode.UNKNOWN
+            self.errors[type(e).__name__] = self.errors.get(type(e).__name__, 0) + 1
+        finally:
+            self.polls += 1
+            self._semaphore.release()
+        heapq.heappush(self._queue, (self.next_due(city, due, code), city))
+
+    async def run(self, stop: asyncio.Event) -> None:
+        """Dispatch due polls until `stop` is set, then wait for in-flight ones."""
+        if not self._queue:
+            self.initial_schedule(self._clock())
+        while not stop.is_set():
+            if not self._queue:  # every city is in flight
+                await asyncio.sleep(min(1.0, self.interval))
+                continue
+            due, city = self._queue[0]
+            wait = due - self._clock()
+            if wait > 0:
+                try:
+                    await asyncio.wait_for(stop.wait(), timeout=min(wait, 1.0))
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            heapq.heappop(self._queue)
+            await self._semaphore.acquire()
+            await self._bucket.acquire()
+            self.max_lag = max(self.max_lag, self._clock() - due)
+            task = asyncio.ensure_future(self._poll(due, city))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def report(self, window: float, polls_before: int) -> Dict[str, object]:
+        """Achieved vs target poll rate over the last `window` seconds, plus error and backoff counts."""
+        achieved = (self.polls - polls_before) / window if window > 0 else 0.0
+        stats = {
+            "target_per_s": round(self.target_rate, 3),
+            "achieved_per_s": round(achieved, 3),
+            "polls": self.polls,
+            "errors": dict(self.errors),
+            "in_flight": len(self._tasks),
+            "backed_off": len(self._failures),
+            "max_lag_s": round(self.max_lag, 2),
+            "throttled_s": round(self._bucket.waited, 2),
+        }
+        self.max_lag = 0.0
+        return stats
+
+
+async def report_loop(scheduler: IngestScheduler, every: float, stop: asyncio.Event) -> None:
+    polls_before, started = scheduler.polls, time.monotonic()
+    while not stop.is_set():
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=every)
+        except asyncio.TimeoutError:
+            pass
+        now = time.monotonic()
+        print(f"[scheduler] {scheduler.report(now - started, polls_before)}", flush=True)
+        polls_before, started = scheduler.polls, now
+
+
+async def main_async(args: argparse.Namespace) -> int:
+    cities = load_cities(args.cities_file, args.city)
+    if not cities:
+        print("No cities given (use --cities-file or --city).")
+        return 1
+    metadata = [("x-api-key", settings.GRPC_API_KEY or "changeme")]
+    async with grpc.aio.insecure_channel(args.address) as channel:
+        stub = weather_pb2_grpc.WeatherServiceStub(channel)
+
+        def fetch(city: str):
+            return stub.GetCurrentWeather(weather_pb2.GetWeatherRequest(city=city), metadata=metadata, timeout=args.timeout)
+
+        scheduler = IngestScheduler(
+            fetch, cities, interval=args.interval, concurrency=args.concurrency, rate=args.rate,
+            jitter=args.jitter, backoff_base=args.backoff_base, max_backoff=args.max_backoff,
+        )
+        if args.rate > 0 and scheduler.target_rate > args.rate:
+            print(f"Warning: {len(cities)} cities every {args.interval:g}s need {scheduler.target_rate:.2f} req/s, "
+                  f"above --rate {args.rate:g}; polls will lag.")
+        print(f"Polling {len(cities)} cities every {args.interval:g}s against {args.address} "
+              f"(target {scheduler.target_rate:.2f}/s, concurrency {args.concurrency}; Ctrl+C to stop)")
+        stop = asyncio.Event()
+        reporter = asyncio.ensure_future(report_loop(scheduler, args.report_every, stop))
+        try:
+            await scheduler.run(stop)
+        finally:
+            stop.set()
+            await reporter
+    return 0
+
+
+def main() -> int:
+    try:
+        return asyncio.run(main_async(parse_args()))
+    except KeyboardInterrupt:
+        print("Stopping ingestion.")
+        return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
@@ -5,7 +5,7 @@ Usage (PowerShell):
   $env:GRPC_API_KEY="your_key"
   python ingest_weather.py --city London --interval 120 --address localhost:50051
 
-Stop with Ctrl+C.
+Stop with Ctrl+C. For many cities use `scripts/ingest_scheduler.py` instead.
 """
 import time
 import argparse
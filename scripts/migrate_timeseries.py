@@ -0,0 +1,130 @@
+"""Migrate `weather_observations` from a regular to a native time-series collection.
+
+Time-series collections cannot be created by converting or renaming into an
+existing collection, so the migration:
+  1. renames the regular collection to `weather_observations_legacy`
+  2. creates the time-series collection (`observation_time` timeField, `meta`
+     metaField holding city/provider, granularity from MONGO_TIMESERIES_GRANULARITY)
+  3. copies documents across in `_id` order, batched with `insert_many(ordered=False)`
+  4. creates the time-series layout indexes
+  5. prints storage / index size before and after (collStats)
+
+The legacy collection is kept unless `--drop-legacy` is given, so the
+migration can be verified (or rolled back by renaming it back) first.
+Set MONGO_TIMESERIES=true for the server once the migration is done.
+
+Stop every writer (gRPC servers, ingestion jobs) before migrating: an insert
+between the rename and step 2 would implicitly recreate a regular
+collection. The script then refuses to continue instead of copying into it.
+
+Usage (PowerShell):
+  python -m scripts.migrate_timeseries --dry-run
+  python -m scripts.migrate_timeseries --batch-size 2000
+  python -m scripts.migrate_timeseries --drop-legacy
+"""
+
+from __future__ import annotations
+
+import argparse
+from typing import Any, Dict
+
+from pymongo import MongoClient
+from pymongo.database import Database
+from pymongo.errors import CollectionInvalid
+
+from core.settings import settings
+from db.mongo_repository import COLLECTION_NAME, MongoRepository, ObservationLayout
+
+LEGACY_COLLECTION_NAME = f"{COLLECTION_NAME}_legacy"
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Copy weather observations into a time-series collection.")
+    p.add_argument("--mongo-uri", default=settings.MONGO_URI, help="Mongo connection URI.")
+    p.add_argument("--db-name", default=settings.MONGO_APP_DB, help="Target database name.")
+    p.add_argument("--batch-size", type=int, default=1000, help="Documents per insert_many batch.")
+    p.add_argument("--dry-run", action="store_true", help="Only report what would be migrated.")
+    p.add_argument("--drop-legacy", action="store_true", help="Drop the legacy collection after a successful copy.")
+    return p.parse_args()
+
+
+def is_timeseries(db: Database, name: str) -> bool:
+    info = next(iter(db.list_collections(filter={"name": name})), None)
+    return bool(info and info.get("type") == "timeseries" and (info.get("options") or {}).get("timeseries"))
+
+
+def collection_stats(db: Database, name: str) -> Dict[str, Any]:
+    stats = db.command("collStats", name)
+    return {key: stats.get(key, 0) for key in ("count", "size", "storageSize", "totalIndexSize")}
+
+
+def print_stats(label: str, stats: Dict[str, Any]) -> None:
+    print(
+        f"{label}: {stats['count']} docs, size={stats['size']} B, "
+        f"storageSize={stats['storageSize']} B, indexes={stats['totalIndexSize']} B"
+    )
+
+
+def main() -> int:
+    args = parse_args()
+    db = MongoClient(args.mongo_uri)[args.db_name or "weatherdb"]
+    info = next(iter(db.list_collections(filter={"name": COLLECTION_NAME})), None)
+    if info is None:
+        print(f"No '{COLLECTION_NAME}' collection found; nothing to migrate.")
+        return 0
+    if info.get("type") == "timeseries":
+        print(f"'{COLLECTION_NAME}' is already a time-series collection.")
+        return 0
+    if LEGACY_COLLECTION_NAME in db.list_collection_names(filter={"name": LEGACY_COLLECTION_NAME}):
+        print(f"'{LEGACY_COLLECTION_NAME}' already exists; remove or restore it before migrating again.")
+        return 1
+
+    before = collection_stats(db, COLLECTION_NAME)
+    print_stats("Regular collection", before)
+    if args.dry_run:
+        print(f"Dry run: would copy {before['count']} documents in batches of {args.batch_size}.")
+        return 0
+
+    db[COLLECTION_NAME].rename(LEGACY_COLLECTION_NAME)
+    layout = ObservationLayout(timeseries=True)
+    try:
+        # Explicit create: a writer inserting right after the rename would implicitly
+        # create a regular collection, which must not be mistaken for the target
+        db.create_collection(COLLECTION_NAME, **layout.collection_options())
+    except CollectionInvalid:
+        print(
+            f"'{COLLECTION_NAME}' was recreated by another writer after the rename; stop every writer, "
+            f"merge it into '{LEGACY_COLLECTION_NAME}' and rename that back before retrying."
+        )
+        return 1
+    if not is_timeseries(db, COLLECTION_NAME):
+        print(f"'{COLLECTION_NAME}' is not a time-series collection after creating it; aborting.")
+        return 1
+    repo = MongoRepository(args.mongo_uri, args.db_name, timeseries=True)
+    target = db[COLLECTION_NAME]
+
+    copied = 0
+    batch = []
+    for doc in db[LEGACY_COLLECTION_NAME].find({}).sort("_id", 1).batch_size(args.batch_size):
+        batch.append(layout.to_storage(doc))
+        if len(batch) >= args.batch_size:
+            copied += len(target.insert_many(batch, ordered=False).inserted_ids)
+            batch = []
+            print(f"Copied {copied}/{before['count']}")
+    if batch:
+        copied += len(target.insert_many(batch, ordered=False).inserted_ids)
+    print(f"Copied {copied} documents; indexes: {repo.ensure_indexes()}")
+
+    print_stats("Regular collection", before)
+    print_stats("Time-series collection", collection_stats(db, COLLECTION_NAME))
+    if copied != before["count"]:
+        print(f"Copied count differs from source ({before['count']}); keeping '{LEGACY_COLLECTION_NAME}'.")
+        return 1
+    if args.drop_legacy:
+        db.drop_collection(LEGACY_COLLECTION_NAME)
+        print(f"Dropped '{LEGACY_COLLECTION_NAME}'.")
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
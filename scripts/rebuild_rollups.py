@@ -0,0 +1,43 @@
+"""Rebuild the 5-minute and daily temperature rollups from raw observations.
+
+Rollups are maintained on every insert; run this job after importing data
+directly into `weather_observations` (e.g. `ingest_mock_data.py`), after
+enabling MONGO_ROLLUPS on an existing database, or periodically (cron / Task
+Scheduler) to repair buckets whose incremental update failed.
+
+Usage (PowerShell):
+  python -m scripts.rebuild_rollups
+  python -m scripts.rebuild_rollups --city London --days 2
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from core.settings import settings
+from db.mongo_repository import MongoRepository
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Recompute rollup collections from raw observations.")
+    p.add_argument("--city", default=None, help="Only rebuild this city (default: all cities).")
+    p.add_argument("--days", type=int, default=None, help="Only rebuild the last N UTC days (default: everything).")
+    p.add_argument("--batch-size", type=int, default=1000, help="Observations per rollup bulk write.")
+    p.add_argument("--mongo-uri", default=settings.MONGO_URI, help="Mongo connection URI.")
+    p.add_argument("--db-name", default=settings.MONGO_APP_DB, help="Target database name.")
+    return p.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    repo = MongoRepository(args.mongo_uri, args.db_name, rollups=True)
+    print(f"Ensured indexes: {repo.ensure_indexes()}")
+    started = time.perf_counter()
+    read = repo.rebuild_rollups(city=args.city, days=args.days, batch_size=args.batch_size)
+    print(f"Rebuilt rollups from {read} observations in {time.perf_counter() - started:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
@@ -2,19 +2,48 @@ import grpc
 import requests
 
 class DummyContext:
-    def __init__(self):
+    def __init__(self, time_remaining=None, active=True):
         self.aborted = None
+        self._time_remaining = time_remaining
+        self._active = active
+        self.callbacks = []
+    def add_callback(self, callback):
+        self.callbacks.append(callback)
+        return True
+    def time_remaining(self):
+        return self._time_remaining
+    def is_active(self):
+        return self._active
     def abort(self, code, message):
         self.aborted = (code, message)
         raise RuntimeError(f"aborted: {code} {message}")
 
 
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+    def __call__(self):
+        return self.now
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class AsyncDummyContext(DummyContext):
+    async def abort(self, code, message):
+        super().abort(code, message)
+
+
 class RepoOK:
     def __init__(self):
         self.inserted = []
+        self.bulk_writes = 0
     def insert_observation(self, doc):
         self.inserted.append(doc)
         return "id"
+    def insert_observations(self, docs):
+        self.bulk_writes += 1
+        self.inserted.extend(docs)
+        return ["id"] * len(docs)
 
 class FakeRepo:
     def __init__(self):
@@ -26,6 +55,8 @@ class FakeRepo:
 class RepoPersistFail:
     def insert_observation(self, doc):
         raise RuntimeError("db down")
+    def insert_observations(self, docs):
+        raise RuntimeError("db down")
 
 class FakeProvider:
     def __init__(self, data=None, error=None):
@@ -54,13 +85,33 @@ def make_provider(data=None, error=None):
             }
     return P()
 
+def make_async_provider(data=None, error=None):
+    sync = make_provider(data=data, error=error)
+    class P:
+        async def get_current(self, city):
+            return sync.get_current(city)
+    return P()
+
+class AsyncRepoOK:
+    def __init__(self):
+        self.inserted = []
+        self.bulk_writes = 0
+    async def insert_observation(self, doc):
+        self.inserted.append(doc)
+        return "id"
+    async def insert_observations(self, docs):
+        self.bulk_writes += 1
+        self.inserted.extend(docs)
+        return ["id"] * len(docs)
+
 class DummyHandlerCallDetails:
     def __init__(self, metadata):
         self.invocation_metadata = metadata
 
 class DummyResp:
-    def __init__(self, status_code=200, json_data=None, json_error=False):
+    def __init__(self, status_code=200, json_data=None, json_error=False, headers=None):
         self.status_code = status_code
+        self.headers = headers or {}
         self._json_data = json_data or {"main": {"temp": 10}, "weather": [{}]}
         self._json_error = json_error
     def json(self):
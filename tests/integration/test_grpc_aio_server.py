@@ -0,0 +1,43 @@
+import asyncio
+import grpc
+import pytest
+import proto.weather_pb2 as weather_pb2
+import proto.weather_pb2_grpc as weather_pb2_grpc
+from weather_service.async_service import AsyncWeatherService
+from weather_service.interceptors import AsyncApiKeyInterceptor
+from tests.factories import raw_openweather_payload
+from tests.helpers import AsyncRepoOK
+
+
+class FakeAsyncProvider:
+    async def get_current(self, city):
+        await asyncio.sleep(0.05)
+        return raw_openweather_payload(city=city)
+
+
+async def _run_round_trip():
+    repo = AsyncRepoOK()
+    server = grpc.aio.server(interceptors=[AsyncApiKeyInterceptor(expected_key="test-grpc")])
+    weather_pb2_grpc.add_WeatherServiceServicer_to_server(AsyncWeatherService(repo, FakeAsyncProvider()), server)
+    port = server.add_insecure_port("[::]:0")
+    await server.start()
+    try:
+        async with grpc.aio.insecure_channel(f"localhost:{port}") as channel:
+            stub = weather_pb2_grpc.WeatherServiceStub(channel)
+            md = [("x-api-key", "test-grpc")]
+            # Many concurrent in-flight RPCs on a single event loop
+            responses = await asyncio.gather(*(
+                stub.GetCurrentWeather(weather_pb2.GetWeatherRequest(city="Berlin"), metadata=md)
+                for _ in range(50)
+            ))
+            assert all(r.city == "Berlin" for r in responses)
+            assert len(repo.inserted) == 50
+            with pytest.raises(grpc.aio.AioRpcError) as err:
+                await stub.GetCurrentWeather(weather_pb2.GetWeatherRequest(city="Berlin"), metadata=[("x-api-key", "bad")])
+            assert err.value.code() == grpc.StatusCode.UNAUTHENTICATED
+    finally:
+        await server.stop(0)
+
+
+def test_grpc_aio_round_trip():
+    asyncio.run(_run_round_trip())
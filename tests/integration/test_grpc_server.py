@@ -1,4 +1,5 @@
 import grpc
+import pytest
 from concurrent import futures
 import proto.weather_pb2 as weather_pb2
 import proto.weather_pb2_grpc as weather_pb2_grpc
@@ -13,6 +14,9 @@ class FakeRepo:
     def insert_observation(self, doc):
         self.inserted.append(doc)
         return "id"
+    def insert_observations(self, docs):
+        self.inserted.extend(docs)
+        return ["id"] * len(docs)
 
 
 class FakeProvider:
@@ -34,3 +38,57 @@ def test_grpc_round_trip():
         assert resp.temp_c is not None
     finally:
         server.stop(0)
+
+
+def test_grpc_batch_round_trip():
+    repo = FakeRepo()
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=2), interceptors=[ApiKeyInterceptor(expected_key="test-grpc")])
+    weather_pb2_grpc.add_WeatherServiceServicer_to_server(WeatherService(repo, FakeProvider()), server)
+    port = server.add_insecure_port("[::]:0")
+    server.start()
+    try:
+        channel = grpc.insecure_channel(f"localhost:{port}")
+        stub = weather_pb2_grpc.WeatherServiceStub(channel)
+        md = ("x-api-key", "test-grpc")
+        resp = stub.GetCurrentWeatherBatch(weather_pb2.GetWeatherBatchRequest(cities=["Berlin", "Paris"]), metadata=[md])
+        assert [r.weather.city for r in resp.results] == ["Berlin", "Paris"]
+        assert len(repo.inserted) == 2
+    finally:
+        server.stop(0)
+
+
+def test_grpc_subscribe_stream_shares_upstream_polls(monkeypatch):
+    from core.settings import settings
+    monkeypatch.setattr(settings, "SUBSCRIBE_MIN_INTERVAL_SECONDS", 0.05)
+
+    class CountingProvider(FakeProvider):
+        calls = 0
+        def get_current(self, city):
+            CountingProvider.calls += 1
+            return raw_openweather_payload(city=city, temp=float(CountingProvider.calls))
+
+    service = WeatherService(FakeRepo(), CountingProvider())
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=4), interceptors=[ApiKeyInterceptor(expected_key="test-grpc")])
+    weather_pb2_grpc.add_WeatherServiceServicer_to_server(service, server)
+    port = server.add_insecure_port("[::]:0")
+    server.start()
+    try:
+        channel = grpc.insecure_channel(f"localhost:{port}")
+        stub = weather_pb2_grpc.WeatherServiceStub(channel)
+        md = [("x-api-key", "test-grpc")]
+        req = weather_pb2.SubscribeWeatherRequest(cities=["Berlin"], min_interval_seconds=1)
+        streams = [stub.SubscribeWeather(req, metadata=md) for _ in range(2)]
+        firsts = [next(s) for s in streams]
+        seconds = [next(s) for s in streams]
+        for s in streams:
+            s.cancel()
+        assert all(u.weather.city == "Berlin" for u in firsts + seconds)
+        assert all(b.weather.temp_c > a.weather.temp_c for a, b in zip(firsts, seconds))
+        # Two subscribers, but polls are shared rather than doubled
+        assert CountingProvider.calls <= 4
+        with pytest.raises(grpc.RpcError) as err:
+            next(stub.SubscribeWeather(req, metadata=[("x-api-key", "bad")]))
+        assert err.value.code() == grpc.StatusCode.UNAUTHENTICATED
+    finally:
+        service.close()
+        server.stop(0)
@@ -0,0 +1,114 @@
+
+import asyncio
+import grpc
+import httpx
+import pytest
+import proto.weather_pb2 as weather_pb2
+from weather_service.async_service import AsyncWeatherService
+from weather_service.providers.async_openweather_client import AsyncOpenWeatherClient
+from weather_service.providers.cache import AsyncCachedProvider
+from weather_service.errors import (
+    UpstreamNotFoundError,
+    UpstreamRequestError,
+    UpstreamHttpError,
+    UpstreamInvalidResponse,
+)
+from tests.helpers import AsyncDummyContext, AsyncRepoOK, make_async_provider
+
+
+@pytest.mark.parametrize("error, expected_code", [
+    (UpstreamNotFoundError("x"), grpc.StatusCode.NOT_FOUND),
+    (UpstreamRequestError("x"), grpc.StatusCode.UNAVAILABLE),
+    (UpstreamHttpError(500, "x"), grpc.StatusCode.INTERNAL),
+    (UpstreamInvalidResponse("x"), grpc.StatusCode.INTERNAL),
+])
+def test_async_error_mapping_matches_sync(error, expected_code):
+    svc = AsyncWeatherService(AsyncRepoOK(), make_async_provider(error=error))
+    ctx = AsyncDummyContext()
+    with pytest.raises(RuntimeError):
+        asyncio.run(svc.GetCurrentWeather(weather_pb2.GetWeatherRequest(city="Berlin"), ctx))
+    assert ctx.aborted[0] == expected_code
+
+
+def test_async_happy_path_persists_normalized_city():
+    repo = AsyncRepoOK()
+    svc = AsyncWeatherService(repo, make_async_provider())
+    resp = asyncio.run(svc.GetCurrentWeather(weather_pb2.GetWeatherRequest(city="Constanța"), AsyncDummyContext()))
+    assert resp.city == "Constanta"
+    assert repo.inserted[0]["city"] == "Constanta"
+
+
+def _client_with(handler):
+    return AsyncOpenWeatherClient(api_key="k", base_url="http://x", transport=httpx.MockTransport(handler))
+
+
+def test_async_client_success_and_not_found():
+    def handler(request):
+        if request.url.params["q"] == "Nowhere":
+            return httpx.Response(404)
+        return httpx.Response(200, json={"main": {"temp": 1}, "name": request.url.params["q"]})
+
+    async def run():
+        client = _client_with(handler)
+        try:
+            data = await client.get_current("Berlin")
+            assert data["name"] == "Berlin"
+            assert "_fetched_at" in data
+            with pytest.raises(UpstreamNotFoundError):
+                await client.get_current("Nowhere")
+        finally:
+            await client.aclose()
+    asyncio.run(run())
+
+
+def test_async_client_network_error_maps_to_request_error():
+    def handler(request):
+        raise httpx.ConnectError("boom")
+
+    async def run():
+        client = _client_with(handler)
+        try:
+            with pytest.raises(UpstreamRequestError):
+                await client.get_current("Berlin")
+        finally:
+            await client.aclose()
+    asyncio.run(run())
+
+
+def test_async_cache_coalesces_concurrent_misses():
+    class SlowProvider:
+        calls = 0
+        async def get_current(self, city):
+            SlowProvider.calls += 1
+            await asyncio.sleep(0.01)
+            return {"name": city, "main": {"temp": 3}}
+
+    async def run():
+        cache = AsyncCachedProvider(SlowProvider(), ttl_seconds=60, max_entries=10)
+        results = await asyncio.gather(*(cache.get_current("Oslo") for _ in range(10)))
+        await cache.get_current("oslo")
+        return cache, results
+
+    cache, results = asyncio.run(run())
+    assert SlowProvider.calls == 1
+    assert len(results) == 10
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["coalesced"]) == (1, 1, 9)
+
+
+def test_async_batch_per_city_errors_and_bulk_write():
+    class Provider:
+        async def get_current(self, city):
+            if city == "Nowhere":
+                raise UpstreamNotFoundError("missing")
+            if city == "Broken":
+                raise RuntimeError("provider bug")
+            return {"name": city, "main": {"temp": 2.0}}
+
+    repo = AsyncRepoOK()
+    svc = AsyncWeatherService(repo, Provider())
+    req = weather_pb2.GetWeatherBatchRequest(cities=["Oslo", "Nowhere", "Broken"])
+    resp = asyncio.run(svc.GetCurrentWeatherBatch(req, AsyncDummyContext()))
+    assert [r.status_code for r in resp.results] == [0, grpc.StatusCode.NOT_FOUND.value[0], grpc.StatusCode.INTERNAL.value[0]]
+    assert repo.bulk_writes == 1
+    assert [d["city"] for d in repo.inserted] == ["Oslo"]
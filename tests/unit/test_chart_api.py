@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+import motor.motor_asyncio
+
+import db.clients as clients
+import UI.api.encoding as encoding
+from UI.api.caching import ResponseCache
+from UI.api.dependencies import get_current_service, get_repository, get_response_cache, get_series_service
+from UI.chart_api import app
+from UI.models.series import SeriesPoint
+from UI.services.series_arrays import SeriesArrays
+
+
+class FakeRepo:
+    def __init__(self):
+        self.latest = datetime(2024, 1, 1, 10, 0)
+
+    async def get_latest_observation(self, city, fields=None):
+        return {"observation_time": self.latest}
+
+
+class FakeSeriesService:
+    calls = 0
+
+    async def get_series_arrays(self, city, minutes, bucket):
+        FakeSeriesService.calls += 1
+        return SeriesArrays.from_rows([
+            {"timestamp": datetime(2024, 1, 1, 10, 0), "avg_temp_c": 12.345, "icon": "01d"},
+            {"timestamp": datetime(2024, 1, 1, 10, 5), "avg_temp_c": 12.0, "icon": None},
+            {"timestamp": datetime(2024, 1, 1, 10, 10), "avg_temp_c": 11.5, "icon": "01d"},
+        ])
+
+    async def get_multi_series_arrays(self, cities, minutes, bucket):
+        FakeSeriesService.calls += 1
+        rows = {"Oslo": [{"timestamp": datetime(2024, 1, 1, 10, 0), "avg_temp_c": 1.0}],
+                "Rome": [{"timestamp": datetime(2024, 1, 1, 10, 5), "avg_temp_c": 15.0, "icon": "01d"}]}
+        return {city: SeriesArrays.from_rows(rows.get(city, [])) for city in cities}
+
+    async def get_daily_series(self, city, days, tz=None):
+        return []
+
+
+class FakeCurrentService:
+    async def get_current(self, city):
+        return {"city": city}
+
+
+def override_dependencies(repo=None, cache=None):
+    repo = repo or FakeRepo()
+    cache = cache or ResponseCache(ttl=60)
+    app.dependency_overrides[get_series_service] = FakeSeriesService
+    app.dependency_overrides[get_current_service] = FakeCurrentService
+    app.dependency_overrides[get_repository] = lambda: repo
+    app.dependency_overrides[get_response_cache] = lambda: cache
+    return repo, cache
+
+
+def test_routes_use_injected_services():
+    override_dependencies()
+    try:
+        with TestClient(app) as client:
+            series = client.get("/api/series", params={"city": "Oslo"})
+            assert series.status_code == 200
+            assert series.json()["points"][0] == SeriesPoint(
+                timestamp=datetime(2024, 1, 1, 10, 0), avg_temp_c=12.345, icon="01d"
+            ).as_response()
+            assert client.get("/api/daily", params={"city": "Oslo"}).status_code == 404
+            assert client.get("/api/daily", params={"city": "Oslo", "tz": "Mars/Olympus"}).status_code == 422
+            assert client.get("/api/current", params={"city": "Oslo"}).json() == {"city": "Oslo"}
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_shared_async_client_is_lazy_and_closed_by_lifespan(monkeypatch):
+    created = []
+
+    class FakeMongoClient:
+        def __init__(self, uri, **options):
+            self.options = options
+            self.closed = False
+            created.append(self)
+
+        def __getitem__(self, name):  # database / collection lookups
+            return self
+
+        def close(self):
+            self.closed = True
+
+    monkeypatch.setattr(motor.motor_asyncio, "AsyncIOMotorClient", FakeMongoClient)
+    monkeypatch.setattr(clients.settings, "MONGO_MAX_POOL_SIZE", 7)
+    with TestClient(app) as client:
+        assert created == []  # nothing connects at startup
+        request = type("Req", (), {"app": client.app})()
+        repo = asyncio.run(get_repository(request))
+        assert asyncio.run(get_repository(request)) is repo
+        assert len(created) == 1 and created[0].options["maxPoolSize"] == 7
+    assert created[0].closed
+    assert getattr(app.state, "repo", None) is None
+
+
+def test_etag_304_and_response_cache_follow_latest_observation():
+    repo, cache = override_dependencies()
+    FakeSeriesService.calls = 0
+    try:
+        with TestClient(app) as client:
+            first = client.get("/api/series", params={"city": "Oslo"})
+            etag = first.headers["etag"]
+            assert first.status_code == 200 and first.headers["cache-control"] == "no-cache"
+
+            not_modified = client.get("/api/series", params={"city": "Oslo"}, headers={"If-None-Match": etag})
+            assert not_modified.status_code == 304 and not_modified.content == b""
+
+            cached = client.get("/api/series", params={"city": "Oslo"})
+            assert cached.json() == first.json() and FakeSeriesService.calls == 1
+            assert client.get("/api/series", params={"city": "Oslo", "bucket": 10}).headers["etag"] != etag
+
+            repo.latest = datetime(2024, 1, 1, 10, 5)  # new observation written elsewhere
+            fresh = client.get("/api/series", params={"city": "Oslo"}, headers={"If-None-Match": etag})
+            assert fresh.status_code == 200 and fresh.headers["etag"] != etag
+            assert FakeSeriesService.calls == 3
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_response_cache_ttl_and_invalidation():
+    now = [0.0]
+    cache = ResponseCache(ttl=5, max_entries=2, clock=lambda: now[0])
+    cache.put(("series", "Oslo", 60, 5), "e1", b"a")
+    cache.put(("current", "Rome"), "e2", b"b")
+    assert cache.get(("series", "Oslo", 60, 5), "e1") == b"a"
+    assert cache.get(("series", "Oslo", 60, 5), "stale") is None
+    cache.invalidate("Oslo")
+    assert cache.get(("series", "Oslo", 60, 5), "e1") is None
+    now[0] = 6.0
+    assert cache.get(("current", "Rome"), "e2") is None
+
+
+def test_columnar_series_format_and_compression(monkeypatch):
+    override_dependencies()
+    monkeypatch.setattr(encoding.settings, "UI_COMPRESS_MIN_BYTES", 0)
+    try:
+        with TestClient(app) as client:
+            columnar = client.get("/api/series", params={"city": "Oslo", "format": "columnar"})
+            body = columnar.json()
+            assert body["timestamps"] == [1704103200, 1704103500, 1704103800]
+            assert body["avg_temp_c"] == [12.35, 12.0, 11.5]
+            assert body["icons"] == ["01d"] and body["icon_index"] == [0, None, 0]
+            assert columnar.headers["content-encoding"] == "gzip"  # httpx sends Accept-Encoding: gzip
+            assert columnar.headers["vary"] == "Accept-Encoding"
+
+            plain = client.get("/api/series", params={"city": "Oslo", "format": "columnar"}, headers={"Accept-Encoding": "identity"})
+            assert "content-encoding" not in plain.headers and plain.json() == body
+            assert plain.headers["etag"] != columnar.headers["etag"]
+            assert client.get("/api/series", params={"city": "Oslo", "format": "xml"}).status_code == 422
+            if encoding.msgpack is None:
+                assert client.get("/api/series", params={"city": "Oslo", "format": "msgpack"}).status_code == 406
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_series_max_points_downsamples():
+    override_dependencies()
+    try:
+        with TestClient(app) as client:
+            full = client.get("/api/series", params={"city": "Oslo", "minutes": 10080}).json()
+            assert len(full["points"]) == full["source_points"] == 3 and "downsample" not in full
+            small = client.get("/api/series", params={"city": "Oslo", "max_points": 4, "downsample": "minmax"}).json()
+            assert small["source_points"] == 3  # already within budget
+            assert client.get("/api/series", params={"city": "Oslo", "max_points": 2}).status_code == 422
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_series_multi_aligns_cities_and_shares_cache_invalidation():
+    _, cache = override_dependencies()
+    try:
+        with TestClient(app) as client:
+            resp = client.get("/api/series/multi", params={"cities": "Oslo, Rome,Oslo"})
+            body = resp.json()
+            assert body["cities"] == ["Oslo", "Rome"]
+            assert body["timestamps"] == ["2024-01-01T10:00:00Z", "2024-01-01T10:05:00Z"]
+            assert body["series"]["Oslo"]["avg_temp_c"] == [1.0, None]
+            assert body["series"]["Rome"] == {"avg_temp_c": [None, 15.0], "icon": [None, "01d"]}
+            assert client.get("/api/series/multi", params={"cities": "Lima"}).status_code == 404
+            assert client.get("/api/series/multi", params={"cities": ",".join(f"c{i}" for i in range(20))}).status_code == 422
+
+            assert cache.stats()["entries"] == 1
+            cache.invalidate("Rome")
+            assert cache.stats()["entries"] == 0
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_negotiate_encoding():
+    assert encoding.negotiate_encoding(None) is None
+    assert encoding.negotiate_encoding("gzip, deflate") == "gzip"
+    assert encoding.negotiate_encoding("gzip;q=0, identity") is None
+    assert encoding.negotiate_encoding("br, gzip") == ("br" if encoding.brotli else "gzip")
@@ -0,0 +1,193 @@
+import asyncio
+from datetime import UTC, datetime, timedelta
+
+import grpc
+import pytest
+
+import proto.weather_pb2 as weather_pb2
+from weather_service.async_service import AsyncWeatherService
+from weather_service.errors import (
+    UpstreamCircuitOpenError,
+    UpstreamNotFoundError,
+    UpstreamRateLimitedError,
+    UpstreamRequestError,
+)
+from weather_service.providers.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    AsyncCircuitBreakerProvider,
+    CircuitBreaker,
+    CircuitBreakerProvider,
+)
+from weather_service.service import WeatherService
+from tests.helpers import AsyncDummyContext, DummyContext, FakeClock, RepoOK, make_async_provider, make_provider
+
+
+class FlakyProvider:
+    def __init__(self, clock, error=None, duration=0.0):
+        self.clock = clock
+        self.error = error
+        self.duration = duration
+        self.calls = 0
+    def get_current(self, city):
+        self.calls += 1
+        self.clock.now += self.duration
+        if self.error:
+            raise self.error
+        return {"name": city, "main": {"temp": 1.0, "humidity": 40}}
+
+
+class RepoWithLatest(RepoOK):
+    def __init__(self, doc=None):
+        super().__init__()
+        self.doc = doc
+        self.queried = []
+    def get_latest_observation(self, city, fields=None, ignore_case=False):
+        self.queried.append((city, fields))
+        if self.doc is None:
+            return None
+        stored = self.doc["city"]
+        matches = city.casefold() == stored.casefold() if ignore_case else city == stored
+        return self.doc if matches else None
+
+
+def make_breaker(clock, **kwargs):
+    options = dict(failure_threshold=2, slow_call_seconds=1.0, open_seconds=30, half_open_probes=1, clock=clock)
+    options.update(kwargs)
+    return CircuitBreaker(**options)
+
+
+def test_opens_after_consecutive_failures_and_fails_fast():
+    clock = FakeClock()
+    upstream = FlakyProvider(clock, error=UpstreamRequestError("timeout"))
+    provider = CircuitBreakerProvider(upstream, make_breaker(clock), clock=clock)
+    for _ in range(2):
+        with pytest.raises(UpstreamRequestError):
+            provider.get_current("Oslo")
+    assert provider.breaker.state == OPEN
+    with pytest.raises(UpstreamCircuitOpenError):
+        provider.get_current("Oslo")
+    assert upstream.calls == 2
+    assert provider.stats()["rejected"] == 1
+
+
+def test_slow_successes_open_the_circuit():
+    clock = FakeClock()
+    provider = CircuitBreakerProvider(FlakyProvider(clock, duration=1.5), make_breaker(clock), clock=clock)
+    provider.get_current("Oslo")
+    provider.get_current("Oslo")
+    assert provider.breaker.state == OPEN
+    assert provider.stats()["slow_calls"] == 2
+
+
+def test_not_found_and_rate_limits_do_not_count():
+    clock = FakeClock()
+    breaker = make_breaker(clock)
+    for error in (UpstreamNotFoundError("x"), UpstreamRateLimitedError("x"), UpstreamNotFoundError("x")):
+        assert breaker.allow()
+        breaker.record(0.1, error)
+    assert breaker.state == CLOSED
+
+
+def test_half_open_probe_closes_or_reopens():
+    clock = FakeClock()
+    breaker = make_breaker(clock, half_open_probes=1)
+    for _ in range(2):
+        breaker.allow()
+        breaker.record(0.1, UpstreamRequestError("x"))
+    clock.now = 30
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()  # only one probe at a time
+    breaker.record(0.1, UpstreamRequestError("x"))
+    assert breaker.state == OPEN
+    clock.now = 60
+    assert breaker.allow()
+    breaker.record(0.1)
+    assert breaker.state == CLOSED
+    assert breaker.stats()["opened"] == 2
+
+
+def test_straggler_success_does_not_close_an_opened_circuit():
+    clock = FakeClock()
+    breaker = make_breaker(clock, slow_call_seconds=5.0)
+    assert breaker.allow()  # call admitted at t=0 while closed
+    clock.now = 1
+    for _ in range(2):
+        breaker.allow()
+        breaker.record(0.1, UpstreamRequestError("x"))
+    assert breaker.state == OPEN
+    clock.now = 2
+    breaker.record(2.0)  # it succeeds after the circuit opened at t=1
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    clock.now = 31
+    breaker.record(30.5)  # a slow straggler while half-open is not a probe either
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+    breaker.record(0.1)
+    assert breaker.state == CLOSED
+
+
+def test_service_serves_last_observation_as_stale_while_open():
+    observed = datetime.now(UTC).replace(tzinfo=None) - timedelta(minutes=20)
+    repo = RepoWithLatest({"city": "Sao Paulo", "observation_time": observed, "temp_c": 24.5, "humidity_pct": 70})
+    svc = WeatherService(repo, make_provider(error=UpstreamCircuitOpenError("open")))
+    resp = svc.GetCurrentWeather(weather_pb2.GetWeatherRequest(city="São Paulo"), DummyContext())
+    assert resp.stale is True
+    assert (resp.city, resp.temp_c, resp.humidity_pct) == ("Sao Paulo", 24.5, 70)
+    assert resp.fetched_at_iso.startswith(observed.isoformat())
+    assert repo.queried[0][0] == "Sao Paulo"
+    assert repo.inserted == []  # stale answers are not persisted again
+
+
+def test_service_stale_lookup_ignores_the_request_spelling_case():
+    observed = datetime.now(UTC) - timedelta(minutes=5)
+    repo = RepoWithLatest({"city": "New York", "observation_time": observed, "temp_c": 18.0})
+    svc = WeatherService(repo, make_provider(error=UpstreamCircuitOpenError("open")))
+    resp = svc.GetCurrentWeather(weather_pb2.GetWeatherRequest(city="new york"), DummyContext())
+    assert resp.stale is True and resp.city == "New York"
+
+
+def test_batch_serves_stale_results_per_city_while_open():
+    repo = RepoWithLatest({"city": "Oslo", "observation_time": datetime.now(UTC), "temp_c": 4.0})
+    svc = WeatherService(repo, make_provider(error=UpstreamCircuitOpenError("open")))
+    resp = svc.GetCurrentWeatherBatch(weather_pb2.GetWeatherBatchRequest(cities=["oslo", "Bergen"]), DummyContext())
+    oslo, bergen = resp.results
+    assert oslo.status_code == grpc.StatusCode.OK.value[0] and oslo.weather.stale and oslo.weather.temp_c == 4.0
+    assert bergen.status_code == grpc.StatusCode.UNAVAILABLE.value[0]
+    assert repo.inserted == []
+
+
+def test_service_aborts_unavailable_without_recent_observation():
+    old = datetime.now(UTC) - timedelta(days=2)
+    for doc in (None, {"city": "Oslo", "observation_time": old, "temp_c": 1.0}):
+        svc = WeatherService(RepoWithLatest(doc), make_provider(error=UpstreamCircuitOpenError("open")))
+        ctx = DummyContext()
+        with pytest.raises(RuntimeError):
+            svc.GetCurrentWeather(weather_pb2.GetWeatherRequest(city="Oslo"), ctx)
+        assert ctx.aborted[0] == grpc.StatusCode.UNAVAILABLE
+
+
+def test_async_service_serves_stale_while_open():
+    class AsyncRepo:
+        async def get_latest_observation(self, city, fields=None, ignore_case=False):
+            return {"city": city, "observation_time": datetime.now(UTC), "temp_c": 3.0}
+
+    upstream = make_async_provider(error=UpstreamRequestError("timeout"))
+    provider = AsyncCircuitBreakerProvider(upstream, CircuitBreaker(failure_threshold=1, slow_call_seconds=0))
+    svc = AsyncWeatherService(AsyncRepo(), provider)
+
+    async def run():
+        ctx = AsyncDummyContext()
+        with pytest.raises(RuntimeError):
+            await svc.GetCurrentWeather(weather_pb2.GetWeatherRequest(city="Oslo"), ctx)
+        assert ctx.aborted[0] == grpc.StatusCode.UNAVAILABLE
+        return await svc.GetCurrentWeather(weather_pb2.GetWeatherRequest(city="Oslo"), AsyncDummyContext())
+
+    resp = asyncio.run(run())
+    assert resp.stale and resp.temp_c == 3.0
+
+    batch = asyncio.run(svc.GetCurrentWeatherBatch(weather_pb2.GetWeatherBatchRequest(cities=["Oslo"]), AsyncDummyContext()))
+    assert batch.results[0].status_code == grpc.StatusCode.OK.value[0] and batch.results[0].weather.stale
@@ -0,0 +1,225 @@
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import grpc
+import httpx
+import pytest
+
+import proto.weather_pb2 as weather_pb2
+from weather_service import deadlines
+from weather_service.errors import UpstreamDeadlineExceededError, UpstreamHttpError
+from weather_service.providers.async_openweather_client import AsyncOpenWeatherClient
+from weather_service.providers.cache import AsyncCachedProvider, CachedProvider
+from weather_service.providers.openweather_client import OpenWeatherClient
+from weather_service.service import WeatherService
+from tests.helpers import DummyContext, DummyResp, RepoOK
+
+
+class RecordingProvider:
+    def __init__(self):
+        self.cities = []
+        self.remaining = []
+    def get_current(self, city):
+        self.cities.append(city)
+        self.remaining.append(deadlines.remaining())
+        return {"name": city, "main": {"temp": 1.0, "humidity": 40}}
+
+
+class SlowProvider:
+    """Takes `delay` seconds, failing like the real clients when the caller's deadline is shorter."""
+    def __init__(self, delay):
+        self.delay = delay
+        self.calls = 0
+    def _wait(self):
+        self.calls += 1
+        left = deadlines.remaining()
+        return self.delay if left is None or left >= self.delay else left
+    def _answer(self, city, waited):
+        if waited < self.delay:
+            raise UpstreamDeadlineExceededError("deadline")
+        return {"name": city}
+    def get_current(self, city):
+        waited = self._wait()
+        time.sleep(waited)
+        return self._answer(city, waited)
+
+
+class AsyncSlowProvider(SlowProvider):
+    async def get_current(self, city):
+        waited = self._wait()
+        await asyncio.sleep(waited)
+        return self._answer(city, waited)
+
+
+def call_with_deadline(cache, seconds, outcomes, name):
+    with deadlines.deadline_scope(DummyContext(time_remaining=seconds)):
+        try:
+            outcomes[name] = cache.get_current("Oslo")
+        except UpstreamDeadlineExceededError as e:
+            outcomes[name] = e
+
+
+def test_timeout_is_capped_by_the_client_deadline():
+    assert deadlines.timeout(8.0) == 8.0  # no RPC deadline
+    with deadlines.deadline_scope(DummyContext(time_remaining=0.5)):
+        assert deadlines.timeout(8.0) <= 0.5
+        assert deadlines.timeout(0.1) == 0.1
+    with deadlines.deadline_scope(DummyContext(time_remaining=0.01)):
+        with pytest.raises(UpstreamDeadlineExceededError):
+            deadlines.timeout(8.0)
+    assert deadlines.remaining() is None
+
+
+def test_openweather_client_uses_remaining_time(monkeypatch):
+    seen = {}
+    def fake_get(url, params=None, timeout=None):
+        seen["timeout"] = timeout
+        return DummyResp(status_code=200)
+    client = OpenWeatherClient(api_key="k", base_url="http://x", timeout=8.0, connect_timeout=3.05)
+    monkeypatch.setattr(client._session, "get", fake_get)
+    with deadlines.deadline_scope(DummyContext(time_remaining=0.5)):
+        client.get_current("Berlin")
+    connect, read = seen["timeout"]
+    assert 0 < read <= 0.5 and connect <= read
+
+
+def test_service_skips_upstream_when_deadline_is_too_close(monkeypatch):
+    calls = []
+    client = OpenWeatherClient(api_key="k", base_url="http://x")
+    monkeypatch.setattr(client._session, "get", lambda *a, **kw: calls.append(1))
+    ctx = DummyContext(time_remaining=0.01)
+    with pytest.raises(RuntimeError):
+        WeatherService(RepoOK(), client).GetCurrentWeather(weather_pb2.GetWeatherRequest(city="Berlin"), ctx)
+    assert ctx.aborted[0] == grpc.StatusCode.DEADLINE_EXCEEDED
+    assert calls == []
+
+
+def test_service_skips_cancelled_requests():
+    provider = RecordingProvider()
+    ctx = DummyContext(active=False)
+    with pytest.raises(RuntimeError):
+        WeatherService(RepoOK(), provider).GetCurrentWeather(weather_pb2.GetWeatherRequest(city="Berlin"), ctx)
+    assert ctx.aborted[0] == grpc.StatusCode.CANCELLED
+    assert provider.cities == []
+
+
+def test_batch_workers_see_the_deadline_and_skip_when_cancelled():
+    provider = RecordingProvider()
+    svc = WeatherService(RepoOK(), provider)
+    svc.GetCurrentWeatherBatch(weather_pb2.GetWeatherBatchRequest(cities=["A", "B"]), DummyContext(time_remaining=5.0))
+    assert sorted(provider.cities) == ["A", "B"]
+    assert all(0 < r <= 5.0 for r in provider.remaining)
+
+    provider.cities.clear()
+    resp = svc.GetCurrentWeatherBatch(weather_pb2.GetWeatherBatchRequest(cities=["A", "B"]), DummyContext(active=False))
+    assert provider.cities == []
+    assert {r.status_code for r in resp.results} == {grpc.StatusCode.DEADLINE_EXCEEDED.value[0]}
+
+
+def test_coalesced_callers_keep_their_own_deadlines():
+    upstream = SlowProvider(0.3)
+    cache = CachedProvider(upstream, ttl_seconds=0)
+    outcomes = {}
+    leader = threading.Thread(target=call_with_deadline, args=(cache, 0.1, outcomes, "short"))
+    leader.start()
+    time.sleep(0.03)
+    # Longer deadline: not failed by the leader's deadline, fetches again under its own
+    call_with_deadline(cache, 2.0, outcomes, "long")
+    leader.join()
+    assert isinstance(outcomes["short"], UpstreamDeadlineExceededError)
+    assert outcomes["long"] == {"name": "Oslo"}
+    assert upstream.calls == 2
+    # The retrying follower is a miss of its own, not also a coalesced lookup
+    assert (cache.stats()["misses"], cache.stats()["coalesced"]) == (2, 0)
+
+    upstream.calls = 0
+    leader = threading.Thread(target=call_with_deadline, args=(cache, None, outcomes, "none"))
+    leader.start()
+    time.sleep(0.03)
+    started = time.monotonic()
+    # Shorter deadline: stops waiting for the leader when its own runs out
+    call_with_deadline(cache, 0.1, outcomes, "short")
+    assert time.monotonic() - started < 0.25
+    leader.join()
+    assert isinstance(outcomes["short"], UpstreamDeadlineExceededError)
+    assert outcomes["none"] == {"name": "Oslo"}
+    assert upstream.calls == 1
+
+
+def test_async_coalesced_callers_keep_their_own_deadlines():
+    upstream = AsyncSlowProvider(0.3)
+    cache = AsyncCachedProvider(upstream, ttl_seconds=0)
+
+    async def call(seconds, delay=0.0):
+        await asyncio.sleep(delay)
+        with deadlines.deadline_scope(DummyContext(time_remaining=seconds)):
+            try:
+                return await cache.get_current("Oslo")
+            except UpstreamDeadlineExceededError as e:
+                return e
+
+    async def run():
+        first = await asyncio.gather(call(0.1), call(2.0, delay=0.03))
+        second = await asyncio.gather(call(None), call(0.1, delay=0.03))
+        return first, second
+
+    (short, long), (none, follower) = asyncio.run(run())
+    assert isinstance(short, UpstreamDeadlineExceededError) and long == {"name": "Oslo"}
+    assert none == {"name": "Oslo"} and isinstance(follower, UpstreamDeadlineExceededError)
+    assert upstream.calls == 3
+    assert (cache.stats()["misses"], cache.stats()["coalesced"]) == (3, 0)
+
+
+def test_retries_stop_within_the_client_deadline():
+    hits = []
+
+    class Unavailable(BaseHTTPRequestHandler):
+        def do_GET(self):
+            hits.append(time.monotonic())
+            time.sleep(0.05)
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Unavailable)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    # Without a deadline, 5 retries with 0.2 s exponential backoff take over 6 s
+    client = OpenWeatherClient(
+        api_key="k", base_url=f"http://127.0.0.1:{server.server_port}/", timeout=0.5, connect_timeout=0.5,
+        max_retries=5, backoff_factor=0.2,
+    )
+    try:
+        started = time.monotonic()
+        with deadlines.deadline_scope(DummyContext(time_remaining=2.0)):
+            with pytest.raises(UpstreamHttpError):
+                client.get_current("Berlin")
+        elapsed = time.monotonic() - started
+    finally:
+        client.close()
+        server.shutdown()
+        server.server_close()
+    assert elapsed < 2.0
+    assert 1 < len(hits) < 6  # retried while a backoff plus a full attempt still fit
+
+
+def test_async_client_is_bounded_by_the_client_deadline():
+    async def hang(request):
+        await asyncio.sleep(5)
+        return httpx.Response(200, json={"main": {}})
+
+    async def run():
+        client = AsyncOpenWeatherClient(api_key="k", base_url="http://x", timeout=8.0, transport=httpx.MockTransport(hang))
+        try:
+            with deadlines.deadline_scope(DummyContext(time_remaining=0.2)):
+                await client.get_current("Berlin")
+        finally:
+            await client.aclose()
+
+    started = time.monotonic()
+    with pytest.raises(UpstreamDeadlineExceededError):
+        asyncio.run(run())
+    assert time.monotonic() - started < 1.0
@@ -0,0 +1,112 @@
+import asyncio
+import threading
+
+import pytest
+
+from weather_service.errors import UpstreamNotFoundError
+from weather_service.providers.hedging import AsyncHedgedProvider, HedgedProvider, LatencyWindow
+
+
+class SlowFirstProvider:
+    """The first call blocks until released; later calls answer at once."""
+
+    def __init__(self, error=None):
+        self.calls = 0
+        self.release = threading.Event()
+        self.error = error
+        self._lock = threading.Lock()
+    def get_current(self, city):
+        with self._lock:
+            self.calls += 1
+            first = self.calls == 1
+        if self.error:
+            raise self.error
+        if first:
+            self.release.wait(timeout=2)
+        return {"name": city, "call": 1 if first else 2}
+
+
+def test_latency_window_quantile():
+    window = LatencyWindow(size=100)
+    assert window.quantile(0.95) is None
+    for ms in range(1, 101):
+        window.add(ms / 1000)
+    assert window.quantile(0.95) == 0.095
+    assert window.quantile(0.5) == 0.05
+
+
+def test_slow_primary_is_hedged_and_the_hedge_wins():
+    upstream = SlowFirstProvider()
+    provider = HedgedProvider(upstream, initial_delay=0.05, min_delay=0.01, max_workers=4)
+    try:
+        assert provider.get_current("Oslo")["call"] == 2
+    finally:
+        upstream.release.set()
+        provider.close()
+    stats = provider.stats()
+    assert (stats["calls"], stats["hedged"], stats["hedge_wins"]) == (1, 1, 1)
+
+
+def test_fast_primary_and_early_errors_are_not_hedged():
+    upstream = SlowFirstProvider()
+    upstream.release.set()
+    provider = HedgedProvider(upstream, initial_delay=1.0, max_workers=4)
+    provider.get_current("Oslo")
+    upstream.error = UpstreamNotFoundError("nope")
+    with pytest.raises(UpstreamNotFoundError):
+        provider.get_current("Atlantis")
+    provider.close()
+    assert upstream.calls == 2
+    assert provider.stats()["hedged"] == 0
+
+
+def test_hedge_delay_follows_observed_latency():
+    provider = HedgedProvider(SlowFirstProvider(), initial_delay=1.0, min_delay=0.01, min_samples=5, max_workers=1)
+    assert provider.hedge_delay() == 1.0
+    for seconds in (0.1, 0.1, 0.1, 0.1, 0.3):
+        provider.latencies.add(seconds)
+    assert provider.hedge_delay() == 0.3
+    provider.close()
+
+
+def test_async_hedge_cancels_the_losing_request():
+    class AsyncSlowFirst:
+        def __init__(self):
+            self.calls = 0
+            self.cancelled = 0
+        async def get_current(self, city):
+            self.calls += 1
+            if self.calls == 1:
+                try:
+                    await asyncio.sleep(5)
+                except asyncio.CancelledError:
+                    self.cancelled += 1
+                    raise
+            return {"name": city, "call": self.calls}
+
+    upstream = AsyncSlowFirst()
+    provider = AsyncHedgedProvider(upstream, initial_delay=0.02, min_delay=0.01)
+
+    async def run():
+        result = await provider.get_current("Oslo")
+        await asyncio.sleep(0)  # let the cancellation reach the loser
+        return result
+
+    assert asyncio.run(run())["call"] == 2
+    assert upstream.cancelled == 1
+    assert provider.stats()["hedge_wins"] == 1
+    # Only the cancelled primary is sampled, with its elapsed time (not the fast hedge)
+    assert len(provider.latencies) == 1 and provider.latencies.quantile(0.5) >= 0.02
+
+
+def test_winning_hedges_do_not_pull_the_delay_down():
+    upstream = SlowFirstProvider()
+    provider = HedgedProvider(upstream, initial_delay=0.05, min_delay=0.01, max_workers=4)
+    try:
+        provider.get_current("Oslo")
+    finally:
+        upstream.release.set()
+        provider.close()
+    provider._pool.shutdown(wait=True)
+    # The instant hedge is not sampled; the primary is, once it finishes
+    assert len(provider.latencies) == 1 and provider.latencies.quantile(0.5) >= 0.05
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import asyncio
+import random
+
+import grpc
+
+from scripts.ingest_scheduler import IngestScheduler, TokenBucket, load_cities
+
+
+class FakeRpcError(grpc.RpcError):
+    def __init__(self, code):
+        self._code = code
+
+    def code(self):
+        return self._code
+
+
+def test_load_cities_dedupes_and_skips_comments(tmp_path):
+    path = tmp_path / "cities.txt"
+    path.write_text("London\n# capitals\n\nParis  # France\nLondon\n", encoding="utf-8")
+    assert load_cities(str(path), ["Rome", " Paris "]) == ["London", "Paris", "Rome"]
+
+
+def test_initial_schedule_spreads_cities_over_the_interval():
+    async def fetch(city):
+        return None
+
+    scheduler = IngestScheduler(fetch, [f"c{i}" for i in range(100)], interval=100.0, jitter=0.0)
+    due = [t for t, _ in scheduler.initial_schedule(now=0.0)]
+    assert due == [float(i) for i in range(100)]
+    assert scheduler.target_rate == 1.0
+
+
+def test_backoff_grows_per_city_and_resets_on_success():
+    now = [1000.0]
+
+    async def fetch(city):
+        return None
+
+    scheduler = IngestScheduler(
+        fetch, ["A", "B"], interval=60.0, jitter=0.0, backoff_base=10.0, max_backoff=35.0, clock=lambda: now[0]
+    )
+    unavailable = grpc.StatusCode.UNAVAILABLE
+    assert [scheduler.next_due("A", 1000.0, unavailable) for _ in range(3)] == [1010.0, 1020.0, 1035.0]
+    assert scheduler.next_due("B", 1000.0, grpc.StatusCode.NOT_FOUND) == 1035.0  # one interval, capped
+    assert scheduler.next_due("A", 1000.0, None) == 1060.0
+    assert scheduler.next_due("A", 1000.0, unavailable) == 1010.0
+    assert scheduler.next_due("B", 1000.0, grpc.StatusCode.INTERNAL) == 1060.0  # other errors keep the cadence
+
+
+def test_scheduler_polls_concurrently_and_backs_off_unknown_cities():
+    calls = []
+    in_flight = [0, 0]  # current, max
+
+    async def fetch(city):
+        calls.append(city)
+        in_flight[0] += 1
+        in_flight[1] = max(in_flight[1], in_flight[0])
+        await asyncio.sleep(0.02)
+        in_flight[0] -= 1
+        if city == "Atlantis":
+            raise FakeRpcError(grpc.StatusCode.NOT_FOUND)
+
+    async def run():
+        cities = ["Atlantis"] + [f"c{i}" for i in range(9)]
+        scheduler = IngestScheduler(
+            fetch, cities, interval=0.2, concurrency=3, jitter=0.1, backoff_base=0.05, rng=random.Random(1)
+        )
+        stop = asyncio.Event()
+        task = asyncio.ensure_future(scheduler.run(stop))
+        await asyncio.sleep(0.5)
+        stop.set()
+        await task
+        return scheduler
+
+    scheduler = asyncio.run(run())
+    assert in_flight[1] <= 3
+    assert all(calls.count(f"c{i}") >= 2 for i in range(9))
+    assert calls.count("Atlantis") < calls.count("c0")  # backed off after NOT_FOUND
+    report = scheduler.report(window=0.5, polls_before=0)
+    assert report["errors"] == {"NOT_FOUND": calls.count("Atlantis")} and report["backed_off"] == 1
+    assert report["target_per_s"] == 50.0 and report["polls"] == len(calls)
+
+
+def test_token_bucket_limits_rate():
+    async def run():
+        bucket = TokenBucket(rate=50.0, capacity=1)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        for _ in range(6):
+            await bucket.acquire()
+        return loop.time() - started
+
+    assert asyncio.run(run()) >= 0.09  # 5 refills at 50/s
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta
+
+from UI.services.live_feed import LiveFeedHub
+
+BASE = datetime(2024, 1, 1, 10, 0)
+
+
+def observation(minutes: int, temp: float) -> dict:
+    return {
+        "city": "Oslo",
+        "observation_time": BASE + timedelta(minutes=minutes),
+        "temp_c": temp,
+        "raw": {"main": {"temp": temp}, "weather": [{"icon": "01d"}]},
+    }
+
+
+class ChangeStreamRepo:
+    def __init__(self):
+        self.inserts: asyncio.Queue = asyncio.Queue()
+        self.watchers = 0
+
+    async def watch_observations(self, city):
+        self.watchers += 1
+        while True:
+            yield await self.inserts.get()
+
+
+class PollingRepo:
+    def __init__(self):
+        self.docs = [observation(0, 1.0)]
+
+    async def watch_observations(self, city):
+        raise RuntimeError("The $changeStream stage is only supported on replica sets")
+        yield  # pragma: no cover
+
+    async def get_latest_observation(self, city, fields=None):
+        return {"observation_time": self.docs[-1]["observation_time"]}
+
+    async def get_observations(self, city, start, end, fields=None):
+        return [d for d in self.docs if start <= d["observation_time"] <= end]
+
+
+def test_change_stream_is_shared_and_fanned_out():
+    async def scenario():
+        repo = ChangeStreamRepo()
+        changed = []
+        hub = LiveFeedHub(repo, on_change=changed.append)
+        first, second = hub.subscribe("Oslo"), hub.subscribe("Oslo")
+        await asyncio.sleep(0)
+        await repo.inserts.put(observation(1, 12.5))
+        events = [await asyncio.wait_for(q.get(), 1) for q in (first, second)]
+        current = await asyncio.wait_for(first.get(), 1)
+        stats = hub.stats()
+        hub.unsubscribe("Oslo", first)
+        hub.unsubscribe("Oslo", second)
+        await asyncio.sleep(0)
+        return repo, changed, events, current, stats, hub.stats()
+
+    repo, changed, events, current, stats, after = asyncio.run(scenario())
+    assert repo.watchers == 1 and changed == ["Oslo"]
+    assert events[0] == events[1] == ("observation", {"city": "Oslo", "timestamp": "2024-01-01T10:01:00Z", "temp_c": 12.5, "icon": "01d"})
+    assert current[0] == "current" and current[1]["temperature"]["temp_c"] == 12.5
+    assert stats["cities"] == {"Oslo": "change_stream"} and stats["subscribers"] == 2
+    assert after["cities"] == {}
+
+
+def test_polling_fallback_publishes_only_new_observations():
+    async def scenario():
+        repo = PollingRepo()
+        hub = LiveFeedHub(repo, poll_interval=0.01)
+        queue = hub.subscribe("Oslo")
+        await asyncio.sleep(0.05)
+        assert queue.empty()  # existing observations are not replayed
+        repo.docs += [observation(5, 2.0), observation(10, 3.0)]
+        events = [await asyncio.wait_for(queue.get(), 1) for _ in range(4)]
+        mode = hub.stats()["cities"]["Oslo"]
+        await hub.stop()
+        return events, mode
+
+    events, mode = asyncio.run(scenario())
+    assert mode == "polling"
+    assert [payload["temp_c"] for name, payload in events if name == "observation"] == [2.0, 3.0]
@@ -9,24 +9,61 @@ These tests exercise:
  - get_daily_series day aggregation and days < 1 edge
 """
 
+import asyncio
 from datetime import datetime, timedelta, UTC
 from typing import Any, Dict, List
+from zoneinfo import ZoneInfo
 
-from db.mongo_repository import MongoRepository
+import pytest
+from pymongo.errors import BulkWriteError
+
+from db.async_mongo_repository import AsyncMongoRepository
+from db.mongo_repository import (
+    MongoRepository,
+    OBSERVATION_INDEXES,
+    ObservationLayout,
+    PartialInsertError,
+    winning_plan_stages,
+)
 from tests.factories import observation_doc
 
 
+# $dateTrunc (unit "minute") counts bins of `binSize` minutes from this reference date;
+# emulated here independently of db.rollups so the fake does not mirror production code
+DATE_TRUNC_REFERENCE = datetime(2000, 1, 1, tzinfo=UTC)
+
+
+def _date_trunc_minutes(ts: datetime, bin_size: int) -> datetime:
+    minutes = int((ts - DATE_TRUNC_REFERENCE.replace(tzinfo=ts.tzinfo)).total_seconds() // 60)
+    return DATE_TRUNC_REFERENCE.replace(tzinfo=ts.tzinfo) + timedelta(minutes=minutes - minutes % bin_size)
+
+
 class FakeCursor:
-    def __init__(self, docs: List[Dict[str, Any]]):
+    def __init__(self, docs: List[Dict[str, Any]], projection: Dict[str, int] | None = None):
         self._docs = docs
+        self._projection = projection
 
     def sort(self, key: str, direction: int):  # direction: 1 asc / -1 desc
         reverse = direction == -1
         self._docs = sorted(self._docs, key=lambda d: d.get(key), reverse=reverse)
         return self
 
+    def batch_size(self, size: int):
+        return self
+
     def __iter__(self):
-        return iter(self._docs)
+        # Like Mongo, project after sorting
+        return iter(FakeCollectionExtended._project(self._docs, self._projection))
+
+
+def _doc_city(doc: Dict[str, Any]):
+    # Regular layout stores `city`, time-series layout stores `meta.city`
+    return doc.get("city", (doc.get("meta") or {}).get("city"))
+
+
+def _city_matches(condition: Any, city: str) -> bool:
+    # A city name or `{"$in": [...]}` (multi-city queries)
+    return city in condition["$in"] if isinstance(condition, dict) else city == condition
 
 
 class FakeCollectionExtended:
@@ -41,66 +78,125 @@ class FakeCollectionExtended:
         res = Res(); res.inserted_id = doc["_id"]
         return res
 
+    def create_indexes(self, indexes):
+        self.indexes = [ix.document for ix in indexes]
+        return [ix.document["name"] for ix in indexes]
+
+    def insert_many(self, docs: List[Dict[str, Any]], ordered: bool = True):
+        self.bulk_calls = getattr(self, "bulk_calls", 0) + 1
+        ids = [self.insert_one(d).inserted_id for d in docs]
+        class Res: pass
+        res = Res(); res.inserted_ids = ids
+        return res
+
+    @staticmethod
+    def _project(docs: List[Dict[str, Any]], projection: Dict[str, int] | None) -> List[Dict[str, Any]]:
+        if projection is None:
+            return docs
+        return [{k: v for k, v in d.items() if projection.get(k, 0)} for d in docs]
+
     # Filtering by city & time range, emulate pymongo cursor
-    def find(self, query: Dict[str, Any]):
-        city = query.get("city")
+    def find(self, query: Dict[str, Any], projection: Dict[str, int] | None = None):
+        city = query.get("city", query.get("meta.city"))
         time_range = query.get("observation_time", {})
         start = time_range.get("$gte", datetime.min.replace(tzinfo=UTC))
         end = time_range.get("$lte", datetime.max.replace(tzinfo=UTC))
-        out = [d for d in self.docs if d.get("city") == city and start <= d.get("observation_time") <= end]
-        return FakeCursor(out)
+        out = [d for d in self.docs if _city_matches(city, _doc_city(d)) and start <= d.get("observation_time") <= end]
+        return FakeCursor(out, projection)
 
-    def find_one(self, query: Dict[str, Any], sort=None):
-        city = query.get("city")
-        relevant = [d for d in self.docs if d.get("city") == city]
+    def find_one(self, query: Dict[str, Any], projection: Dict[str, int] | None = None, sort=None, collation=None):
+        city = query.get("city", query.get("meta.city"))
+        if collation is not None and collation.document.get("strength") == 2:
+            relevant = [d for d in self.docs if city.casefold() == _doc_city(d).casefold()]
+        else:
+            relevant = [d for d in self.docs if _city_matches(city, _doc_city(d))]
         if not relevant:
             return None
-        return sorted(relevant, key=lambda x: x.get("observation_time"), reverse=True)[0]
+        return self._project(sorted(relevant, key=lambda x: x.get("observation_time"), reverse=True), projection)[0]
 
-    # Simplified aggregate interpretation for temperature_series & daily_series
+    # Simplified aggregate interpretation for temperature_series & daily_series ($dateTrunc grouping)
     def aggregate(self, pipeline: List[Dict[str, Any]]):
-        # Detect which aggregation based on presence of 'slice' in _id
-        is_temp_series = any("slice" in (stage.get("$group", {}).get("_id", {})) for stage in pipeline)
-        if is_temp_series:
-            # Extract bucket_minutes from multiply expression if present; fallback 5
-            bucket_minutes = 5
-            # All docs already inserted; group by computed bucket
-            buckets: Dict[tuple, List[Dict[str, Any]]] = {}
-            for d in self.docs:
-                ts: datetime = d["observation_time"]
-                key = (ts.year, ts.month, ts.day, ts.hour, ts.minute // bucket_minutes)
-                buckets.setdefault(key, []).append(d)
-            for (y, m, day, hour, slice_idx), docs in sorted(buckets.items()):
-                avg_temp = sum(x.get("temp_c", 0.0) for x in docs) / max(len(docs), 1)
-                # icon extraction (raw.weather.0.icon) mimic first document behavior
-                first_raw = docs[0].get("raw", {})
-                icon = ((first_raw.get("weather") or [{}])[0]).get("icon")
-                yield {
-                    "timestamp": datetime(y, m, day, hour, slice_idx * bucket_minutes, tzinfo=UTC),
-                    "avg_temp": avg_temp,
-                    "first_icon": icon,
-                }
-        else:
-            # Daily series grouping by date
-            days: Dict[tuple, List[Dict[str, Any]]] = {}
-            for d in self.docs:
-                ts: datetime = d["observation_time"]
-                key = (ts.year, ts.month, ts.day)
-                days.setdefault(key, []).append(d)
-            for (y, m, day), docs in sorted(days.items()):
-                avg_temp = sum(x.get("temp_c", 0.0) for x in docs) / max(len(docs), 1)
-                icon = ((docs[0].get("raw", {}).get("weather") or [{}])[0]).get("icon")
-                yield {
-                    "day_start": datetime(y, m, day, tzinfo=UTC),
-                    "avg_temp": avg_temp,
-                    "first_ts": docs[0]["observation_time"],
-                    "first_icon": icon,
-                }
-
-
-def make_repo() -> MongoRepository:
-    repo = MongoRepository("mongodb://ignored")
+        match = pipeline[0]["$match"]
+        city_filter = match.get("city", match.get("meta.city"))
+        group_id = next(stage["$group"]["_id"] for stage in pipeline if "$group" in stage)
+        key_name = "timestamp" if "timestamp" in group_id else "day_start"
+        trunc = group_id[key_name]["$dateTrunc"]
+        by_city = "city" in group_id
+        groups: Dict[tuple, List[Dict[str, Any]]] = {}
+        for d in self.docs:
+            if not _city_matches(city_filter, _doc_city(d)):
+                continue
+            ts: datetime = d["observation_time"]
+            if trunc["unit"] == "minute":
+                start = _date_trunc_minutes(ts, trunc["binSize"])
+            else:
+                local = ts.astimezone(ZoneInfo(trunc["timezone"]))
+                start = local.replace(hour=0, minute=0, second=0, microsecond=0).astimezone(UTC)
+            groups.setdefault((start, _doc_city(d) if by_city else None), []).append(d)
+        for (start, city), docs in sorted(groups.items()):
+            avg_temp = sum(x.get("temp_c", 0.0) for x in docs) / max(len(docs), 1)
+            # icon extraction (raw.weather.0.icon) mimic first document behavior
+            icon = docs[0].get("icon") or ((docs[0].get("raw", {}).get("weather") or [{}])[0]).get("icon")
+            out = {key_name: start, "avg_temp": avg_temp, "first_icon": icon}
+            if key_name == "day_start":
+                out["first_ts"] = docs[0]["observation_time"]
+                out["date"] = start.astimezone(ZoneInfo(trunc["timezone"])).date().isoformat()
+            if by_city:
+                out["city"] = city
+            yield out
+
+
+class FakeRollupCollection:
+    """Applies rollup upserts ($inc / $min / $max / $setOnInsert) in memory."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.docs: Dict[tuple, Dict[str, Any]] = {}
+
+    def bulk_write(self, ops, ordered: bool = True):
+        for op in ops:
+            filt, update = op._filter, op._doc
+            key = (filt["city"], filt["bucket_start"])
+            doc = self.docs.get(key)
+            if doc is None:
+                doc = self.docs[key] = dict(filt, **update["$setOnInsert"])
+            for field, value in update["$inc"].items():
+                doc[field] = doc.get(field, 0) + value
+            for field, value in update["$min"].items():
+                doc[field] = min(doc.get(field, value), value)
+            for field, value in update["$max"].items():
+                doc[field] = max(doc.get(field, value), value)
+
+    def find(self, query: Dict[str, Any]):
+        window = query["bucket_start"]
+        out = [
+            d for d in self.docs.values()
+            if _city_matches(query["city"], d["city"]) and window["$gte"] <= d["bucket_start"] <= window["$lte"]
+        ]
+        return FakeCursor(out)
+
+    def delete_many(self, query: Dict[str, Any]):
+        self.docs = {k: d for k, d in self.docs.items() if query.get("city", d["city"]) != d["city"]}
+
+
+class FakeArchiveCollection:
+    def __init__(self):
+        self.docs: Dict[Any, Dict[str, Any]] = {}
+
+    def insert_many(self, docs: List[Dict[str, Any]], ordered: bool = True):
+        for d in docs:
+            self.docs[d["_id"]] = d
+
+    def find_one(self, query: Dict[str, Any]):
+        return self.docs.get(query["_id"])
+
+
+def make_repo(timeseries: bool = False, rollups: bool = False, raw_archive: bool = False) -> MongoRepository:
+    repo = MongoRepository("mongodb://ignored", timeseries=timeseries, rollups=rollups, raw_archive=raw_archive)
+    repo._archive = FakeArchiveCollection()  # type: ignore[attr-defined]
     repo._col = FakeCollectionExtended()  # type: ignore[attr-defined]
+    repo._rollup_5m = FakeRollupCollection("weather_rollups_5m")  # type: ignore[attr-defined]
+    repo._rollup_daily = FakeRollupCollection("weather_rollups_daily")  # type: ignore[attr-defined]
     return repo
 
 
@@ -117,12 +213,23 @@ def test_insert_observation_sets_defaults():
     assert isinstance(stored["observation_time"], datetime)
 
 
+def test_insert_observations_single_bulk_write():
+    repo = make_repo()
+    ids = repo.insert_observations([{"city": "A", "temp_c": 1.0}, {"city": "B", "temp_c": 2.0}])
+    assert len(ids) == 2
+    assert repo._col.bulk_calls == 1
+    assert all(isinstance(d["observation_time"], datetime) for d in repo._col.docs)
+    assert repo.insert_observations([]) == []
+
+
 def test_get_latest_observation():
     repo = make_repo()
     repo._col.insert_one(observation_doc(temp=1, minutes_ago=5))
     repo._col.insert_one(observation_doc(temp=2, minutes_ago=1))
     latest = repo.get_latest_observation("Berlin")
     assert latest["temp_c"] == 2
+    assert repo.get_latest_observation("berlin") is None
+    assert repo.get_latest_observation("berlin", ignore_case=True)["temp_c"] == 2
 
 
 def test_insert_observation_sets_defaults_when_missing():
@@ -213,3 +320,294 @@ def test_get_daily_series_groups_and_edge_days():
     temps_sorted = sorted(d["avg_temp_c"] for d in daily)
     assert temps_sorted == [10.0, 20.0]
     assert repo.get_daily_series("Paris", days=0) == []  # edge case
+
+
+def test_ensure_indexes_creates_city_time_compound_index():
+    repo = make_repo()
+    names = repo.ensure_indexes()
+    assert names == [ix.document["name"] for ix in OBSERVATION_INDEXES]
+    assert list(repo._col.indexes[0]["key"].items()) == [("city", 1), ("observation_time", -1)]
+    assert repo._col.indexes[1]["collation"]["strength"] == 2  # case-insensitive city lookups
+
+
+def test_winning_plan_stages_find_and_aggregate_shapes():
+    find_explain = {
+        "queryPlanner": {
+            "winningPlan": {"stage": "FETCH", "inputStage": {"stage": "IXSCAN", "indexName": "city_1_observation_time_-1"}},
+            "rejectedPlans": [{"stage": "COLLSCAN"}],
+        }
+    }
+    assert winning_plan_stages(find_explain) == {"FETCH", "IXSCAN"}
+    aggregate_explain = {
+        "stages": [
+            {"$cursor": {"queryPlanner": {"winningPlan": {"queryPlan": {"stage": "COLLSCAN"}}}}},
+            {"$group": {}},
+        ]
+    }
+    assert "COLLSCAN" in winning_plan_stages(aggregate_explain)
+
+
+def test_observation_layout_timeseries_round_trip():
+    layout = ObservationLayout(timeseries=True)
+    doc = {"city": "Oslo", "provider": "openweathermap", "temp_c": 1.5, "observation_time": datetime(2024, 1, 1, tzinfo=UTC)}
+    stored = layout.to_storage(dict(doc))
+    assert stored["meta"] == {"city": "Oslo", "provider": "openweathermap"}
+    assert "city" not in stored and "provider" not in stored
+    assert layout.from_storage(stored) == doc
+    assert layout.collection_options()["timeseries"]["timeField"] == "observation_time"
+    assert list(layout.indexes()[0].document["key"].items()) == [("meta.city", 1), ("observation_time", -1)]
+    regular = ObservationLayout()
+    assert regular.to_storage(doc) is doc and regular.collection_options() == {}
+
+
+def test_timeseries_repository_reads_regular_shape():
+    repo = make_repo(timeseries=True)
+    base = datetime(2024, 1, 1, 12, 0, tzinfo=UTC)
+    repo.insert_observations([
+        {"city": "Oslo", "provider": "openweathermap", "temp_c": t, "observation_time": base + timedelta(minutes=i)}
+        for i, t in enumerate([1.0, 2.0])
+    ])
+    assert all("meta" in d and "city" not in d for d in repo._col.docs)
+    obs = repo.get_observations("Oslo", base, base + timedelta(hours=1))
+    assert [o["temp_c"] for o in obs] == [1.0, 2.0]
+    assert all(o["city"] == "Oslo" and "meta" not in o for o in obs)
+    assert repo.get_latest_observation("Oslo")["temp_c"] == 2.0
+
+
+def test_rollups_serve_aligned_series_and_daily():
+    repo = make_repo(rollups=True)
+    base = datetime.now(UTC).replace(hour=10, minute=0, second=0, microsecond=0)
+    temps = [10.0, 12.0, 14.0, 20.0]
+    repo.insert_observations([
+        {"city": "Rome", "temp_c": t, "raw": {"weather": [{"icon": f"0{i + 1}d"}]}, "observation_time": base + timedelta(minutes=4 * i)}
+        for i, t in enumerate(temps)
+    ])
+    repo.insert_observation({"city": "Rome", "temp_c": 30.0, "observation_time": base + timedelta(minutes=16)})
+    five = repo._rollup_5m.docs[("Rome", base)]
+    assert (five["sum_temp"], five["count"], five["min_temp"], five["max_temp"], five["first_icon"]) == (22.0, 2, 10.0, 12.0, "01d")
+
+    series = repo.get_temperature_series("Rome", base, base + timedelta(hours=1), bucket_minutes=10)
+    assert [(b["timestamp"], b["avg_temp_c"], b["icon"]) for b in series] == [
+        (base, 12.0, "01d"),
+        (base + timedelta(minutes=10), 25.0, "04d"),
+    ]
+    daily = repo.get_daily_series("Rome", days=1)
+    assert daily == [{"date": base.date().isoformat(), "avg_temp_c": 17.2, "icon": "01d"}]
+
+
+def test_rollups_fall_back_to_raw_aggregation_when_unaligned():
+    repo = make_repo(rollups=True)
+    base = datetime(2024, 1, 1, 10, 0, tzinfo=UTC)
+    repo.insert_observation({"city": "Rome", "temp_c": 10.0, "observation_time": base + timedelta(minutes=3)})
+    repo._rollup_5m.docs.clear()  # rollups must not be consulted below
+    unaligned_start = base + timedelta(minutes=2)
+    assert len(repo.get_temperature_series("Rome", unaligned_start, base + timedelta(hours=1), bucket_minutes=5)) == 1
+    assert len(repo.get_temperature_series("Rome", base, base + timedelta(hours=1), bucket_minutes=7)) == 1
+    assert repo.get_temperature_series("Rome", base, base + timedelta(hours=1), bucket_minutes=5) == []
+
+
+def test_multi_city_series_from_one_query():
+    repo = make_repo(rollups=True)
+    base = datetime(2024, 1, 1, 10, 0, tzinfo=UTC)
+    repo.insert_observations([
+        {"city": "Rome", "temp_c": 10.0, "observation_time": base},
+        {"city": "Rome", "temp_c": 14.0, "observation_time": base + timedelta(minutes=6)},
+        {"city": "Oslo", "temp_c": -2.0, "observation_time": base + timedelta(minutes=1)},
+        {"city": "Kyiv", "temp_c": 5.0, "observation_time": base},
+    ])
+    end = base + timedelta(hours=1)
+    multi = repo.get_temperature_series_multi(["Rome", "Oslo", "Lima"], base, end, bucket_minutes=5)
+    assert list(multi) == ["Rome", "Oslo", "Lima"] and multi["Lima"] == []
+    assert multi["Rome"] == repo.get_temperature_series("Rome", base, end, bucket_minutes=5)
+    assert [b["avg_temp_c"] for b in multi["Oslo"]] == [-2.0]
+    # Unaligned buckets group the raw aggregation by city and bucket
+    raw = repo.get_temperature_series_multi(["Rome", "Oslo"], base, end, bucket_minutes=7)
+    assert [b["avg_temp_c"] for b in raw["Rome"]] == [10.0, 14.0] and [b["avg_temp_c"] for b in raw["Oslo"]] == [-2.0]
+    assert repo.get_latest_observation(["Rome", "Oslo"])["temp_c"] == 14.0
+
+
+def test_date_trunc_buckets_span_hours_and_match_rollups():
+    repo = make_repo(rollups=True)
+    base = datetime(2024, 1, 1, 10, 0, tzinfo=UTC)
+    repo.insert_observations([
+        {"city": "Rome", "temp_c": float(i), "observation_time": base + timedelta(minutes=25 * i)} for i in range(8)
+    ])
+    end = base + timedelta(hours=4)
+    from_rollups = repo.get_temperature_series("Rome", base, end, bucket_minutes=120)
+    assert [(b["timestamp"], b["avg_temp_c"]) for b in from_rollups] == [(base, 2.0), (base + timedelta(hours=2), 6.0)]
+    repo._rollups = False
+    assert repo.get_temperature_series("Rome", base, end, bucket_minutes=120) == from_rollups
+
+
+def test_date_trunc_buckets_follow_the_2000_reference_date():
+    repo = make_repo()
+    # Minute bins count from 2000-01-01T00:00Z: 2024-01-01T00:00Z is 12,623,040 minutes later,
+    # which is 3 (mod 7) and 0 (mod 45), so 7-minute bins start at 00:04, ..., 09:59, 10:06
+    # that day and 45-minute bins at 00:00, ..., 09:45, 10:30
+    stamps = ["2024-01-01T10:03:00", "2024-01-01T10:05:59", "2024-01-01T10:06:00", "2024-01-01T10:31:00"]
+    repo.insert_observations([
+        {"city": "Rome", "temp_c": float(i), "observation_time": datetime.fromisoformat(ts).replace(tzinfo=UTC)}
+        for i, ts in enumerate(stamps)
+    ])
+    start, end = datetime(2024, 1, 1, 9, tzinfo=UTC), datetime(2024, 1, 1, 12, tzinfo=UTC)
+
+    def buckets(size):
+        return [(b["timestamp"].strftime("%H:%M"), b["avg_temp_c"]) for b in repo.get_temperature_series("Rome", start, end, size)]
+
+    assert buckets(7) == [("09:59", 0.5), ("10:06", 2.0), ("10:27", 3.0)]
+    assert buckets(45) == [("09:45", 1.0), ("10:30", 3.0)]
+
+
+def test_daily_series_groups_by_local_calendar_day():
+    repo = make_repo(rollups=True)
+    today = datetime.now(UTC).replace(hour=12, minute=0, second=0, microsecond=0)
+    # 02:00 UTC is still the previous day in New York
+    repo.insert_observations([
+        {"city": "NYC", "temp_c": 4.0, "observation_time": today.replace(hour=2) - timedelta(days=1)},
+        {"city": "NYC", "temp_c": 8.0, "observation_time": today - timedelta(days=1)},
+    ])
+    utc_days = repo.get_daily_series("NYC", days=3)
+    local_days = repo.get_daily_series("NYC", days=3, tz="America/New_York")
+    assert [d["avg_temp_c"] for d in utc_days] == [6.0]
+    assert [d["avg_temp_c"] for d in local_days] == [4.0, 8.0]
+    assert local_days[1]["date"] == (today - timedelta(days=1)).date().isoformat()
+
+
+def test_partial_bulk_insert_archives_and_rolls_up_the_stored_documents():
+    repo = make_repo(rollups=True, raw_archive=True)
+    store = repo._col.insert_many
+
+    def insert_many(docs, ordered=True):
+        # Unordered insert: the duplicate (index 1) fails, the others are stored
+        store([d for i, d in enumerate(docs) if i != 1], ordered=ordered)
+        raise BulkWriteError({"writeErrors": [{"index": 1, "code": 11000, "errmsg": "duplicate key"}], "nInserted": 2})
+
+    repo._col.insert_many = insert_many
+    base = datetime(2024, 1, 1, 10, 0, tzinfo=UTC)
+    docs = [{"city": "Rome", "temp_c": float(i), "raw": {"n": i}, "observation_time": base} for i in range(3)]
+    with pytest.raises(PartialInsertError) as excinfo:
+        repo.insert_observations(docs)
+    assert excinfo.value.failed == 1
+    assert excinfo.value.inserted_ids == [str(docs[0]["_id"]), str(docs[2]["_id"])]
+    assert set(repo._archive.docs) == {docs[0]["_id"], docs[2]["_id"]}
+    assert repo._rollup_5m.docs[("Rome", base)]["sum_temp"] == 2.0  # 0.0 + 2.0, without the failed 1.0
+
+
+def test_rebuild_rollups_recomputes_from_raw_observations():
+    repo = make_repo(rollups=True)
+    base = datetime(2024, 1, 1, 10, 0, tzinfo=UTC)
+    repo.insert_observations([{"city": "Rome", "temp_c": 10.0, "observation_time": base}])
+    repo._rollup_5m.docs[("Rome", base)]["sum_temp"] = 999.0  # drifted rollup
+    assert repo.rebuild_rollups(city="Rome", batch_size=1) == 1
+    assert repo._rollup_5m.docs[("Rome", base)]["sum_temp"] == 10.0
+
+
+def test_raw_archive_keeps_hot_documents_compact_and_reads_compatible():
+    repo = make_repo(raw_archive=True)
+    base = datetime(2024, 1, 1, 10, 0, tzinfo=UTC)
+    raw = {
+        "name": "Rome", "base": "stations", "timezone": 3600,
+        "main": {"temp": 21.0, "feels_like": 20.5, "pressure": 1012, "humidity": 40},
+        "weather": [{"id": 800, "main": "Clear", "description": "clear sky", "icon": "01d"}],
+        "sys": {"sunrise": 1700000000, "sunset": 1700040000, "country": "IT"},
+        "coord": {"lat": 41.9, "lon": 12.5},
+    }
+    repo.insert_observations([{"city": "Rome", "temp_c": 21.0, "raw": dict(raw), "observation_time": base}])
+    hot = repo._col.docs[0]
+    assert "raw" not in hot and hot["raw_archived"] is True
+    assert (hot["icon"], hot["pressure_hpa"], hot["feels_like_c"], hot["lat"], hot["sunset"]) == ("01d", 1012, 20.5, 41.9, 1700040000)
+    archived = repo._archive.docs[hot["_id"]]
+    assert archived["encoding"] == "zlib+bson" and isinstance(archived["payload"], bytes)
+
+    # Range reads get a `raw` view rebuilt from the extras, the latest read the full payload
+    (obs,) = repo.get_observations("Rome", base, base + timedelta(minutes=1))
+    assert obs["raw"]["weather"][0]["icon"] == "01d" and obs["raw"]["main"]["pressure"] == 1012
+    assert repo.get_latest_observation("Rome")["raw"] == raw
+
+    repo._archive.docs.clear()  # payload lost: latest falls back to the view
+    assert repo.get_latest_observation("Rome")["raw"]["coord"] == {"lat": 41.9, "lon": 12.5}
+
+
+def test_field_projections_and_streaming_reads():
+    repo = make_repo(timeseries=True)
+    base = datetime(2024, 1, 1, 10, 0, tzinfo=UTC)
+    repo.insert_observations([
+        {"city": "Oslo", "temp_c": float(i), "raw": {"weather": [{"icon": "01d"}]}, "observation_time": base + timedelta(minutes=i)}
+        for i in range(3)
+    ])
+    assert repo._layout.projection(None) is None
+    assert repo._layout.projection(["city", "temp_c"]) == {"_id": 0, "meta": 1, "temp_c": 1}
+    stream = repo.iter_observations("Oslo", base, base + timedelta(hours=1), fields=("observation_time", "temp_c"))
+    assert next(stream) == {"observation_time": base, "temp_c": 0.0}
+    assert [d["temp_c"] for d in stream] == [1.0, 2.0]
+    latest = repo.get_latest_observation("Oslo", fields=("city", "temp_c"))
+    assert latest == {"city": "Oslo", "provider": None, "temp_c": 2.0}
+
+
+class AsyncCursorAdapter:
+    """Motor-style cursor over a sync fake cursor / iterable."""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def sort(self, key, direction):
+        self._cursor = self._cursor.sort(key, direction)
+        return self
+
+    def batch_size(self, size):
+        return self
+
+    async def to_list(self, length):
+        return list(self._cursor)
+
+    def __aiter__(self):
+        async def gen():
+            for doc in self._cursor:
+                yield doc
+        return gen()
+
+
+class AsyncCollectionAdapter:
+    def __init__(self, col):
+        self._col = col
+
+    def find(self, *args):
+        return AsyncCursorAdapter(self._col.find(*args))
+
+    def aggregate(self, pipeline):
+        return AsyncCursorAdapter(list(self._col.aggregate(pipeline)))
+
+    async def find_one(self, *args, **kwargs):
+        return self._col.find_one(*args, **kwargs)
+
+
+def test_async_repository_reads_match_sync_repository():
+    sync_repo = make_repo(rollups=True)
+    base = datetime.now(UTC).replace(hour=8, minute=0, second=0, microsecond=0)
+    sync_repo.insert_observations([
+        {"city": "Kyiv", "temp_c": float(i), "raw": {"weather": [{"icon": "02n"}]}, "observation_time": base + timedelta(minutes=3 * i)}
+        for i in range(6)
+    ])
+    repo = AsyncMongoRepository("mongodb://ignored", rollups=True)
+    repo._col = AsyncCollectionAdapter(sync_repo._col)  # type: ignore[attr-defined]
+    repo._rollup_5m = AsyncCollectionAdapter(sync_repo._rollup_5m)  # type: ignore[attr-defined]
+    repo._rollup_daily = AsyncCollectionAdapter(sync_repo._rollup_daily)  # type: ignore[attr-defined]
+    end = base + timedelta(hours=1)
+
+    async def reads():
+        return (
+            await repo.get_temperature_series("Kyiv", base, end, bucket_minutes=10),
+            await repo.get_temperature_series("Kyiv", base, end, bucket_minutes=7),
+            await repo.get_daily_series("Kyiv", days=1),
+            await repo.get_observations("Kyiv", base, end, fields=("temp_c",)),
+            await repo.get_latest_observation("Kyiv"),
+            await repo.get_temperature_series_multi(["Kyiv"], base, end, bucket_minutes=10),
+        )
+
+    series, raw_series, daily, observations, latest, multi = asyncio.run(reads())
+    assert multi == {"Kyiv": series}
+    assert series == sync_repo.get_temperature_series("Kyiv", base, end, bucket_minutes=10)
+    assert raw_series == sync_repo.get_temperature_series("Kyiv", base, end, bucket_minutes=7)
+    assert daily == sync_repo.get_daily_series("Kyiv", days=1)
+    assert [o["temp_c"] for o in observations] == [0.0, 1.0, 2.0, 3.0, 4.0, 5.0]
+    assert latest["temp_c"] == 5.0
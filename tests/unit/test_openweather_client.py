@@ -9,8 +9,8 @@ def test_openweather_success(monkeypatch):
     payload = {"main": {}, "name": "Berlin"}
     def fake_get(url, params, timeout):
         return DummyResponse(200, payload)
-    monkeypatch.setattr("weather_service.providers.openweather_client.requests.get", fake_get)
     client = ow.OpenWeatherClient(api_key="k", base_url="http://x")
+    monkeypatch.setattr(client._session, "get", fake_get)
     out = client.get_current("Berlin")
     assert out["name"] == "Berlin"
     assert "_fetched_at" in out
@@ -23,8 +23,8 @@ def test_openweather_success(monkeypatch):
 def test_openweather_http_errors(monkeypatch, status, exc_type):
     def fake_get(url, params, timeout):
         return DummyResponse(status, {"main": {}})
-    monkeypatch.setattr("weather_service.providers.openweather_client.requests.get", fake_get)
     client = ow.OpenWeatherClient(api_key="k", base_url="http://x")
+    monkeypatch.setattr(client._session, "get", fake_get)
     with pytest.raises(exc_type):
         client.get_current("Berlin")
 
@@ -32,8 +32,8 @@ def test_openweather_http_errors(monkeypatch, status, exc_type):
 def test_openweather_invalid_json(monkeypatch):
     def fake_get(url, params, timeout):
         return DummyResponse(200, json_data={"bad": 1}, raise_json=True)
-    monkeypatch.setattr("weather_service.providers.openweather_client.requests.get", fake_get)
     client = ow.OpenWeatherClient(api_key="k", base_url="http://x")
+    monkeypatch.setattr(client._session, "get", fake_get)
     with pytest.raises(ow.UpstreamInvalidResponse):
         client.get_current("Berlin")
 
@@ -41,7 +41,29 @@ def test_openweather_invalid_json(monkeypatch):
 def test_openweather_missing_main(monkeypatch):
     def fake_get(url, params, timeout):
         return DummyResponse(200, json_data={"name": "Berlin"})
-    monkeypatch.setattr("weather_service.providers.openweather_client.requests.get", fake_get)
     client = ow.OpenWeatherClient(api_key="k", base_url="http://x")
+    monkeypatch.setattr(client._session, "get", fake_get)
     with pytest.raises(ow.UpstreamInvalidResponse):
         client.get_current("Berlin")
+
+
+def test_openweather_uses_pooled_session_with_split_timeouts(monkeypatch):
+    calls = []
+    def fake_get(url, params, timeout):
+        calls.append(timeout)
+        return DummyResponse(200, {"main": {}, "name": "Berlin"})
+    client = ow.OpenWeatherClient(api_key="k", base_url="http://x", timeout=5, connect_timeout=1.5)
+    monkeypatch.setattr(client._session, "get", fake_get)
+    client.get_current("Berlin")
+    client.get_current("Berlin")
+    assert calls == [(1.5, 5), (1.5, 5)]
+
+
+def test_openweather_session_pool_and_retry_config():
+    client = ow.OpenWeatherClient(api_key="k", base_url="http://x", pool_size=7, max_retries=3)
+    adapter = client._session.get_adapter("https://api.example.com")
+    assert adapter._pool_maxsize == 7
+    assert adapter.max_retries.total == 3
+    assert "GET" in adapter.max_retries.allowed_methods
+    assert 503 in adapter.max_retries.status_forcelist
+    client.close()
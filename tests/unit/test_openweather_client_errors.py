@@ -6,6 +6,7 @@ from weather_service.errors import (
     UpstreamNotFoundError,
     UpstreamHttpError,
     UpstreamInvalidResponse,
+    UpstreamRateLimitedError,
     UpstreamRequestError,
 )
 from tests.helpers import DummyResp
@@ -14,8 +15,8 @@ from tests.helpers import DummyResp
 def test_404_raises_not_found(monkeypatch):
     def fake_get(url, params=None, timeout=None):
         return DummyResp(status_code=404)
-    monkeypatch.setattr(requests, "get", fake_get)
     client = OpenWeatherClient(api_key="k", base_url="http://x")
+    monkeypatch.setattr(client._session, "get", fake_get)
     with pytest.raises(UpstreamNotFoundError):
         client.get_current("Berlin")
 
@@ -23,17 +24,28 @@ def test_404_raises_not_found(monkeypatch):
 def test_500_raises_http_error(monkeypatch):
     def fake_get(url, params=None, timeout=None):
         return DummyResp(status_code=500)
-    monkeypatch.setattr(requests, "get", fake_get)
     client = OpenWeatherClient(api_key="k", base_url="http://x")
+    monkeypatch.setattr(client._session, "get", fake_get)
     with pytest.raises(UpstreamHttpError):
         client.get_current("Berlin")
 
 
+def test_429_raises_rate_limited_with_retry_after(monkeypatch):
+    def fake_get(url, params=None, timeout=None):
+        return DummyResp(status_code=429, headers={"Retry-After": "30"})
+    client = OpenWeatherClient(api_key="k", base_url="http://x")
+    monkeypatch.setattr(client._session, "get", fake_get)
+    with pytest.raises(UpstreamRateLimitedError) as exc:
+        client.get_current("Berlin")
+    assert exc.value.status_code == 429
+    assert exc.value.retry_after == 30.0
+
+
 def test_connection_error_maps_to_request_error(monkeypatch):
     def fake_get(url, params=None, timeout=None):
         raise requests.RequestException("boom")
-    monkeypatch.setattr(requests, "get", fake_get)
     client = OpenWeatherClient(api_key="k", base_url="http://x")
+    monkeypatch.setattr(client._session, "get", fake_get)
     with pytest.raises(UpstreamRequestError):
         client.get_current("Berlin")
 
@@ -41,8 +53,8 @@ def test_connection_error_maps_to_request_error(monkeypatch):
 def test_invalid_json_raises_invalid_response(monkeypatch):
     def fake_get(url, params=None, timeout=None):
         return DummyResp(status_code=200, json_error=True)
-    monkeypatch.setattr(requests, "get", fake_get)
     client = OpenWeatherClient(api_key="k", base_url="http://x")
+    monkeypatch.setattr(client._session, "get", fake_get)
     with pytest.raises(UpstreamInvalidResponse):
         client.get_current("Berlin")
 
@@ -50,7 +62,7 @@ def test_invalid_json_raises_invalid_response(monkeypatch):
 def test_missing_main_section_raises_invalid_response(monkeypatch):
     def fake_get(url, params=None, timeout=None):
         return DummyResp(status_code=200, json_data={"weather": [{}]})
-    monkeypatch.setattr(requests, "get", fake_get)
     client = OpenWeatherClient(api_key="k", base_url="http://x")
+    monkeypatch.setattr(client._session, "get", fake_get)
     with pytest.raises(UpstreamInvalidResponse):
         client.get_current("Berlin")
@@ -0,0 +1,87 @@
+import threading
+import pytest
+from weather_service.providers.cache import CachedProvider, normalize_city_key
+from weather_service.errors import UpstreamNotFoundError
+from tests.factories import raw_openweather_payload
+from tests.helpers import FakeClock
+
+
+class CountingProvider:
+    def __init__(self, error=None, gate=None):
+        self.calls = 0
+        self._error = error
+        self._gate = gate
+    def get_current(self, city):
+        self.calls += 1
+        if self._gate is not None:
+            self._gate.wait(timeout=2)
+        if self._error:
+            raise self._error
+        return raw_openweather_payload(city=city)
+
+
+def test_normalize_city_key():
+    assert normalize_city_key("  New   York ") == normalize_city_key("new york")
+
+
+def test_cache_hit_within_ttl_and_miss_after_expiry():
+    clock = FakeClock()
+    upstream = CountingProvider()
+    cache = CachedProvider(upstream, ttl_seconds=60, max_entries=10, clock=clock)
+    cache.get_current("London")
+    cache.get_current(" london ")
+    assert upstream.calls == 1
+    clock.now = 61
+    cache.get_current("London")
+    assert upstream.calls == 2
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+
+
+def test_cache_returns_copies():
+    cache = CachedProvider(CountingProvider(), ttl_seconds=60, max_entries=10)
+    first = cache.get_current("Berlin")
+    first["main"]["temp"] = -100
+    assert cache.get_current("Berlin")["main"]["temp"] != -100
+
+
+def test_lru_eviction_bounded_size():
+    upstream = CountingProvider()
+    cache = CachedProvider(upstream, ttl_seconds=60, max_entries=2)
+    cache.get_current("A")
+    cache.get_current("B")
+    cache.get_current("A")  # A most recently used
+    cache.get_current("C")  # evicts B
+    assert cache.stats()["size"] == 2
+    cache.get_current("A")
+    assert upstream.calls == 3
+    cache.get_current("B")
+    assert upstream.calls == 4
+
+
+def test_errors_are_not_cached():
+    upstream = CountingProvider(error=UpstreamNotFoundError("missing"))
+    cache = CachedProvider(upstream, ttl_seconds=60, max_entries=10)
+    for _ in range(2):
+        with pytest.raises(UpstreamNotFoundError):
+            cache.get_current("Nowhere")
+    assert upstream.calls == 2
+
+
+def test_concurrent_misses_are_coalesced():
+    gate = threading.Event()
+    upstream = CountingProvider(gate=gate)
+    cache = CachedProvider(upstream, ttl_seconds=60, max_entries=10)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_current("Paris"))) for _ in range(5)]
+    for t in threads:
+        t.start()
+    # Let the followers park on the leader's flight (counted once they are served)
+    threading.Event().wait(0.1)
+    gate.set()
+    for t in threads:
+        t.join(timeout=2)
+    assert upstream.calls == 1
+    assert len(results) == 5
+    assert cache.stats()["coalesced"] == 4
@@ -0,0 +1,135 @@
+import asyncio
+
+import pytest
+
+import proto.weather_pb2 as weather_pb2
+from core.settings import settings
+from weather_service.errors import UpstreamNotFoundError, UpstreamRequestError
+from weather_service.providers import (
+    AsyncCompositeProvider,
+    AsyncFakeWeatherProvider,
+    CompositeProvider,
+    FakeWeatherProvider,
+    available_providers,
+    create_async_provider,
+    create_provider,
+)
+from weather_service.providers.fake import fake_payload
+from weather_service.server import build_provider
+from weather_service.service import WeatherService
+from tests.helpers import DummyContext, RepoOK, make_provider
+
+
+def test_registry_creates_registered_providers():
+    assert {"openweathermap", "fake"} <= set(available_providers())
+    assert {"openweathermap", "fake"} <= set(available_providers(asynchronous=True))
+    assert isinstance(create_provider("fake"), FakeWeatherProvider)
+    assert isinstance(create_async_provider("fake", name="fake2"), AsyncFakeWeatherProvider)
+    with pytest.raises(ValueError, match="Unknown sync weather provider 'nope'"):
+        create_provider("nope")
+
+
+def test_fake_provider_is_deterministic_and_tagged():
+    provider = FakeWeatherProvider(name="local")
+    first, second = provider.get_current("Oslo"), provider.get_current(" oslo ")
+    assert first["main"] == second["main"]
+    assert first["_provider"] == "local"
+    assert fake_payload("Oslo", temp_offset=1.5)["main"]["temp"] == round(first["main"]["temp"] + 1.5, 2)
+    with pytest.raises(UpstreamNotFoundError):
+        provider.get_current("Atlantis")
+
+
+def test_service_persists_the_answering_provider():
+    repo = RepoOK()
+    svc = WeatherService(repo, FakeWeatherProvider(name="local"))
+    resp = svc.GetCurrentWeather(weather_pb2.GetWeatherRequest(city="Oslo"), DummyContext())
+    assert resp.city == "Oslo"
+    assert repo.inserted[0]["provider"] == "local"
+    assert "_provider" not in repo.inserted[0]["raw"]
+
+
+def test_service_stores_untagged_payloads_under_the_configured_provider(monkeypatch):
+    monkeypatch.setattr(settings, "WEATHER_PROVIDERS", "openweathermap,fake")
+    repo = RepoOK()
+    WeatherService(repo, make_provider()).GetCurrentWeather(weather_pb2.GetWeatherRequest(city="Oslo"), DummyContext())
+    assert repo.inserted[0]["provider"] == "openweathermap"
+
+
+def test_composite_first_returns_the_fastest_answer():
+    slow = FakeWeatherProvider(name="slow", latency=0.3, temp_offset=10)
+    fast = FakeWeatherProvider(name="fast")
+    composite = CompositeProvider([slow, fast], mode="first")
+    try:
+        assert composite.get_current("Oslo")["_provider"] == "fast"
+    finally:
+        composite.close()
+
+
+def test_composite_merge_averages_readings():
+    composite = CompositeProvider(
+        [FakeWeatherProvider(name="a"), FakeWeatherProvider(name="b", temp_offset=2.0)], mode="merge"
+    )
+    base = fake_payload("Oslo")["main"]["temp"]
+    merged = composite.get_current("Oslo")
+    composite.close()
+    assert merged["main"]["temp"] == round(base + 1.0, 2)
+    assert merged["_provider"] == "a+b"
+
+
+def test_composite_routes_to_fastest_healthy_and_fails_over():
+    broken = FakeWeatherProvider(name="broken", error_rate=1.0)
+    slow = FakeWeatherProvider(name="slow", latency=0.05)
+    fast = FakeWeatherProvider(name="fast")
+    composite = CompositeProvider([broken, slow, fast], fanout=1, unhealthy_after=2)
+    try:
+        for _ in range(4):
+            composite.get_current("Oslo")  # fails over from broken until it is demoted
+        assert composite.ranked() == ["fast", "slow", "broken"]
+        calls_before = broken.calls
+        assert composite.get_current("Oslo")["_provider"] == "fast"
+        assert broken.calls == calls_before
+        stats = composite.stats()["providers"]
+        assert stats["broken"]["healthy"] is False and stats["broken"]["errors"] == 2
+        assert stats["fast"]["p50_s"] is not None
+    finally:
+        composite.close()
+
+
+def test_composite_raises_best_ranked_error_when_all_fail():
+    composite = CompositeProvider([FakeWeatherProvider(name="a"), FakeWeatherProvider(name="b", error_rate=1.0)])
+    try:
+        with pytest.raises(UpstreamNotFoundError):
+            composite.get_current("Atlantis")
+        with pytest.raises(UpstreamRequestError):
+            CompositeProvider([FakeWeatherProvider(name="b", error_rate=1.0)]).get_current("Oslo")
+    finally:
+        composite.close()
+
+
+def test_async_composite_first_and_merge():
+    slow = AsyncFakeWeatherProvider(name="slow", latency=0.5)
+    fast = AsyncFakeWeatherProvider(name="fast", temp_offset=2.0)
+
+    async def run():
+        first = await AsyncCompositeProvider([slow, fast], mode="first").get_current("Oslo")
+        merged = await AsyncCompositeProvider([AsyncFakeWeatherProvider(name="a"), fast], mode="merge").get_current("Oslo")
+        return first, merged
+
+    first, merged = asyncio.run(run())
+    assert first["_provider"] == "fast"
+    assert merged["_provider"] == "a+fast"
+
+
+def test_build_provider_combines_configured_backends(monkeypatch):
+    monkeypatch.setattr(settings, "WEATHER_PROVIDERS", "fake, openweathermap, fake")
+    monkeypatch.setattr(settings, "PROVIDER_CACHE_TTL_SECONDS", 0)
+    provider, clients, wrappers = build_provider()
+    try:
+        assert isinstance(provider, CompositeProvider)
+        assert list(provider.providers) == ["fake", "openweathermap"]
+        assert [type(c).__name__ for c in clients] == ["FakeWeatherProvider", "OpenWeatherClient"]
+        assert ("composite", provider) in wrappers
+    finally:
+        provider.close()
+        for client in clients:
+            client.close()
@@ -0,0 +1,223 @@
+import asyncio
+import threading
+
+import pytest
+
+from core.settings import settings
+from weather_service.errors import UpstreamCircuitOpenError, UpstreamRateLimitedError, UpstreamRequestError
+from weather_service.providers.cache import CachedProvider
+from weather_service.providers.circuit_breaker import CircuitBreaker, CircuitBreakerProvider
+from weather_service.providers.rate_limit import (
+    AsyncRateLimitedProvider,
+    RateLimitedProvider,
+    RateLimiter,
+    parse_budgets,
+)
+from weather_service.server import build_provider
+from tests.factories import raw_openweather_payload
+from tests.helpers import FakeClock
+
+
+class CountingProvider:
+    def __init__(self, error=None):
+        self.calls = 0
+        self.error = error
+    def get_current(self, city):
+        self.calls += 1
+        if self.error:
+            raise self.error
+        return raw_openweather_payload(city=city)
+
+
+def test_parse_budgets():
+    assert parse_budgets(" openweather=60, backup=600 ,") == {"openweather": 60.0, "backup": 600.0}
+    with pytest.raises(ValueError):
+        parse_budgets("openweather")
+
+
+def test_reservations_queue_in_order_and_respect_max_wait():
+    clock = FakeClock()
+    limiter = RateLimiter(60, burst=2, clock=clock)  # one token per second
+    assert [limiter.reserve("k", max_wait=1.5) for _ in range(3)] == [0.0, 0.0, 1.0]
+    assert limiter.reserve("k", max_wait=1.5) is None  # next slot is 2s away
+    clock.now = 3.0
+    assert limiter.reserve("k", max_wait=1.5) == 0.0
+    stats = limiter.stats()
+    assert (stats["granted"], stats["throttled"], stats["rejected"]) == (4, 1, 1)
+    assert stats["max_wait_seconds"] == 1.0
+
+
+def test_per_key_budgets_are_independent_and_zero_is_unlimited():
+    clock = FakeClock()
+    limiter = RateLimiter(60, budgets={"fast": 600, "free": 0}, clock=clock)
+    assert limiter.reserve("default", max_wait=0) == 0.0
+    assert limiter.reserve("default", max_wait=0) is None
+    assert [limiter.reserve("fast", max_wait=0) for _ in range(10)] == [0.0] * 10
+    assert all(limiter.reserve("free", max_wait=0) == 0.0 for _ in range(100))
+
+
+def test_shared_state_file_spans_limiters(tmp_path):
+    pytest.importorskip("fcntl")
+    clock = FakeClock()
+    path = str(tmp_path / "budget.json")
+    first = RateLimiter(60, state_file=path, clock=clock)
+    second = RateLimiter(60, state_file=path, clock=clock)
+    assert first.reserve("k", max_wait=0) == 0.0
+    assert second.reserve("k", max_wait=0) is None
+
+
+def test_limiter_is_thread_safe():
+    limiter = RateLimiter(60, burst=50)
+    granted = []
+
+    def worker():
+        for _ in range(20):
+            if limiter.reserve("k", max_wait=0) == 0.0:
+                granted.append(1)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(granted) in (50, 51)  # the bucket may refill one token during the run
+
+
+def test_bypass_counter_is_thread_safe():
+    provider = RateLimitedProvider(CountingProvider(), RateLimiter(60), bypass=lambda: True)
+
+    def worker():
+        for _ in range(500):
+            provider.get_current("Oslo")
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert provider.stats()["bypassed"] == 4000
+
+
+def test_provider_waits_for_its_slot_then_rejects():
+    clock = FakeClock()
+    upstream = CountingProvider()
+    limiter = RateLimiter(60, clock=clock)
+    provider = RateLimitedProvider(upstream, limiter, max_wait=1.0, sleep=clock.sleep)
+    provider.get_current("Oslo")
+    provider.get_current("Oslo")  # sleeps one second for the refill
+    assert clock.now == 1.0
+    assert limiter.reserve() == 1.0  # another caller queues for the next slot
+    with pytest.raises(UpstreamRateLimitedError):
+        provider.get_current("Oslo")  # two seconds away, beyond max_wait
+    assert upstream.calls == 2
+
+
+def test_upstream_429_holds_back_later_calls():
+    clock = FakeClock()
+    upstream = CountingProvider(error=UpstreamRateLimitedError(retry_after=30))
+    provider = RateLimitedProvider(upstream, RateLimiter(600, clock=clock), max_wait=5.0, sleep=clock.sleep)
+    with pytest.raises(UpstreamRateLimitedError):
+        provider.get_current("Oslo")
+    upstream.error = None
+    with pytest.raises(UpstreamRateLimitedError):
+        provider.get_current("Oslo")  # budget emptied for ~30s, beyond max_wait
+    assert upstream.calls == 1
+    assert provider.stats()["upstream_429"] == 1
+
+
+def test_open_circuit_calls_do_not_consume_tokens():
+    clock = FakeClock()
+    upstream = CountingProvider(error=UpstreamRequestError("down"))
+    breaker = CircuitBreakerProvider(upstream, CircuitBreaker(failure_threshold=2, open_seconds=30, clock=clock), clock=clock)
+    limiter = RateLimiter(60, clock=clock)
+    provider = RateLimitedProvider(breaker, limiter, max_wait=5.0, sleep=clock.sleep, bypass=lambda: breaker.breaker.rejecting)
+    for _ in range(2):
+        with pytest.raises(UpstreamRequestError):
+            provider.get_current("Oslo")
+    assert clock.now == 1.0  # the second failing call waited for its token
+    for _ in range(5):
+        with pytest.raises(UpstreamCircuitOpenError):
+            provider.get_current("Oslo")
+    assert clock.now == 1.0  # no waiting while the circuit is open
+    assert limiter.stats()["granted"] == 2
+    assert provider.stats()["bypassed"] == 5
+    assert upstream.calls == 2
+
+
+def test_build_provider_limits_outside_the_breaker(monkeypatch):
+    monkeypatch.setattr(settings, "WEATHER_PROVIDERS", "fake")
+    monkeypatch.setattr(settings, "PROVIDER_RATE_LIMIT_PER_MINUTE", 60)
+    monkeypatch.setattr(settings, "PROVIDER_CACHE_TTL_SECONDS", 0)
+    provider, _, wrappers = build_provider()
+    labels = [label for label, _ in wrappers]
+    assert labels == ["fake circuit breaker", "fake rate limit"]
+    breaker = dict(wrappers)["fake circuit breaker"].breaker
+    for _ in range(settings.PROVIDER_BREAKER_FAILURE_THRESHOLD):
+        breaker.allow()
+        breaker.record(0.1, UpstreamRequestError("down"))
+    with pytest.raises(UpstreamCircuitOpenError):
+        provider.get_current("Oslo")
+    assert provider.stats()["granted"] == 0 and provider.stats()["bypassed"] == 1
+
+
+def test_cache_serves_stale_entry_when_rate_limited():
+    clock = FakeClock()
+    upstream = CountingProvider()
+    cache = CachedProvider(upstream, ttl_seconds=60, max_entries=10, stale_seconds=300, clock=clock)
+    fresh = cache.get_current("Oslo")
+    clock.now = 120
+    upstream.error = UpstreamRateLimitedError("budget")
+    assert cache.get_current("Oslo") == fresh
+    assert cache.stats()["stale_served"] == 1
+    clock.now = 400  # beyond the stale window
+    with pytest.raises(UpstreamRateLimitedError):
+        cache.get_current("Oslo")
+
+
+def test_async_provider_rejects_without_blocking_the_loop():
+    class AsyncUpstream:
+        calls = 0
+        async def get_current(self, city):
+            self.calls += 1
+            return raw_openweather_payload(city=city)
+
+    upstream = AsyncUpstream()
+    provider = AsyncRateLimitedProvider(upstream, RateLimiter(60), max_wait=0)
+
+    async def run():
+        await provider.get_current("Oslo")
+        with pytest.raises(UpstreamRateLimitedError):
+            await provider.get_current("Oslo")
+
+    asyncio.run(run())
+    assert upstream.calls == 1
+
+
+def test_async_provider_uses_the_state_file_off_the_loop(tmp_path):
+    pytest.importorskip("fcntl")
+
+    class ThreadRecordingLimiter(RateLimiter):
+        threads = []
+        def _with_buckets(self, update):
+            self.threads.append(threading.get_ident())
+            return super()._with_buckets(update)
+
+    class AsyncUpstream:
+        error = UpstreamRateLimitedError(retry_after=30)
+        async def get_current(self, city):
+            raise self.error
+
+    limiter = ThreadRecordingLimiter(600, state_file=str(tmp_path / "budget.json"))
+    provider = AsyncRateLimitedProvider(AsyncUpstream(), limiter, max_wait=0)
+
+    async def run():
+        with pytest.raises(UpstreamRateLimitedError):
+            await provider.get_current("Oslo")
+        with pytest.raises(UpstreamRateLimitedError):
+            await provider.get_current("Oslo")  # budget held back by the 429
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(run())
+    assert len(limiter.threads) == 3  # reserve, penalize, rejected reserve
+    assert loop_thread not in limiter.threads
+    assert provider.stats()["upstream_429"] == 1 and provider.stats()["rejected"] == 1
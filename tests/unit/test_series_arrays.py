@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime
+
+import pytest
+
+import UI.services.series_arrays as series_arrays
+from db.rollups import bucket_floor
+from UI.models.series import SeriesPoint
+from UI.services.downsampling import downsample, lttb_indices, minmax_indices
+from UI.services.series_arrays import SeriesArrays, align_series, bucket_observations, epoch_seconds
+from UI.services.weather_series_service import WeatherSeriesService
+
+BASE = epoch_seconds(datetime(2024, 1, 1, 10, 0))
+
+
+@pytest.fixture(params=["numpy", "python"])
+def backend(request, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(series_arrays, "np", None)
+    return request.param
+
+
+def test_bucket_observations_matches_date_trunc_bucketing(backend):
+    # 10:00 UTC is a multiple of 120 minutes from 2000-01-01; buckets may span hours
+    times = [BASE + 60, BASE + 120, BASE + 8 * 60, BASE + 119 * 60, BASE + 121 * 60]
+    arrays = bucket_observations(times, [10.0, 12.0, 11.0, 9.0, 8.0], 120)
+    columns = arrays.to_columns()
+    assert columns["timestamps"] == [BASE, BASE + 120 * 60]
+    assert columns["avg_temp_c"] == [10.5, 8.0]
+    assert columns["min_temp_c"] == [9.0, 8.0] and columns["max_temp_c"] == [12.0, 8.0]
+    assert columns["count"] == [4, 1]
+    odd = bucket_observations(times, [1.0] * 5, 7).to_columns()["timestamps"]
+    assert odd == sorted({epoch_seconds(bucket_floor(datetime.utcfromtimestamp(t), 7)) for t in times})
+    assert len(bucket_observations([], [], 5)) == 0
+
+
+def test_points_match_series_point_response(backend):
+    rows = [
+        {"timestamp": datetime(2024, 1, 1, 10, 0), "avg_temp_c": 12.345, "icon": "01d"},
+        {"timestamp": datetime(2024, 1, 1, 10, 5), "avg_temp_c": 11.0, "icon": None},
+    ]
+    arrays = SeriesArrays.from_rows(rows)
+    assert arrays.to_points() == [SeriesPoint(**row).as_response() for row in rows]
+    assert arrays.to_rows() == [{**row, "avg_temp_c": float(row["avg_temp_c"])} for row in rows]
+    assert arrays.to_columns()["icon_index"] == [0, None] and "min_temp_c" not in arrays.to_columns()
+
+
+def test_service_buckets_raw_observations_when_aggregation_is_empty(backend):
+    class Repo:
+        async def get_temperature_series(self, city, start, end, bucket_minutes):
+            return []
+
+        async def iter_observations(self, city, start, end, fields=None):
+            for minute, temp in ((0, 10.0), (2, 14.0), (5, 8.0), (6, None)):
+                yield {"observation_time": datetime(2024, 1, 1, 10, minute), "temp_c": temp}
+
+    points = asyncio.run(WeatherSeriesService(Repo()).get_bucketed_series("Oslo", 60, 5))
+    assert [(p.timestamp, p.avg_temp_c) for p in points] == [
+        (datetime(2024, 1, 1, 10, 0), 12.0),
+        (datetime(2024, 1, 1, 10, 5), 8.0),
+    ]
+
+
+def test_lttb_keeps_endpoints_and_spikes(backend):
+    x = list(range(1000))
+    y = [0.0] * 1000
+    y[500] = 25.0
+    keep = lttb_indices(x, y, 50)
+    assert len(keep) == 50 and keep[0] == 0 and keep[-1] == 999 and 500 in keep
+    assert keep == sorted(set(keep))
+    assert lttb_indices(x[:10], y[:10], 50) == list(range(10))
+
+
+def test_minmax_keeps_bucket_extremes(backend):
+    y = [float(i % 7) for i in range(1000)]
+    y[321] = -5.0
+    keep = minmax_indices(y, 100)
+    assert len(keep) <= 100 and keep[0] == 0 and keep[-1] == 999 and 321 in keep
+
+
+def test_downsample_subsets_every_column(backend):
+    times = [BASE + i * 60 for i in range(600)]
+    arrays = bucket_observations(times, [float(i % 13) for i in range(600)], 1)
+    small = downsample(arrays, 40, "minmax").to_columns()
+    assert len(small["timestamps"]) <= 40 and len(small["count"]) == len(small["timestamps"])
+    assert small["timestamps"] == sorted(small["timestamps"])
+    assert downsample(arrays, 1000) is arrays
+
+
+def test_align_series_fills_missing_buckets(backend):
+    rome = bucket_observations([BASE, BASE + 300], [10.0, 12.0], 5)
+    oslo = bucket_observations([BASE + 300, BASE + 600], [-1.0, -2.0], 5)
+    axis, aligned = align_series({"Rome": rome, "Oslo": oslo, "Lima": SeriesArrays.from_rows([])})
+    assert axis == [BASE, BASE + 300, BASE + 600]
+    assert aligned["Rome"]["avg_temp_c"] == [10.0, 12.0, None]
+    assert aligned["Oslo"]["avg_temp_c"] == [None, -1.0, -2.0]
+    assert aligned["Lima"] == {"avg_temp_c": [None] * 3, "icon": [None] * 3}
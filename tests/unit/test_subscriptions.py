@@ -0,0 +1,157 @@
+
+import asyncio
+import threading
+import time
+import grpc
+import pytest
+import proto.weather_pb2 as weather_pb2
+from core.settings import settings
+from weather_service.service import WeatherService
+from weather_service.subscriptions import (
+    AsyncSubscriptionHub,
+    SubscriptionHub,
+    SubscriptionLimitError,
+    clamp_interval,
+    stream_limit,
+)
+from tests.helpers import DummyContext, FakeRepo, make_provider
+
+
+@pytest.fixture
+def fast_polling(monkeypatch):
+    monkeypatch.setattr(settings, "SUBSCRIBE_MIN_INTERVAL_SECONDS", 0.05)
+    monkeypatch.setattr(settings, "SUBSCRIBE_DEFAULT_INTERVAL_SECONDS", 0.05)
+
+
+class ScriptedFetch:
+    """Returns temperatures from a script, repeating the last value once exhausted."""
+    def __init__(self, temps):
+        self.temps = list(temps)
+        self.calls = []
+        self._lock = threading.Lock()
+    def __call__(self, city):
+        with self._lock:
+            self.calls.append(city)
+            temp = self.temps.pop(0) if len(self.temps) > 1 else self.temps[0]
+        return weather_pb2.GetWeatherResponse(city=city, temp_c=temp, fetched_at_iso=str(time.time()))
+
+
+def drain(sub, seconds):
+    out = []
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        update = sub.get(timeout=0.02)
+        if update is not None:
+            out.append(update)
+    return out
+
+
+def test_clamp_interval_applies_floor_and_default():
+    assert clamp_interval(0) == settings.SUBSCRIBE_DEFAULT_INTERVAL_SECONDS
+    assert clamp_interval(1) == settings.SUBSCRIBE_MIN_INTERVAL_SECONDS
+    assert clamp_interval(3600) == 3600
+
+
+def test_shared_poll_fans_out_to_all_subscribers(fast_polling):
+    fetch = ScriptedFetch([1.0, 2.0])
+    hub = SubscriptionHub(fetch)
+    try:
+        a = hub.subscribe(["London"])
+        b = hub.subscribe([" london"])
+        got_a = drain(a, 0.3)
+        got_b = drain(b, 0.05)
+        polls = len(fetch.calls)
+    finally:
+        hub.stop()
+    # One poll stream for both subscribers, roughly once per interval
+    assert 2 <= polls <= 10
+    assert [u.weather.temp_c for u in got_a] == [1.0, 2.0]
+    assert [u.requested_city for u in got_a] == ["London", "London"]
+    assert got_b and got_b[-1].requested_city == " london"
+    assert hub.stats()["pushed"] >= 3
+
+
+def test_unchanged_values_are_not_pushed(fast_polling):
+    fetch = ScriptedFetch([5.0])
+    hub = SubscriptionHub(fetch)
+    try:
+        sub = hub.subscribe(["Oslo"])
+        updates = drain(sub, 0.3)
+    finally:
+        hub.stop()
+    assert len(fetch.calls) >= 3
+    assert len(updates) == 1
+
+
+def test_unsubscribe_removes_city(fast_polling):
+    hub = SubscriptionHub(ScriptedFetch([1.0]))
+    try:
+        sub = hub.subscribe(["Rome"])
+        hub.unsubscribe(sub)
+        assert hub.stats()["cities"] == 0
+    finally:
+        hub.stop()
+
+
+def test_async_hub_shares_polls(fast_polling):
+    fetch = ScriptedFetch([1.0, 2.0])
+
+    async def afetch(city):
+        return fetch(city)
+
+    async def run():
+        hub = AsyncSubscriptionHub(afetch)
+        subs = [hub.subscribe(["Paris"]) for _ in range(3)]
+        first = await asyncio.wait_for(asyncio.gather(*(s.get() for s in subs)), 1)
+        second = await asyncio.wait_for(asyncio.gather(*(s.get() for s in subs)), 1)
+        await hub.stop()
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert [u.weather.temp_c for u in first] == [1.0] * 3
+    assert [u.weather.temp_c for u in second] == [2.0] * 3
+    assert len(fetch.calls) == 2
+
+
+def test_stream_limit_keeps_workers_for_unary_calls(monkeypatch):
+    monkeypatch.setattr(settings, "GRPC_MAX_WORKERS", 10)
+    monkeypatch.setattr(settings, "SUBSCRIBE_MAX_STREAMS", 0)
+    assert stream_limit() == 5
+    assert stream_limit(asynchronous=True) == 0
+    monkeypatch.setattr(settings, "SUBSCRIBE_MAX_STREAMS", 50)
+    assert stream_limit() == 9
+    assert stream_limit(asynchronous=True) == 50
+
+
+def test_hub_rejects_streams_beyond_limit(fast_polling):
+    hub = SubscriptionHub(ScriptedFetch([1.0]), max_streams=2)
+    try:
+        a = hub.subscribe(["Rome"])
+        hub.subscribe(["Oslo"])
+        with pytest.raises(SubscriptionLimitError):
+            hub.subscribe(["Rome"])
+        hub.unsubscribe(a)
+        hub.subscribe(["Paris"])
+        assert hub.stats()["subscribers"] == 2
+        assert hub.stats()["rejected"] == 1
+    finally:
+        hub.stop()
+
+
+def test_subscribe_weather_over_limit_is_resource_exhausted(monkeypatch, fast_polling):
+    monkeypatch.setattr(settings, "GRPC_MAX_WORKERS", 3)
+    monkeypatch.setattr(settings, "SUBSCRIBE_MAX_STREAMS", 0)
+    svc = WeatherService(FakeRepo(), make_provider())
+    req = weather_pb2.SubscribeWeatherRequest(cities=["Berlin"])
+    try:
+        first = svc.SubscribeWeather(req, DummyContext())
+        assert next(first).weather.city == "Berlin"
+        ctx = DummyContext()
+        with pytest.raises(RuntimeError):
+            next(svc.SubscribeWeather(req, ctx))
+        assert ctx.aborted[0] == grpc.StatusCode.RESOURCE_EXHAUSTED
+        first.close()
+        # The slot is released once the first stream ends
+        assert next(svc.SubscribeWeather(req, DummyContext())).weather.city == "Berlin"
+    finally:
+        svc.close()
@@ -0,0 +1,93 @@
+
+import threading
+import time
+import grpc
+import pytest
+import proto.weather_pb2 as weather_pb2
+from weather_service.service import WeatherService
+from weather_service.errors import UpstreamNotFoundError
+from tests.helpers import DummyContext, RepoOK, RepoPersistFail
+
+
+class PerCityProvider:
+    """Fails for 'Nowhere', tracks peak concurrency for the rest."""
+    def __init__(self):
+        self.calls = []
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+    def get_current(self, city):
+        with self._lock:
+            self.calls.append(city)
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(0.02)
+            if city == "Nowhere":
+                raise UpstreamNotFoundError(f"City '{city}' not found")
+            return {"name": city, "main": {"temp": 5.0, "humidity": 10}, "weather": [{"description": "fog"}]}
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+def test_batch_returns_per_city_results_and_single_bulk_write():
+    repo = RepoOK()
+    svc = WeatherService(repo, PerCityProvider())
+    req = weather_pb2.GetWeatherBatchRequest(cities=["Berlin", "Nowhere", "Paris", " "])
+    resp = svc.GetCurrentWeatherBatch(req, DummyContext())
+    codes = [(r.requested_city, r.status_code) for r in resp.results]
+    assert codes == [
+        ("Berlin", grpc.StatusCode.OK.value[0]),
+        ("Nowhere", grpc.StatusCode.NOT_FOUND.value[0]),
+        ("Paris", grpc.StatusCode.OK.value[0]),
+        (" ", grpc.StatusCode.INVALID_ARGUMENT.value[0]),
+    ]
+    assert resp.results[0].weather.city == "Berlin"
+    assert not resp.results[1].HasField("weather")
+    assert repo.bulk_writes == 1
+    assert sorted(d["city"] for d in repo.inserted) == ["Berlin", "Paris"]
+
+
+def test_batch_unexpected_provider_error_fails_only_that_city(caplog):
+    class BuggyProvider(PerCityProvider):
+        def get_current(self, city):
+            if city == "Broken":
+                raise RuntimeError("provider bug")
+            if city == "Garbled":
+                return {"name": city, "main": None}  # normalize_payload cannot read it
+            return super().get_current(city)
+
+    repo = RepoOK()
+    svc = WeatherService(repo, BuggyProvider())
+    req = weather_pb2.GetWeatherBatchRequest(cities=["Berlin", "Broken", "Garbled"])
+    resp = svc.GetCurrentWeatherBatch(req, DummyContext())
+    assert [r.status_code for r in resp.results] == [0, grpc.StatusCode.INTERNAL.value[0], grpc.StatusCode.INTERNAL.value[0]]
+    assert [d["city"] for d in repo.inserted] == ["Berlin"]
+    assert any("Unexpected error fetching 'Broken'" in r.message for r in caplog.records)
+
+
+def test_batch_respects_parallelism_and_dedupes():
+    provider = PerCityProvider()
+    svc = WeatherService(RepoOK(), provider)
+    cities = [f"City{i}" for i in range(12)] + ["City0"]
+    req = weather_pb2.GetWeatherBatchRequest(cities=cities, max_parallelism=3)
+    resp = svc.GetCurrentWeatherBatch(req, DummyContext())
+    assert len(resp.results) == 13
+    assert len(provider.calls) == 12
+    assert 1 < provider.peak <= 3
+
+
+def test_batch_persistence_failure_still_returns_results(caplog):
+    svc = WeatherService(RepoPersistFail(), PerCityProvider())
+    resp = svc.GetCurrentWeatherBatch(weather_pb2.GetWeatherBatchRequest(cities=["Rome"]), DummyContext())
+    assert resp.results[0].status_code == 0
+    assert any("Failed to persist" in r.message for r in caplog.records)
+
+
+def test_batch_empty_request_aborts_invalid_argument():
+    svc = WeatherService(RepoOK(), PerCityProvider())
+    ctx = DummyContext()
+    with pytest.raises(RuntimeError):
+        svc.GetCurrentWeatherBatch(weather_pb2.GetWeatherBatchRequest(), ctx)
+    assert ctx.aborted[0] == grpc.StatusCode.INVALID_ARGUMENT
@@ -8,6 +8,7 @@ from weather_service.errors import (
     UpstreamRequestError,
     UpstreamHttpError,
     UpstreamInvalidResponse,
+    UpstreamRateLimitedError,
 )
 from tests.helpers import DummyContext, RepoPersistFail, RepoOK, make_provider
 
@@ -17,6 +18,7 @@ from tests.helpers import DummyContext, RepoPersistFail, RepoOK, make_provider
     (UpstreamRequestError("x"), grpc.StatusCode.UNAVAILABLE),
     (UpstreamHttpError(500, "x"), grpc.StatusCode.INTERNAL),
     (UpstreamInvalidResponse("x"), grpc.StatusCode.INTERNAL),
+    (UpstreamRateLimitedError("x"), grpc.StatusCode.RESOURCE_EXHAUSTED),
 ])
 def test_error_mapping_aborts_with_correct_code(error, expected_code):
     svc = WeatherService(RepoOK(), make_provider(error=error))
@@ -0,0 +1,129 @@
+
+import contextlib
+import threading
+import time
+import pymongo
+import pytest
+from db.mongo_repository import PartialInsertError
+from db.write_behind import WriteBehindRepository
+from tests.factories import observation_doc
+
+
+class BulkRepo:
+    def __init__(self, fail=False, gate=None):
+        self.batches = []
+        self._fail = fail
+        self._gate = gate
+    def insert_observations(self, docs):
+        if self._gate is not None:
+            self._gate.wait(timeout=2)
+        if self._fail:
+            raise RuntimeError("db down")
+        self.batches.append(list(docs))
+        return ["id"] * len(docs)
+    def get_latest_observation(self, city):
+        return {"city": city}
+
+
+def test_flushes_by_batch_size():
+    repo = BulkRepo()
+    wb = WriteBehindRepository(repo, batch_size=3, flush_interval=60, max_queue=100)
+    for i in range(6):
+        wb.insert_observation(observation_doc(temp=i))
+    assert wb.flush(timeout=2)
+    wb.close()
+    assert [len(b) for b in repo.batches] == [3, 3]
+    assert wb.stats()["written"] == 6
+
+
+def test_flushes_by_time():
+    repo = BulkRepo()
+    wb = WriteBehindRepository(repo, batch_size=100, flush_interval=0.05, max_queue=100)
+    wb.insert_observation(observation_doc())
+    for _ in range(100):
+        if repo.batches:
+            break
+        time.sleep(0.01)
+    wb.close()
+    assert [len(b) for b in repo.batches] == [1]
+
+
+def test_close_flushes_remaining_and_rejects_new_writes():
+    repo = BulkRepo()
+    wb = WriteBehindRepository(repo, batch_size=100, flush_interval=60, max_queue=100)
+    wb.insert_observations([observation_doc(), observation_doc()])
+    wb.close(timeout=2)
+    assert sum(len(b) for b in repo.batches) == 2
+    with pytest.raises(RuntimeError):
+        wb.insert_observation(observation_doc())
+
+
+@pytest.mark.parametrize("policy, kept_temps", [
+    ("drop_newest", [0, 1]),
+    ("drop_oldest", [1, 2]),
+    ("block", [0, 1]),
+])
+def test_full_queue_policies(policy, kept_temps):
+    gate = threading.Event()
+    repo = BulkRepo(gate=gate)
+    wb = WriteBehindRepository(repo, batch_size=1, flush_interval=60, max_queue=2, policy=policy, block_timeout=0.05)
+    # First document is taken by the worker, which then blocks on the gate
+    wb.insert_observation(observation_doc(temp=-1))
+    for _ in range(100):
+        if wb.stats()["depth"] == 0:
+            break
+        time.sleep(0.01)
+    for temp in range(3):
+        wb.insert_observation(observation_doc(temp=temp))
+    assert wb.stats()["dropped"] == 1
+    gate.set()
+    wb.close(timeout=2)
+    temps = [d["temp_c"] for b in repo.batches for d in b]
+    assert temps == [-1] + kept_temps
+
+
+def test_failed_flush_is_counted_and_reads_are_delegated():
+    wb = WriteBehindRepository(BulkRepo(fail=True), batch_size=1, flush_interval=60, max_queue=10)
+    wb.insert_observation(observation_doc())
+    wb.flush(timeout=2)
+    wb.close()
+    stats = wb.stats()
+    assert stats["failed"] == 1
+    assert stats["flushes"] == 1
+    assert wb.get_latest_observation("Berlin") == {"city": "Berlin"}
+
+
+def test_partial_flush_counts_written_and_failed_documents():
+    class PartialRepo(BulkRepo):
+        def insert_observations(self, docs):
+            raise PartialInsertError(["id"] * (len(docs) - 1), 1, RuntimeError("duplicate key"))
+
+    wb = WriteBehindRepository(PartialRepo(), batch_size=3, flush_interval=60, max_queue=10)
+    wb.insert_observations([observation_doc() for _ in range(3)])
+    wb.flush(timeout=2)
+    wb.close()
+    stats = wb.stats()
+    assert (stats["written"], stats["failed"], stats["flushes"]) == (2, 1, 1)
+
+
+def test_invalid_policy_rejected():
+    with pytest.raises(ValueError):
+        WriteBehindRepository(BulkRepo(), policy="explode")
+
+
+def test_flushes_are_bounded_by_the_flush_timeout(monkeypatch):
+    timeouts = []
+
+    @contextlib.contextmanager
+    def record_timeout(seconds):
+        timeouts.append(seconds)
+        yield
+
+    monkeypatch.setattr(pymongo, "timeout", record_timeout)
+    repo = BulkRepo()
+    wb = WriteBehindRepository(repo, batch_size=1, flush_interval=60, max_queue=10, flush_timeout=2.5)
+    wb.insert_observation(observation_doc())
+    wb.flush(timeout=2)
+    wb.close()
+    assert timeouts == [2.5]
+    assert len(repo.batches) == 1
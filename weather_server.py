@@ -4,8 +4,8 @@ Delegates to `weather_service.server.serve`. Prefer importing from
 `weather_service.server` directly going forward.
 """
 
-from weather_service.server import serve  # noqa: F401
+from weather_service.server import main, serve, serve_async  # noqa: F401
 
 if __name__ == "__main__":  # pragma: no cover
-    serve()
+    main()
  
\ No newline at end of file
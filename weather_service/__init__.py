@@ -1,15 +1,17 @@
 """Weather service package encapsulating gRPC logic, providers, models.
 
 Modules:
-    server: gRPC server bootstrap only.
+    server: gRPC server bootstrap only (thread pool and grpc.aio).
     service: WeatherService business logic implementation.
+    async_service: AsyncWeatherService for grpc.aio servers.
     interceptors: gRPC interceptors (API key auth).
     models: Pydantic domain models.
-    providers: Upstream provider clients (OpenWeather).
+    providers: Upstream provider clients (OpenWeather) and caching wrapper.
     errors: Typed exceptions for mapping to gRPC status codes.
 """
 
 from .service import WeatherService  
-from .server import serve  
+from .async_service import AsyncWeatherService  
+from .server import serve, serve_async  
 
-__all__ = ["WeatherService", "serve"]
+__all__ = ["WeatherService", "AsyncWeatherService", "serve", "serve_async"]
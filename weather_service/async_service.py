@@ -0,0 +1,143 @@
+"""Asyncio implementation of the WeatherService servicer for `grpc.aio` servers.
+
+Mirrors `weather_service.service.WeatherService` (same validation, error to
+status mapping and persistence semantics) but awaits an async provider and an
+async repository so no thread is blocked while upstream or Mongo I/O is pending.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+
+import grpc
+
+from core.settings import settings
+from weather_service import deadlines
+import proto.weather_pb2 as weather_pb2
+import proto.weather_pb2_grpc as weather_pb2_grpc
+from weather_service.errors import UpstreamCircuitOpenError
+from weather_service.service import (
+    STALE_FIELDS,
+    UPSTREAM_ERRORS,
+    ascii_city,
+    batch_parallelism,
+    batch_result,
+    unique_cities,
+    normalize_payload,
+    observation_document,
+    stale_response,
+    to_response,
+    upstream_error_status,
+    validate_subscription_cities,
+)
+from weather_service.subscriptions import AsyncSubscriptionHub, SubscriptionLimitError, stream_limit
+
+logger = logging.getLogger("weather_service.async_service")
+
+
+class AsyncWeatherService(weather_pb2_grpc.WeatherServiceServicer):
+    def __init__(self, repo, provider):
+        # Async repository / provider exposing awaitable insert_observation / get_current
+        self.repo = repo
+        self.provider = provider
+        self.subscriptions = AsyncSubscriptionHub(self._poll_city, max_streams=stream_limit(asynchronous=True))
+
+    async def GetCurrentWeather(self, request, context):
+        city = request.city.strip()
+        if not city:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, "City required")
+        # grpc.aio cancels this coroutine when the client goes away; the deadline caps the timeouts
+        with deadlines.deadline_scope(context):
+            try:
+                data = await self.provider.get_current(city)
+            except UpstreamCircuitOpenError as e:
+                stale = await self._stale_response(city)
+                if stale is None:
+                    await context.abort(*upstream_error_status(e))
+                return stale
+            except UPSTREAM_ERRORS as e:
+                await context.abort(*upstream_error_status(e))
+
+            normalized = normalize_payload(city, data)
+            await self._persist(normalized, data)
+            return to_response(normalized)
+
+    async def GetCurrentWeatherBatch(self, request, context):
+        if not request.cities:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, "At least one city required")
+        if len(request.cities) > settings.BATCH_MAX_CITIES:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, f"At most {settings.BATCH_MAX_CITIES} cities per batch")
+        cities = unique_cities(request.cities)
+        semaphore = asyncio.Semaphore(batch_parallelism(request.max_parallelism, len(cities)))
+
+        async def fetch(city):
+            async with semaphore:
+                try:
+                    data = await self.provider.get_current(city)
+                    return normalize_payload(city, data), data
+                except UpstreamCircuitOpenError as e:
+                    stale = await self._stale_response(city)
+                    return e if stale is None else stale
+                except UPSTREAM_ERRORS as e:
+                    return e
+                except Exception as e:
+                    logger.exception("Unexpected error fetching '%s' for a batch", city)
+                    return e
+
+        with deadlines.deadline_scope(context):
+            outcomes = dict(zip(cities, await asyncio.gather(*(fetch(c) for c in cities))))
+            docs = [observation_document(*o) for o in outcomes.values() if isinstance(o, tuple)]
+            if docs:
+                try:
+                    with deadlines.write_budget():
+                        await self.repo.insert_observations(docs)
+                except Exception as persist_err:
+                    logger.warning("Failed to persist %d batch observations: %s", len(docs), persist_err, exc_info=True)
+        return weather_pb2.GetWeatherBatchResponse(results=[
+            batch_result(c, outcomes.get(c.strip())) for c in request.cities
+        ])
+
+    async def SubscribeWeather(self, request, context):
+        cities, invalid = validate_subscription_cities(request.cities)
+        if invalid:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, invalid)
+        try:
+            sub = self.subscriptions.subscribe(cities, request.min_interval_seconds)
+        except SubscriptionLimitError as e:
+            await context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, str(e))
+        try:
+            while True:
+                update = await sub.get()
+                if update is None:
+                    break
+                yield update
+        finally:
+            self.subscriptions.unsubscribe(sub)
+
+    async def aclose(self) -> None:
+        """Stop background work (subscription polling)."""
+        await self.subscriptions.stop()
+
+    async def _persist(self, normalized, data) -> None:
+        try:
+            with deadlines.write_budget():
+                await self.repo.insert_observation(observation_document(normalized, data))
+        except Exception as persist_err:
+            logger.warning("Failed to persist observation: %s", persist_err, exc_info=True)
+
+    async def _stale_response(self, city: str):
+        """Last stored observation of a city flagged `stale` (None if unavailable or too old)."""
+        try:
+            doc = await self.repo.get_latest_observation(ascii_city(city), fields=STALE_FIELDS, ignore_case=True)
+        except Exception as e:
+            logger.warning("Could not read the last observation of '%s': %s", city, e)
+            return None
+        return stale_response(doc)
+
+    async def _poll_city(self, city: str):
+        """Fetch + persist one city for the subscription hub (errors propagate to the hub)."""
+        data = await self.provider.get_current(city)
+        normalized = normalize_payload(city, data)
+        await self._persist(normalized, data)
+        return to_response(normalized)
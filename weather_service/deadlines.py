@@ -0,0 +1,77 @@
+"""Client deadline propagation for the WeatherService handlers.
+
+`deadline_scope(context)` records the RPC's remaining time
+(`context.time_remaining()`) in a context variable for the duration of a
+handler, so code further down (provider clients, persistence) can size its
+own timeouts without a `context` parameter:
+
+  - `remaining()` is the time left (None when the client set no deadline)
+  - `timeout(default)` caps a fixed timeout (e.g. the 8 s OpenWeather read
+    timeout) at the time left; it raises `UpstreamDeadlineExceededError`
+    (DEADLINE_EXCEEDED) when less than DEADLINE_MIN_UPSTREAM_SECONDS remain
+  - `write_budget()` bounds the Mongo write (`pymongo.timeout`) by the time
+    left, but never below DEADLINE_MIN_WRITE_SECONDS, since the observation
+    was already paid for upstream. This only matters for synchronous writes
+    (WRITE_BEHIND_ENABLED=false): with write-behind the handler merely
+    enqueues the document, and the later batch insert on the flush thread is
+    bounded by WRITE_BEHIND_FLUSH_TIMEOUT_SECONDS instead of any one client's
+    deadline
+
+Context variables follow asyncio tasks automatically; work handed to a thread
+pool must run in `contextvars.copy_context()` to keep the deadline.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import time
+from typing import Iterator
+
+import pymongo
+
+from core.settings import settings
+from weather_service.errors import UpstreamDeadlineExceededError
+
+# Absolute `time.monotonic()` deadline of the RPC being handled (None = no deadline)
+_deadline: contextvars.ContextVar[float | None] = contextvars.ContextVar("rpc_deadline", default=None)
+
+
+@contextlib.contextmanager
+def deadline_scope(context) -> Iterator[float | None]:
+    """Expose the deadline of `context` to `remaining()` / `timeout()` while the block runs."""
+    remaining_s = context.time_remaining() if settings.DEADLINE_PROPAGATION else None
+    token = _deadline.set(None if remaining_s is None else time.monotonic() + remaining_s)
+    try:
+        yield remaining_s
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> float | None:
+    """Seconds left before the current RPC's deadline (None without one)."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def expired() -> bool:
+    left = remaining()
+    return left is not None and left <= 0
+
+
+def timeout(default: float) -> float:
+    """`default` capped at the time left; raises `UpstreamDeadlineExceededError` if too little is left."""
+    left = remaining()
+    if left is None:
+        return default
+    if left < settings.DEADLINE_MIN_UPSTREAM_SECONDS:
+        raise UpstreamDeadlineExceededError(f"Only {max(0.0, left) * 1000:.0f} ms left of the client deadline")
+    return min(default, left)
+
+
+def write_budget():
+    """Context manager bounding synchronous Mongo operations by the time left (no-op without a deadline)."""
+    left = remaining()
+    if left is None:
+        return contextlib.nullcontext()
+    return pymongo.timeout(max(left, settings.DEADLINE_MIN_WRITE_SECONDS))
@@ -17,3 +17,18 @@ class UpstreamInvalidResponse(Exception):
 
 class UpstreamRequestError(Exception):
     """Raised when an underlying request/network error occurs."""
+
+
+class UpstreamRateLimitedError(UpstreamHttpError):
+    """Raised when upstream answers 429 or the local rate limit budget is exhausted."""
+    def __init__(self, message: str | None = None, retry_after: float | None = None):
+        super().__init__(429, message or "Upstream rate limit exceeded")
+        self.retry_after = retry_after
+
+
+class UpstreamCircuitOpenError(UpstreamRequestError):
+    """Raised without calling upstream while the provider circuit breaker is open."""
+
+
+class UpstreamDeadlineExceededError(UpstreamRequestError):
+    """Raised when the client's deadline leaves no time for (or expired during) the upstream call."""
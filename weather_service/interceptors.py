@@ -4,6 +4,11 @@ import grpc
 from core.settings import settings
 
 
+def _has_valid_key(handler_call_details, expected: str) -> bool:
+    meta = dict(handler_call_details.invocation_metadata)
+    return meta.get("x-api-key") == expected
+
+
 class ApiKeyInterceptor(grpc.ServerInterceptor):
     """Simple metadata-based API key authentication interceptor."""
 
@@ -11,9 +16,22 @@ class ApiKeyInterceptor(grpc.ServerInterceptor):
         self._expected = expected_key or settings.GRPC_API_KEY
 
     def intercept_service(self, continuation, handler_call_details):  # noqa: D401
-        meta = dict(handler_call_details.invocation_metadata)
-        if meta.get("x-api-key") != self._expected:
+        if not _has_valid_key(handler_call_details, self._expected):
             def unary_unauthed(request, context):
                 context.abort(grpc.StatusCode.UNAUTHENTICATED, "Invalid API key")
             return grpc.unary_unary_rpc_method_handler(unary_unauthed)
         return continuation(handler_call_details)
+
+
+class AsyncApiKeyInterceptor(grpc.aio.ServerInterceptor):
+    """`grpc.aio` counterpart of `ApiKeyInterceptor` (same metadata key and status)."""
+
+    def __init__(self, *, expected_key: str | None = None):
+        self._expected = expected_key or settings.GRPC_API_KEY
+
+    async def intercept_service(self, continuation, handler_call_details):  # noqa: D401
+        if not _has_valid_key(handler_call_details, self._expected):
+            async def unary_unauthed(request, context):
+                await context.abort(grpc.StatusCode.UNAUTHENTICATED, "Invalid API key")
+            return grpc.unary_unary_rpc_method_handler(unary_unauthed)
+        return await continuation(handler_call_details)
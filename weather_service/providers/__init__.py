@@ -1,5 +1,43 @@
 """Provider clients for external weather data sources."""
 
+from .base import (
+    AsyncWeatherProvider,
+    WeatherProvider,
+    available_providers,
+    create_async_provider,
+    create_provider,
+    register_provider,
+)
 from .openweather_client import OpenWeatherClient
+from .async_openweather_client import AsyncOpenWeatherClient
+from .cache import CachedProvider, AsyncCachedProvider
+from .rate_limit import RateLimiter, RateLimitedProvider, AsyncRateLimitedProvider
+from .circuit_breaker import CircuitBreaker, CircuitBreakerProvider, AsyncCircuitBreakerProvider
+from .hedging import HedgedProvider, AsyncHedgedProvider
+from .composite import CompositeProvider, AsyncCompositeProvider
+from .fake import FakeWeatherProvider, AsyncFakeWeatherProvider
 
-__all__ = ["OpenWeatherClient"]
+__all__ = [
+    "WeatherProvider",
+    "AsyncWeatherProvider",
+    "register_provider",
+    "available_providers",
+    "create_provider",
+    "create_async_provider",
+    "OpenWeatherClient",
+    "AsyncOpenWeatherClient",
+    "CachedProvider",
+    "AsyncCachedProvider",
+    "RateLimiter",
+    "RateLimitedProvider",
+    "AsyncRateLimitedProvider",
+    "CircuitBreaker",
+    "CircuitBreakerProvider",
+    "AsyncCircuitBreakerProvider",
+    "HedgedProvider",
+    "AsyncHedgedProvider",
+    "CompositeProvider",
+    "AsyncCompositeProvider",
+    "FakeWeatherProvider",
+    "AsyncFakeWeatherProvider",
+]
@@ -0,0 +1,74 @@
+"""Asyncio client for the OpenWeatherMap current weather endpoint (httpx based)."""
+
+from __future__ import annotations
+import asyncio
+from typing import Any, Dict
+
+import httpx
+
+from core.settings import settings
+from weather_service import deadlines
+from weather_service.errors import UpstreamDeadlineExceededError, UpstreamRequestError
+from weather_service.providers.base import AsyncWeatherProvider, register_provider
+from weather_service.providers.openweather_client import parse_current_response
+
+
+@register_provider("openweathermap", asynchronous=True)
+class AsyncOpenWeatherClient(AsyncWeatherProvider):
+    """Async counterpart of `OpenWeatherClient` used by the `grpc.aio` server.
+
+    A single `httpx.AsyncClient` keeps a pool of keep-alive connections that
+    any number of concurrent RPC coroutines share; response validation and
+    error types are identical to the sync client.
+    """
+
+    name = "openweathermap"
+
+    def __init__(
+        self,
+        *,
+        api_key: str | None = None,
+        base_url: str | None = None,
+        timeout: float | None = None,
+        connect_timeout: float | None = None,
+        max_connections: int | None = None,
+        max_retries: int | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        self._api_key = api_key or settings.OPENWEATHER_API_KEY
+        self._base_url = base_url or settings.OPENWEATHER_URL
+        self._timeout = read_timeout = settings.OPENWEATHER_READ_TIMEOUT if timeout is None else timeout
+        self._connect_timeout = connect = settings.OPENWEATHER_CONNECT_TIMEOUT if connect_timeout is None else connect_timeout
+        limit = max_connections or settings.OPENWEATHER_ASYNC_MAX_CONNECTIONS
+        retries = settings.OPENWEATHER_MAX_RETRIES if max_retries is None else max_retries
+        self._client = httpx.AsyncClient(
+            timeout=httpx.Timeout(read_timeout, connect=connect),
+            limits=httpx.Limits(max_connections=limit, max_keepalive_connections=limit),
+            # httpx transport retries cover connection establishment failures only
+            transport=transport or httpx.AsyncHTTPTransport(retries=retries),
+        )
+
+    async def get_current(self, city: str) -> Dict[str, Any]:  # noqa: D401
+        if not self._api_key:
+            raise RuntimeError("OPENWEATHER_API_KEY not set")
+        params = {"q": city, "appid": self._api_key, "units": "metric"}
+        read_timeout = deadlines.timeout(self._timeout)
+        try:
+            # The overall bound also covers the transport's connect retries
+            async with asyncio.timeout(deadlines.remaining()):
+                resp = await self._client.get(
+                    self._base_url, params=params, timeout=httpx.Timeout(read_timeout, connect=min(self._connect_timeout, read_timeout))
+                )
+        except TimeoutError as e:
+            raise UpstreamDeadlineExceededError(f"Client deadline passed while fetching '{city}'") from e
+        except httpx.TimeoutException as e:
+            if read_timeout < self._timeout:  # cut short by the client deadline, not an upstream fault
+                raise UpstreamDeadlineExceededError(str(e)) from e
+            raise UpstreamRequestError(str(e)) from e
+        except httpx.HTTPError as e:  # network / timeout
+            raise UpstreamRequestError(str(e)) from e
+        return self.tag(parse_current_response(city, resp))
+
+    async def aclose(self) -> None:
+        """Release pooled connections."""
+        await self._client.aclose()
@@ -0,0 +1,90 @@
+"""Provider interface and registry.
+
+A provider answers `get_current(city)` with an OpenWeather-shaped current
+weather payload (`name`, `main.temp`, `main.humidity`, `weather[0]`,
+`wind.speed`, ...), which is what `weather_service.service.normalize_payload`
+and the stored `raw` documents expect; backends with another wire format
+translate to it. Every payload is tagged with `_provider` (the `name` of the
+backend that produced it), which the service persists as the observation's
+`provider`.
+
+Backends register a sync and / or async factory under a name; the server
+builds the configured ones (`WEATHER_PROVIDERS`) with `create_provider` /
+`create_async_provider`:
+
+    @register_provider("mybackend", asynchronous=False)
+    class MyBackend(WeatherProvider):
+        name = "mybackend"
+        def get_current(self, city): ...
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List
+
+PROVIDER_KEY = "_provider"
+
+_SYNC_FACTORIES: Dict[str, Callable[..., Any]] = {}
+_ASYNC_FACTORIES: Dict[str, Callable[..., Any]] = {}
+
+
+class WeatherProvider:
+    """Base class of blocking providers (used by the thread-pool server)."""
+
+    name = "unknown"
+
+    def get_current(self, city: str) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def tag(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Mark a payload as produced by this provider (kept if already tagged by a backend)."""
+        data.setdefault(PROVIDER_KEY, self.name)
+        return data
+
+    def close(self) -> None:
+        """Release connections (no-op by default)."""
+
+
+class AsyncWeatherProvider(WeatherProvider):
+    """Base class of asyncio providers (used by the `grpc.aio` server)."""
+
+    async def get_current(self, city: str) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    async def aclose(self) -> None:
+        """Release connections (no-op by default)."""
+
+
+def register_provider(name: str, *, asynchronous: bool = False):
+    """Class / factory decorator registering a provider under `name`."""
+    def decorator(factory):
+        (_ASYNC_FACTORIES if asynchronous else _SYNC_FACTORIES)[name] = factory
+        return factory
+    return decorator
+
+
+def available_providers(asynchronous: bool = False) -> List[str]:
+    return sorted(_ASYNC_FACTORIES if asynchronous else _SYNC_FACTORIES)
+
+
+def _create(factories: Dict[str, Callable[..., Any]], name: str, kind: str, /, **kwargs):
+    try:
+        factory = factories[name]
+    except KeyError:
+        raise ValueError(f"Unknown {kind} weather provider '{name}' (available: {', '.join(sorted(factories))})") from None
+    return factory(**kwargs)
+
+
+def create_provider(name: str, /, **kwargs) -> WeatherProvider:
+    """Instantiate a registered blocking provider; `kwargs` go to its factory."""
+    return _create(_SYNC_FACTORIES, name, "sync", **kwargs)
+
+
+def create_async_provider(name: str, /, **kwargs) -> AsyncWeatherProvider:
+    """Instantiate a registered asyncio provider."""
+    return _create(_ASYNC_FACTORIES, name, "async", **kwargs)
+
+
+def provider_names(spec: str) -> List[str]:
+    """Names from a comma-separated `WEATHER_PROVIDERS` value, de-duplicated in order."""
+    return list(dict.fromkeys(name.strip() for name in spec.split(",") if name.strip()))
@@ -0,0 +1,243 @@
+"""Caching wrapper for provider clients (TTL + bounded LRU + single-flight).
+
+`CachedProvider` exposes the same `get_current(city)` surface as the wrapped
+provider so it can be dropped in front of `OpenWeatherClient` transparently.
+Concurrent misses for the same city share one upstream call; followers wait
+for the leader and receive its result (or its exception). `AsyncCachedProvider`
+offers the same behaviour for async providers used by the `grpc.aio` server.
+
+The upstream call runs under the leader's client deadline (see
+`weather_service.deadlines`). A follower waits no longer than its own
+deadline (`UpstreamDeadlineExceededError` when it runs out), and when the
+leader's deadline expired, followers fetch again under their own instead of
+inheriting that error.
+
+Expired entries are kept for `stale_seconds` more; they are only served when
+upstream refuses the call for rate limiting (`UpstreamRateLimitedError`, see
+`weather_service.providers.rate_limit`), so a budget overrun degrades to
+slightly old data instead of errors.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import copy
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Tuple
+
+from core.settings import settings
+from weather_service import deadlines
+from weather_service.errors import UpstreamDeadlineExceededError, UpstreamRateLimitedError
+
+
+def normalize_city_key(city: str) -> str:
+    """Return the cache key for a city: NFKC, trimmed, collapsed whitespace, casefolded."""
+    return " ".join(unicodedata.normalize("NFKC", city).split()).casefold()
+
+
+def _deadline_exceeded(city: str) -> UpstreamDeadlineExceededError:
+    return UpstreamDeadlineExceededError(f"Client deadline passed while waiting for the shared fetch of '{city}'")
+
+
+class _Flight:
+    """In-progress upstream call shared by concurrent callers for one key."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Dict[str, Any] | None = None
+        self.error: BaseException | None = None
+
+
+class _TtlLruCache:
+    """Shared TTL + LRU bookkeeping and counters for the sync/async wrappers."""
+
+    def __init__(
+        self,
+        provider,
+        *,
+        ttl_seconds: float | None = None,
+        max_entries: int | None = None,
+        stale_seconds: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._provider = provider
+        self._ttl = settings.PROVIDER_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self._max_entries = max(1, settings.PROVIDER_CACHE_MAX_ENTRIES if max_entries is None else max_entries)
+        self._stale_seconds = settings.PROVIDER_CACHE_STALE_SECONDS if stale_seconds is None else stale_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.stale_served = 0
+
+    def _lookup(self, key: str) -> Dict[str, Any] | None:
+        """Return a fresh cached payload (counting a hit) or None (lock held)."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, data = entry
+        if expires_at <= self._clock():
+            if expires_at + self._stale_seconds <= self._clock():
+                del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return data
+
+    def _stale(self, key: str) -> Dict[str, Any] | None:
+        """Return an expired payload still inside the stale window, counting it (lock held)."""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] + self._stale_seconds <= self._clock():
+            return None
+        self.stale_served += 1
+        return entry[1]
+
+    def _store(self, key: str, data: Dict[str, Any]) -> None:
+        """Insert/refresh an entry and evict least recently used ones (lock held)."""
+        if self._ttl <= 0:
+            return
+        self._entries[key] = (self._clock() + self._ttl, data)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, city: str | None = None) -> None:
+        """Drop one city (or every city when None) from the cache."""
+        with self._lock:
+            if city is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(normalize_city_key(city), None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return counters used to tune TTL / size (hits, misses, coalesced, stale_served, size)."""
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "stale_served": self.stale_served,
+                "size": len(self._entries),
+                "hit_ratio": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+            }
+
+
+class CachedProvider(_TtlLruCache):
+    """Provider wrapper caching `get_current` results per normalized city."""
+
+    def __init__(self, provider, **kwargs):
+        super().__init__(provider, **kwargs)
+        self._inflight: Dict[str, _Flight] = {}
+
+    def get_current(self, city: str) -> Dict[str, Any]:  # noqa: D401
+        key = normalize_city_key(city)
+        while True:
+            with self._lock:
+                cached = self._lookup(key)
+                if cached is not None:
+                    return copy.deepcopy(cached)
+                flight = self._inflight.get(key)
+                if flight is None:
+                    flight = _Flight()
+                    self._inflight[key] = flight
+                    self.misses += 1
+                    break
+
+            left = deadlines.remaining()
+            if not flight.done.wait(None if left is None else max(0.0, left)):
+                raise _deadline_exceeded(city)
+            if isinstance(flight.error, UpstreamDeadlineExceededError):
+                continue  # the leader's deadline, not ours: fetch again
+            if flight.error is not None:
+                raise flight.error
+            # Counted once served, so a follower retrying as the new leader is not counted twice
+            with self._lock:
+                self.coalesced += 1
+            return copy.deepcopy(flight.result)
+
+        try:
+            data = self._provider.get_current(city)
+        except UpstreamRateLimitedError as e:
+            with self._lock:
+                data = self._stale(key)
+            if data is None:
+                flight.error = e
+                raise
+            flight.result = data
+            return copy.deepcopy(data)
+        except BaseException as e:
+            flight.error = e
+            raise
+        else:
+            flight.result = data
+            with self._lock:
+                self._store(key, data)
+            return copy.deepcopy(data)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.done.set()
+
+
+class AsyncCachedProvider(_TtlLruCache):
+    """Asyncio variant of `CachedProvider` wrapping an async provider.
+
+    Coalescing uses one shared task per key, so followers simply wait for the
+    leader's task; cancelling a single caller does not cancel the upstream call.
+    """
+
+    def __init__(self, provider, **kwargs):
+        super().__init__(provider, **kwargs)
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    async def get_current(self, city: str) -> Dict[str, Any]:  # noqa: D401
+        key = normalize_city_key(city)
+        while True:
+            with self._lock:
+                cached = self._lookup(key)
+                if cached is not None:
+                    return copy.deepcopy(cached)
+                task = self._inflight.get(key)
+                leader = task is None
+                if leader:
+                    self.misses += 1
+                    # The task copies this caller's context, so it runs under the leader's deadline
+                    task = asyncio.ensure_future(self._fetch(key, city))
+                    self._inflight[key] = task
+            # asyncio.wait never cancels the shared task, whoever stops waiting
+            done, _ = await asyncio.wait({task}, timeout=deadlines.remaining())
+            if not done:
+                raise _deadline_exceeded(city)
+            try:
+                data = task.result()
+            except UpstreamDeadlineExceededError:
+                if leader:
+                    raise
+                continue  # the leader's deadline, not ours: fetch again
+            if not leader:
+                with self._lock:
+                    self.coalesced += 1
+            return copy.deepcopy(data)
+
+    async def _fetch(self, key: str, city: str) -> Dict[str, Any]:
+        try:
+            try:
+                data = await self._provider.get_current(city)
+            except UpstreamRateLimitedError:
+                with self._lock:
+                    stale = self._stale(key)
+                if stale is None:
+                    raise
+                return stale
+            with self._lock:
+                self._store(key, data)
+            return data
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
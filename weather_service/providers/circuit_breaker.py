@@ -0,0 +1,193 @@
+"""Circuit breaker around provider clients.
+
+When OpenWeather slows down or fails, every RPC would otherwise hold a server
+worker for the full HTTP timeout. `CircuitBreaker` counts consecutive
+failures and slow calls (slower than `slow_call_seconds`, even if they
+succeed); after `failure_threshold` of them the circuit opens and calls fail
+immediately with `UpstreamCircuitOpenError` (UNAVAILABLE), which
+`WeatherService` answers from the last persisted observation flagged `stale`.
+
+After `open_seconds` the circuit is half-open: up to `half_open_probes`
+calls go through to upstream. A healthy probe closes the circuit, a failed
+or slow one opens it again for another `open_seconds`. Outcomes of calls
+started before the circuit last opened (stragglers) are ignored, so a late
+success cannot close a freshly opened circuit.
+
+A not-found city is a healthy answer; rate limiting (`UpstreamRateLimitedError`),
+client deadlines (`UpstreamDeadlineExceededError`) and cancellations say nothing
+about upstream health and are not counted.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict
+
+from core.settings import settings
+from weather_service.errors import (
+    UpstreamCircuitOpenError,
+    UpstreamDeadlineExceededError,
+    UpstreamHttpError,
+    UpstreamInvalidResponse,
+    UpstreamNotFoundError,
+    UpstreamRateLimitedError,
+    UpstreamRequestError,
+)
+
+logger = logging.getLogger("weather_service.providers.circuit_breaker")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+def counts_as_failure(error: BaseException) -> bool:
+    """Whether an upstream exception indicates an unhealthy provider."""
+    if isinstance(error, (UpstreamRateLimitedError, UpstreamDeadlineExceededError)):
+        return False
+    return isinstance(error, (UpstreamRequestError, UpstreamHttpError, UpstreamInvalidResponse))
+
+
+class CircuitBreaker:
+    """Thread-safe closed / open / half-open state machine (see module docstring)."""
+
+    def __init__(
+        self,
+        *,
+        failure_threshold: int | None = None,
+        slow_call_seconds: float | None = None,
+        open_seconds: float | None = None,
+        half_open_probes: int | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._threshold = max(1, settings.PROVIDER_BREAKER_FAILURE_THRESHOLD if failure_threshold is None else failure_threshold)
+        self._slow = settings.PROVIDER_BREAKER_SLOW_CALL_SECONDS if slow_call_seconds is None else slow_call_seconds
+        self._open_seconds = settings.PROVIDER_BREAKER_OPEN_SECONDS if open_seconds is None else open_seconds
+        self._probes = max(1, settings.PROVIDER_BREAKER_HALF_OPEN_PROBES if half_open_probes is None else half_open_probes)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self.opened = 0
+        self.rejected = 0
+        self.failed_calls = 0
+        self.slow_calls = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    @property
+    def rejecting(self) -> bool:
+        """Whether `allow()` would refuse a call now (checked without taking a probe slot)."""
+        with self._lock:
+            state = self._current_state()
+            return state == OPEN or (state == HALF_OPEN and self._probes_in_flight >= self._probes)
+
+    def _current_state(self) -> str:
+        """State with the open -> half-open transition applied (lock held)."""
+        if self._state == OPEN and self._clock() - self._opened_at >= self._open_seconds:
+            self._state = HALF_OPEN
+            self._probes_in_flight = 0
+        return self._state
+
+    def _open(self) -> None:
+        if self._state != OPEN:
+            self.opened += 1
+            logger.warning("Provider circuit opened after %d failed or slow calls", self._failures)
+        self._state = OPEN
+        self._opened_at = self._clock()
+
+    def allow(self) -> bool:
+        """Whether a call may go upstream now; every allowed call must be followed by `record`."""
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and self._probes_in_flight < self._probes:
+                self._probes_in_flight += 1
+                return True
+            self.rejected += 1
+            return False
+
+    def record(self, duration: float, error: BaseException | None = None) -> None:
+        """Record the outcome of an allowed call that took `duration` seconds."""
+        failed = error is not None and counts_as_failure(error)
+        slow = self._slow > 0 and duration >= self._slow
+        with self._lock:
+            self.failed_calls += failed
+            self.slow_calls += slow and not failed
+            if self._state == OPEN or (self.opened and self._clock() - duration < self._opened_at):
+                return
+            was_probe = self._state == HALF_OPEN
+            if was_probe:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+            if failed or slow:
+                self._failures += 1
+                if was_probe or self._failures >= self._threshold:
+                    self._open()
+            elif error is None or isinstance(error, UpstreamNotFoundError):
+                if self._state != CLOSED:
+                    logger.info("Provider circuit closed")
+                self._state = CLOSED
+                self._failures = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the state and counters (opened, rejected, failed / slow calls)."""
+        with self._lock:
+            return {
+                "state": self._current_state(),
+                "consecutive_failures": self._failures,
+                "opened": self.opened,
+                "rejected": self.rejected,
+                "failed_calls": self.failed_calls,
+                "slow_calls": self.slow_calls,
+            }
+
+
+class _Breaking:
+    def __init__(self, provider, breaker: CircuitBreaker | None = None, *, clock: Callable[[], float] = time.monotonic):
+        self._provider = provider
+        self.breaker = breaker or CircuitBreaker()
+        self._clock = clock
+
+    def _check(self, city: str) -> float:
+        if not self.breaker.allow():
+            raise UpstreamCircuitOpenError(f"Provider circuit open; not fetching '{city}'")
+        return self._clock()
+
+    def stats(self) -> Dict[str, Any]:
+        return self.breaker.stats()
+
+
+class CircuitBreakerProvider(_Breaking):
+    """Provider wrapper failing fast with `UpstreamCircuitOpenError` while the circuit is open."""
+
+    def get_current(self, city: str) -> Dict[str, Any]:  # noqa: D401
+        started = self._check(city)
+        try:
+            data = self._provider.get_current(city)
+        except BaseException as e:
+            self.breaker.record(self._clock() - started, e)
+            raise
+        self.breaker.record(self._clock() - started)
+        return data
+
+
+class AsyncCircuitBreakerProvider(_Breaking):
+    """Asyncio variant of `CircuitBreakerProvider`."""
+
+    async def get_current(self, city: str) -> Dict[str, Any]:  # noqa: D401
+        started = self._check(city)
+        try:
+            data = await self._provider.get_current(city)
+        except BaseException as e:
+            self.breaker.record(self._clock() - started, e)
+            raise
+        self.breaker.record(self._clock() - started)
+        return data
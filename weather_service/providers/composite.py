@@ -0,0 +1,241 @@
+"""Composite provider querying several backends concurrently.
+
+Backends are ranked by health: those with fewer than `unhealthy_after`
+consecutive failures come first, fastest median latency first (backends
+without samples yet are tried early). Each call queries the first `fanout`
+backends of that ranking concurrently (all by default) and, depending on
+`mode`:
+
+  - "first": returns the first valid payload
+  - "merge": waits for the whole group and averages temperature, humidity
+    and wind speed of every valid payload on top of the best-ranked one;
+    `_provider` names every contributing backend ("openweathermap+fake")
+
+If no backend of the group answers, the next `fanout` backends are tried, so
+`fanout=1` routes every call to the fastest healthy backend and fails over to
+the others in order. When all fail, the error of the best-ranked backend is
+raised. Not-found cities, rate limiting and client deadlines do not make a
+backend unhealthy; any other error does.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import copy
+import threading
+import time
+from concurrent import futures
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+from core.settings import settings
+from weather_service.providers.base import PROVIDER_KEY, AsyncWeatherProvider, WeatherProvider
+from weather_service.errors import UpstreamDeadlineExceededError, UpstreamNotFoundError, UpstreamRateLimitedError
+from weather_service.providers.hedging import LatencyWindow
+
+MODES = ("first", "merge")
+
+# Answers that say nothing bad about a backend's health
+HEALTHY_ERRORS = (UpstreamNotFoundError, UpstreamRateLimitedError, UpstreamDeadlineExceededError)
+
+
+class ProviderHealth:
+    """Latency and error statistics of one backend."""
+
+    def __init__(self, name: str, *, window: int = 200, unhealthy_after: int = 3):
+        self.name = name
+        self.latencies = LatencyWindow(window)
+        self._unhealthy_after = max(1, unhealthy_after)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+        self.consecutive_errors = 0
+
+    @property
+    def healthy(self) -> bool:
+        return self.consecutive_errors < self._unhealthy_after
+
+    def record(self, duration: float, error: BaseException | None = None) -> None:
+        failed = error is not None and not isinstance(error, HEALTHY_ERRORS)
+        with self._lock:
+            self.calls += 1
+            self.errors += failed
+            self.consecutive_errors = self.consecutive_errors + 1 if failed else 0
+        if not failed:
+            self.latencies.add(duration)
+
+    def rank(self) -> Tuple[bool, float]:
+        """Sort key: healthy before unhealthy, then lowest median latency."""
+        return not self.healthy, self.latencies.quantile(0.5) or 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        p50, p95 = self.latencies.quantile(0.5), self.latencies.quantile(0.95)
+        with self._lock:
+            return {
+                "healthy": self.healthy,
+                "calls": self.calls,
+                "errors": self.errors,
+                "error_ratio": self.errors / self.calls if self.calls else 0.0,
+                "p50_s": None if p50 is None else round(p50, 3),
+                "p95_s": None if p95 is None else round(p95, 3),
+            }
+
+
+def merge_payloads(payloads: Sequence[Tuple[str, Dict[str, Any]]]) -> Dict[str, Any]:
+    """Average the numeric readings of several payloads onto the first (best-ranked) one."""
+    merged = copy.deepcopy(payloads[0][1])
+
+    def average(section: str, field: str, digits: int | None):
+        values = [p[section][field] for _, p in payloads if isinstance((p.get(section) or {}).get(field), (int, float))]
+        if values:
+            merged.setdefault(section, {})[field] = round(sum(values) / len(values), digits)
+
+    average("main", "temp", 2)
+    average("main", "humidity", None)
+    average("wind", "speed", 2)
+    merged[PROVIDER_KEY] = "+".join(name for name, _ in payloads)
+    return merged
+
+
+class _Composite:
+    """Ranking, grouping and statistics shared by the sync/async composites."""
+
+    name = "composite"
+
+    def __init__(
+        self,
+        providers: Dict[str, Any] | Sequence[Any],
+        *,
+        mode: str | None = None,
+        fanout: int | None = None,
+        unhealthy_after: int = 3,
+        window: int = 200,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if not providers:
+            raise ValueError("CompositeProvider needs at least one provider")
+        self._mode = settings.PROVIDER_COMPOSITE_MODE if mode is None else mode
+        if self._mode not in MODES:
+            raise ValueError(f"Unknown composite mode '{self._mode}' (expected one of {', '.join(MODES)})")
+        self._providers: Dict[str, Any] = {}
+        if isinstance(providers, dict):
+            self._providers.update(providers)
+        else:
+            for i, provider in enumerate(providers):
+                name = getattr(provider, "name", None) or f"provider{i}"
+                self._providers[name if name not in self._providers else f"{name}{i}"] = provider
+        fanout = settings.PROVIDER_COMPOSITE_FANOUT if fanout is None else fanout
+        self._fanout = fanout if fanout > 0 else len(self._providers)
+        self._clock = clock
+        self.health = {
+            name: ProviderHealth(name, window=window, unhealthy_after=unhealthy_after) for name in self._providers
+        }
+
+    @property
+    def providers(self) -> Dict[str, Any]:
+        return dict(self._providers)
+
+    def ranked(self) -> List[str]:
+        """Backend names in the order they are tried."""
+        order = list(self._providers)
+        return sorted(order, key=lambda name: (self.health[name].rank(), order.index(name)))
+
+    def _groups(self) -> List[List[str]]:
+        ranked = self.ranked()
+        return [ranked[i:i + self._fanout] for i in range(0, len(ranked), self._fanout)]
+
+    @staticmethod
+    def _first_error(groups: List[List[str]], errors: Dict[str, BaseException]) -> BaseException:
+        """The error of the best-ranked backend (ranking as of the start of the call)."""
+        return errors[next(name for group in groups for name in group if name in errors)]
+
+    def _result(self, group: List[str], results: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        valid = [(name, results[name]) for name in group if name in results]
+        return merge_payloads(valid) if self._mode == "merge" and len(valid) > 1 else valid[0][1]
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-backend health, latency and error statistics, in routing order."""
+        return {"mode": self._mode, "fanout": self._fanout, "providers": {n: self.health[n].stats() for n in self.ranked()}}
+
+
+class CompositeProvider(_Composite, WeatherProvider):
+    """Blocking composite; backends run on a shared thread pool (late answers still update statistics)."""
+
+    def __init__(self, providers: Dict[str, Any] | Sequence[Any], *, max_workers: int | None = None, **kwargs):
+        super().__init__(providers, **kwargs)
+        self._pool = futures.ThreadPoolExecutor(
+            max_workers=max_workers or len(self._providers) * settings.GRPC_MAX_WORKERS, thread_name_prefix="provider-composite"
+        )
+
+    def _call(self, name: str, city: str) -> Dict[str, Any]:
+        started = self._clock()
+        try:
+            data = self._providers[name].get_current(city)
+        except BaseException as e:
+            self.health[name].record(self._clock() - started, e)
+            raise
+        self.health[name].record(self._clock() - started)
+        return data
+
+    def get_current(self, city: str) -> Dict[str, Any]:  # noqa: D401
+        errors: Dict[str, BaseException] = {}
+        groups = self._groups()
+        for group in groups:
+            # One context copy per call keeps the client deadline in the pool threads
+            calls = {self._pool.submit(contextvars.copy_context().run, self._call, name, city): name for name in group}
+            results: Dict[str, Dict[str, Any]] = {}
+            for future in futures.as_completed(calls):
+                name = calls[future]
+                if future.exception() is not None:
+                    errors[name] = future.exception()
+                    continue
+                results[name] = future.result()
+                if self._mode == "first":
+                    break
+            if results:
+                return self._result(group, results)
+        raise self._first_error(groups, errors)
+
+    def close(self) -> None:
+        """Stop the pool without waiting for late answers (backends are closed by their owner)."""
+        self._pool.shutdown(wait=False)
+
+
+class AsyncCompositeProvider(_Composite, AsyncWeatherProvider):
+    """Asyncio composite; in "first" mode slower backends are cancelled (their elapsed time is recorded)."""
+
+    async def _call(self, name: str, city: str) -> Dict[str, Any]:
+        started = self._clock()
+        try:
+            data = await self._providers[name].get_current(city)
+        except asyncio.CancelledError:
+            # Lost the race: the elapsed time is a lower bound of its latency
+            self.health[name].record(self._clock() - started)
+            raise
+        except Exception as e:
+            self.health[name].record(self._clock() - started, e)
+            raise
+        self.health[name].record(self._clock() - started)
+        return data
+
+    async def get_current(self, city: str) -> Dict[str, Any]:  # noqa: D401
+        errors: Dict[str, BaseException] = {}
+        groups = self._groups()
+        for group in groups:
+            tasks = {asyncio.ensure_future(self._call(name, city)): name for name in group}
+            results: Dict[str, Dict[str, Any]] = {}
+            pending = set(tasks)
+            try:
+                while pending and not (results and self._mode == "first"):
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        if task.exception() is not None:
+                            errors[tasks[task]] = task.exception()
+                        else:
+                            results[tasks[task]] = task.result()
+            finally:
+                for task in pending:
+                    task.cancel()
+            if results:
+                return self._result(group, results)
+        raise self._first_error(groups, errors)
@@ -0,0 +1,110 @@
+"""Local fake provider for offline development and tests.
+
+`FakeWeatherProvider` answers without any network access with an
+OpenWeather-shaped payload derived from the city name, so the same city
+always gets the same weather (shifted by `temp_offset`, e.g. to tell two fake
+backends apart). Latency, random failures and unknown cities can be
+simulated to exercise the composite provider, circuit breaker and hedging:
+
+    WEATHER_PROVIDERS=fake python weather_server.py
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+import zlib
+from datetime import UTC, datetime
+from typing import Any, Dict, Iterable
+
+from weather_service.errors import UpstreamNotFoundError, UpstreamRequestError
+from weather_service.providers.base import AsyncWeatherProvider, WeatherProvider, register_provider
+from weather_service.providers.cache import normalize_city_key
+
+CONDITIONS = (
+    ("clear sky", "01d"),
+    ("few clouds", "02d"),
+    ("scattered clouds", "03d"),
+    ("overcast clouds", "04d"),
+    ("light rain", "10d"),
+    ("snow", "13d"),
+    ("mist", "50d"),
+)
+
+
+def fake_payload(city: str, temp_offset: float = 0.0) -> Dict[str, Any]:
+    """Deterministic OpenWeather-shaped payload for a city."""
+    seed = zlib.crc32(normalize_city_key(city).encode("utf-8"))
+    description, icon = CONDITIONS[seed % len(CONDITIONS)]
+    now = int(datetime.now(UTC).timestamp())
+    return {
+        "name": city.strip(),
+        "main": {
+            "temp": round(-10 + (seed % 4500) / 100 + temp_offset, 2),
+            "humidity": 30 + seed % 65,
+            "pressure": 990 + seed % 40,
+        },
+        "weather": [{"description": description, "icon": icon}],
+        "wind": {"speed": round((seed >> 8) % 150 / 10, 1)},
+        "clouds": {"all": (seed >> 4) % 101},
+        "dt": now,
+        "_fetched_at": datetime.now(UTC).isoformat(),
+    }
+
+
+class _FakeBehaviour:
+    """Simulated latency / failures shared by the sync and async fakes."""
+
+    def __init__(
+        self,
+        name: str = "fake",
+        *,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        unknown_cities: Iterable[str] = ("Atlantis",),
+        temp_offset: float = 0.0,
+        seed: int | None = None,
+    ):
+        self.name = name
+        self._latency = latency
+        self._jitter = jitter
+        self._error_rate = error_rate
+        self._unknown = {normalize_city_key(c) for c in unknown_cities}
+        self._temp_offset = temp_offset
+        self._rng = random.Random(seed)
+        self.calls = 0
+
+    def _delay(self) -> float:
+        return self._latency + (self._rng.uniform(0, self._jitter) if self._jitter else 0.0)
+
+    def _answer(self, city: str) -> Dict[str, Any]:
+        self.calls += 1
+        if normalize_city_key(city) in self._unknown:
+            raise UpstreamNotFoundError(f"City '{city}' not found")
+        if self._error_rate and self._rng.random() < self._error_rate:
+            raise UpstreamRequestError(f"Simulated failure of provider '{self.name}'")
+        return self.tag(fake_payload(city, self._temp_offset))
+
+
+@register_provider("fake")
+class FakeWeatherProvider(_FakeBehaviour, WeatherProvider):
+    """Blocking fake provider (sleeps for the simulated latency)."""
+
+    def get_current(self, city: str) -> Dict[str, Any]:  # noqa: D401
+        delay = self._delay()
+        if delay > 0:
+            time.sleep(delay)
+        return self._answer(city)
+
+
+@register_provider("fake", asynchronous=True)
+class AsyncFakeWeatherProvider(_FakeBehaviour, AsyncWeatherProvider):
+    """Asyncio fake provider."""
+
+    async def get_current(self, city: str) -> Dict[str, Any]:  # noqa: D401
+        delay = self._delay()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return self._answer(city)
@@ -0,0 +1,185 @@
+"""Hedged upstream requests to cut tail latency.
+
+`HedgedProvider` sends the request, and if no answer arrived after the
+`quantile` (p95 by default) of recently observed latencies, sends the same
+request a second time and returns whichever answer comes first. With a p95
+delay at most ~5% of calls are duplicated, while a call stuck behind one slow
+connection or upstream node no longer waits for it.
+
+Only slowness is hedged: a primary that fails before the hedge delay raises
+as usual, and a hedge is never sent when the client deadline (see
+`weather_service.deadlines`) would expire before it. Hedges cost upstream
+quota, so place the wrapper outside `RateLimitedProvider` to budget them.
+
+The sync wrapper runs calls on a small thread pool (a losing call finishes in
+the background); the async one cancels the losing task. The hedge delay is
+computed from primary requests only; a cancelled primary records its elapsed
+time as a lower bound, so the window is not left with winners alone (which
+would pull the delay down and hedge ever more often).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import threading
+import time
+from collections import deque
+from concurrent import futures
+from typing import Any, Callable, Dict
+
+from core.settings import settings
+from weather_service import deadlines
+
+
+class LatencyWindow:
+    """Thread-safe rolling window of call latencies in seconds."""
+
+    def __init__(self, size: int = 200):
+        self._samples: deque = deque(maxlen=max(1, size))
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def add(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def quantile(self, q: float) -> float | None:
+        """Nearest-rank quantile of the window (None while empty)."""
+        with self._lock:
+            if not self._samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, max(0, int(q * len(ordered) + 0.5) - 1))]
+
+
+class _Hedging:
+    """Hedge delay and counters shared by the sync/async wrappers."""
+
+    def __init__(
+        self,
+        provider,
+        *,
+        quantile: float | None = None,
+        initial_delay: float | None = None,
+        min_delay: float | None = None,
+        min_samples: int = 20,
+        window: int | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._provider = provider
+        self._quantile = settings.PROVIDER_HEDGE_QUANTILE if quantile is None else quantile
+        self._initial_delay = settings.PROVIDER_HEDGE_INITIAL_DELAY_SECONDS if initial_delay is None else initial_delay
+        self._min_delay = settings.PROVIDER_HEDGE_MIN_DELAY_SECONDS if min_delay is None else min_delay
+        self._min_samples = min_samples
+        self.latencies = LatencyWindow(settings.PROVIDER_HEDGE_WINDOW if window is None else window)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    def hedge_delay(self) -> float | None:
+        """Seconds to wait before hedging, or None if the client deadline leaves no room for a hedge."""
+        delay = self._initial_delay
+        if len(self.latencies) >= self._min_samples:
+            delay = self.latencies.quantile(self._quantile)
+        delay = max(self._min_delay, delay)
+        left = deadlines.remaining()
+        return None if left is not None and left <= delay else delay
+
+    def _count(self, calls: int = 0, hedged: int = 0, hedge_wins: int = 0) -> None:
+        with self._lock:
+            self.calls += calls
+            self.hedged += hedged
+            self.hedge_wins += hedge_wins
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hedging counters and the current hedge delay."""
+        with self._lock:
+            calls, hedged, wins = self.calls, self.hedged, self.hedge_wins
+        delay = self.hedge_delay()
+        return {
+            "calls": calls,
+            "hedged": hedged,
+            "hedge_wins": wins,
+            "hedge_ratio": hedged / calls if calls else 0.0,
+            "hedge_delay_s": None if delay is None else round(delay, 3),
+        }
+
+
+class HedgedProvider(_Hedging):
+    """Provider wrapper sending a second `get_current` when the first is slower than the hedge delay."""
+
+    def __init__(self, provider, *, max_workers: int | None = None, **kwargs):
+        super().__init__(provider, **kwargs)
+        self._pool = futures.ThreadPoolExecutor(
+            max_workers=max_workers or 2 * settings.GRPC_MAX_WORKERS, thread_name_prefix="provider-hedge"
+        )
+
+    def _timed(self, city: str, primary: bool) -> Dict[str, Any]:
+        started = self._clock()
+        data = self._provider.get_current(city)
+        if primary:
+            self.latencies.add(self._clock() - started)
+        return data
+
+    def _submit(self, city: str, primary: bool = False) -> futures.Future:
+        # Keep the caller's deadline in the pool thread
+        return self._pool.submit(contextvars.copy_context().run, self._timed, city, primary)
+
+    def get_current(self, city: str) -> Dict[str, Any]:  # noqa: D401
+        self._count(calls=1)
+        delay = self.hedge_delay()
+        calls = [self._submit(city, primary=True)]
+        if not futures.wait(calls, timeout=delay).done:
+            calls.append(self._submit(city))
+            self._count(hedged=1)
+        # First success wins; an error only counts once no other call is left
+        for i, future in enumerate(futures.as_completed(calls)):
+            if future.exception() is None or i == len(calls) - 1:
+                self._count(hedge_wins=int(future is not calls[0] and future.exception() is None))
+                return future.result()
+
+    def close(self) -> None:
+        """Stop the hedge pool without waiting for losing calls."""
+        self._pool.shutdown(wait=False)
+
+
+class AsyncHedgedProvider(_Hedging):
+    """Asyncio variant of `HedgedProvider`; the losing request is cancelled."""
+
+    async def _timed(self, city: str, primary: bool) -> Dict[str, Any]:
+        started = self._clock()
+        try:
+            data = await self._provider.get_current(city)
+        except asyncio.CancelledError:
+            if primary:  # lost the race: the elapsed time is a lower bound of its latency
+                self.latencies.add(self._clock() - started)
+            raise
+        if primary:
+            self.latencies.add(self._clock() - started)
+        return data
+
+    async def get_current(self, city: str) -> Dict[str, Any]:  # noqa: D401
+        self._count(calls=1)
+        delay = self.hedge_delay()
+        tasks = [asyncio.ensure_future(self._timed(city, primary=True))]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                tasks.append(asyncio.ensure_future(self._timed(city, primary=False)))
+                self._count(hedged=1)
+            pending = set(tasks)
+            while True:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                succeeded = [task for task in done if task.exception() is None]
+                if succeeded or not pending:
+                    winner = (succeeded or list(done))[0]
+                    self._count(hedge_wins=int(winner is not tasks[0] and bool(succeeded)))
+                    return winner.result()
+        finally:
+            for task in tasks:
+                task.cancel()
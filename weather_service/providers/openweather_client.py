@@ -1,45 +1,156 @@
 """Client wrapper for OpenWeatherMap HTTP API."""
 
 from __future__ import annotations
+import contextvars
 from typing import Any, Dict
 from datetime import UTC, datetime
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import MaxRetryError, ResponseError
+from urllib3.util.retry import Retry
 
 from core.settings import settings
+from weather_service import deadlines
+from weather_service.providers.base import WeatherProvider, register_provider
 from weather_service.errors import (
+    UpstreamDeadlineExceededError,
     UpstreamNotFoundError,
     UpstreamHttpError,
     UpstreamInvalidResponse,
+    UpstreamRateLimitedError,
     UpstreamRequestError,
 )
 
+# Transient gateway errors worth retrying; 429 is left to the caller so retries don't burn quota.
+RETRY_STATUS_CODES = (502, 503, 504)
 
-class OpenWeatherClient:
-    """Thin HTTP client for current weather endpoint (metric units)."""
+# Longest one attempt of the request in progress may take (connect + read timeout), for DeadlineRetry
+_attempt_seconds: contextvars.ContextVar[float] = contextvars.ContextVar("openweather_attempt_seconds", default=0.0)
 
-    def __init__(self, *, api_key: str | None = None, base_url: str | None = None, timeout: int = 8):
+
+class DeadlineRetry(Retry):
+    """`Retry` that stops once the client deadline leaves no room for the backoff plus another full attempt.
+
+    Per-attempt timeouts are capped at the deadline by the client, but urllib3
+    retries would otherwise run them again and again past it.
+    """
+
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        new = super().increment(method, url, response, error, _pool, _stacktrace)
+        left = deadlines.remaining()
+        if left is not None:
+            wait = new.get_backoff_time()
+            if response is not None and self.respect_retry_after_header:
+                wait = max(wait, new.get_retry_after(response) or 0.0)
+            if left < wait + _attempt_seconds.get():
+                reason = error or ResponseError(f"no time left for a retry within the client deadline ({left:.3f}s)")
+                raise MaxRetryError(_pool, url, reason) from error
+        return new
+
+
+def build_session(*, pool_size: int, max_retries: int, backoff_factor: float) -> requests.Session:
+    """Return a keep-alive session with a bounded connection pool and GET-only retries bounded by the client deadline."""
+    retry = DeadlineRetry(
+        total=max_retries,
+        connect=max_retries,
+        read=max_retries,
+        status=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=frozenset({"GET"}),
+        raise_on_status=False,
+        respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry, pool_block=False)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def retry_after_seconds(value: str | None) -> float | None:
+    """Seconds from a `Retry-After` header (delta-seconds form only; HTTP dates are ignored)."""
+    try:
+        return max(0.0, float(value)) if value else None
+    except ValueError:
+        return None
+
+
+def parse_current_response(city: str, resp) -> Dict[str, Any]:
+    """Validate an HTTP response (requests or httpx) and return the decoded payload."""
+    if resp.status_code == 404:
+        raise UpstreamNotFoundError(f"City '{city}' not found")
+    if resp.status_code == 429:
+        raise UpstreamRateLimitedError(retry_after=retry_after_seconds(resp.headers.get("Retry-After")))
+    if resp.status_code != 200:
+        raise UpstreamHttpError(resp.status_code)
+    try:
+        data = resp.json()
+    except ValueError as e:
+        raise UpstreamInvalidResponse("Invalid JSON from OpenWeather") from e
+    # Basic invariant sanity check
+    if "main" not in data:
+        raise UpstreamInvalidResponse("Missing 'main' section in response")
+    data.setdefault("_fetched_at", datetime.now(UTC).isoformat())
+    return data
+
+
+@register_provider("openweathermap")
+class OpenWeatherClient(WeatherProvider):
+    """Thin HTTP client for current weather endpoint (metric units).
+
+    Owns a pooled `requests.Session` so TCP/TLS connections are reused across
+    calls. The pool defaults to `GRPC_MAX_WORKERS` connections so every server
+    worker thread can hold one. `timeout` is kept for backward compatibility
+    and acts as the read timeout; the connect timeout is configured separately.
+    Both are capped by the client deadline of the RPC being served (see
+    `weather_service.deadlines`), and retries stop once that deadline leaves
+    no room for another attempt (`DeadlineRetry`).
+    """
+
+    name = "openweathermap"
+
+    def __init__(
+        self,
+        *,
+        api_key: str | None = None,
+        base_url: str | None = None,
+        timeout: float | None = None,
+        connect_timeout: float | None = None,
+        pool_size: int | None = None,
+        max_retries: int | None = None,
+        backoff_factor: float | None = None,
+        session: requests.Session | None = None,
+    ):
         self._api_key = api_key or settings.OPENWEATHER_API_KEY
         self._base_url = base_url or settings.OPENWEATHER_URL
-        self._timeout = timeout
+        self._timeout = settings.OPENWEATHER_READ_TIMEOUT if timeout is None else timeout
+        self._connect_timeout = settings.OPENWEATHER_CONNECT_TIMEOUT if connect_timeout is None else connect_timeout
+        self._session = session or build_session(
+            pool_size=pool_size or settings.GRPC_MAX_WORKERS,
+            max_retries=settings.OPENWEATHER_MAX_RETRIES if max_retries is None else max_retries,
+            backoff_factor=settings.OPENWEATHER_RETRY_BACKOFF if backoff_factor is None else backoff_factor,
+        )
 
     def get_current(self, city: str) -> Dict[str, Any]:  # noqa: D401
         if not self._api_key:
             raise RuntimeError("OPENWEATHER_API_KEY not set")
         params = {"q": city, "appid": self._api_key, "units": "metric"}
+        read_timeout = deadlines.timeout(self._timeout)
+        connect_timeout = min(self._connect_timeout, read_timeout)
+        token = _attempt_seconds.set(connect_timeout + read_timeout)
         try:
-            resp = requests.get(self._base_url, params=params, timeout=self._timeout)
-        except requests.RequestException as e:  # network / timeout
+            resp = self._session.get(self._base_url, params=params, timeout=(connect_timeout, read_timeout))
+        except requests.Timeout as e:
+            if read_timeout < self._timeout:  # cut short by the client deadline, not an upstream fault
+                raise UpstreamDeadlineExceededError(str(e)) from e
             raise UpstreamRequestError(str(e)) from e
-        if resp.status_code == 404:
-            raise UpstreamNotFoundError(f"City '{city}' not found")
-        if resp.status_code != 200:
-            raise UpstreamHttpError(resp.status_code)
-        try:
-            data = resp.json()
-        except ValueError as e:
-            raise UpstreamInvalidResponse("Invalid JSON from OpenWeather") from e
-        # Basic invariant sanity check
-        if "main" not in data:
-            raise UpstreamInvalidResponse("Missing 'main' section in response")
-        data.setdefault("_fetched_at", datetime.now(UTC).isoformat())
-        return data
+        except requests.RequestException as e:  # network / timeout / retries exhausted
+            raise UpstreamRequestError(str(e)) from e
+        finally:
+            _attempt_seconds.reset(token)
+        return self.tag(parse_current_response(city, resp))
+
+    def close(self) -> None:
+        """Release pooled connections."""
+        self._session.close()
@@ -0,0 +1,284 @@
+"""Upstream rate limiting for provider clients (token buckets with per-key budgets).
+
+OpenWeather enforces a calls-per-minute quota; exceeding it answers 429.
+`RateLimiter` hands out request slots from one token bucket per budget key
+(e.g. one per provider or API key), shared by every thread of the process.
+A caller reserves a slot and sleeps until it is due, so waiters are served in
+arrival order; a reservation further away than `max_wait` is refused instead
+(`UpstreamRateLimitedError`, mapped to RESOURCE_EXHAUSTED) and the caller can
+fall back to stale cached data (see `CachedProvider`, `PROVIDER_CACHE_STALE_SECONDS`).
+
+With `state_file` the buckets live in a small JSON file guarded by `fcntl.flock`,
+so several server processes on one host share the same budget (POSIX only).
+
+`RateLimitedProvider` / `AsyncRateLimitedProvider` wrap a provider with the
+same `get_current(city)` surface. A 429 from upstream empties the key's bucket
+for `Retry-After` seconds so other callers stop hitting the provider as well.
+With `bypass` (e.g. `CircuitBreaker.rejecting` of a breaker wrapped inside),
+calls that would fail fast anyway pass through without taking or waiting for
+a token, so an outage does not drain the budget.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Tuple
+
+from core.settings import settings
+from weather_service import deadlines
+from weather_service.errors import UpstreamRateLimitedError
+
+try:  # optional: cross-process budgets need POSIX file locks
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+logger = logging.getLogger("weather_service.providers.rate_limit")
+
+DEFAULT_KEY = "default"
+
+
+def parse_budgets(spec: str) -> Dict[str, float]:
+    """Parse `key=calls_per_minute` pairs separated by commas (e.g. "openweathermap=60,fake=600")."""
+    budgets: Dict[str, float] = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        key, sep, value = item.partition("=")
+        if not sep or not key.strip():
+            raise ValueError(f"Invalid rate limit budget {item!r} (expected key=calls_per_minute)")
+        budgets[key.strip()] = float(value)
+    return budgets
+
+
+class RateLimiter:
+    """Thread-safe token buckets, one per key, refilled at `per_minute` calls per minute.
+
+    `burst` bounds how many calls may go out back to back after an idle
+    period (default: one second's worth, at least 1). Keys missing from
+    `budgets` share the `per_minute` default; a budget of 0 means unlimited.
+    """
+
+    def __init__(
+        self,
+        per_minute: float,
+        *,
+        burst: float | None = None,
+        budgets: Dict[str, float] | None = None,
+        state_file: str | None = None,
+        clock: Callable[[], float] | None = None,
+    ):
+        if state_file and fcntl is None:
+            raise RuntimeError("Cross-process rate limiting (state_file) needs fcntl (POSIX)")
+        self._per_minute = per_minute
+        self._burst = burst
+        self._budgets = dict(budgets or {})
+        self._state_file = state_file or None
+        # Processes sharing a file need a shared clock: wall time instead of monotonic
+        self._clock = clock or (time.time if self._state_file else time.monotonic)
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, Tuple[float, float]] = {}  # key -> (tokens, updated_at)
+        self.granted = 0
+        self.throttled = 0
+        self.rejected = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    @classmethod
+    def from_settings(cls) -> "RateLimiter":
+        return cls(
+            settings.PROVIDER_RATE_LIMIT_PER_MINUTE,
+            burst=settings.PROVIDER_RATE_LIMIT_BURST or None,
+            budgets=parse_budgets(settings.PROVIDER_RATE_LIMIT_BUDGETS),
+            state_file=settings.PROVIDER_RATE_LIMIT_STATE_FILE or None,
+        )
+
+    @property
+    def shared(self) -> bool:
+        """True when buckets live in the state file (each update takes a file lock and fsyncs)."""
+        return self._state_file is not None
+
+    def _limits(self, key: str) -> Tuple[float, float]:
+        """(tokens per second, bucket capacity) of a key."""
+        rate = self._budgets.get(key, self._per_minute) / 60.0
+        return rate, self._burst if self._burst else max(1.0, rate)
+
+    def _take(self, buckets: Dict[str, Tuple[float, float]], key: str, max_wait: float | None) -> float | None:
+        """Reserve one slot in `buckets` (mutated); return the wait in seconds or None if too far away."""
+        rate, capacity = self._limits(key)
+        now = self._clock()
+        tokens, updated = buckets.get(key, (capacity, now))
+        tokens = min(capacity, tokens + max(0.0, now - updated) * rate)
+        # A negative balance is the queue of callers already holding a reservation
+        wait = 0.0 if tokens >= 1 else (1 - tokens) / rate
+        if max_wait is not None and wait > max_wait:
+            buckets[key] = (tokens, now)
+            return None
+        buckets[key] = (tokens - 1, now)
+        return wait
+
+    def _penalize(self, buckets: Dict[str, Tuple[float, float]], key: str, seconds: float) -> None:
+        rate, capacity = self._limits(key)
+        now = self._clock()
+        tokens, updated = buckets.get(key, (capacity, now))
+        tokens = min(capacity, tokens + max(0.0, now - updated) * rate)
+        buckets[key] = (min(tokens, -seconds * rate), now)
+
+    def _with_buckets(self, update: Callable[[Dict[str, Tuple[float, float]]], Any]) -> Any:
+        """Run `update` on the bucket table, loading / saving the state file when shared."""
+        with self._lock:
+            if not self._state_file:
+                return update(self._buckets)
+            with open(self._state_file, "a+", encoding="utf-8") as fh:
+                fcntl.flock(fh, fcntl.LOCK_EX)
+                try:
+                    fh.seek(0)
+                    try:
+                        buckets = {k: tuple(v) for k, v in json.loads(fh.read() or "{}").items()}
+                    except ValueError:
+                        logger.warning("Resetting unreadable rate limit state in %s", self._state_file)
+                        buckets = {}
+                    result = update(buckets)
+                    fh.seek(0)
+                    fh.truncate()
+                    json.dump(buckets, fh)
+                    fh.flush()
+                    os.fsync(fh.fileno())
+                    return result
+                finally:
+                    fcntl.flock(fh, fcntl.LOCK_UN)
+
+    def reserve(self, key: str = DEFAULT_KEY, max_wait: float | None = None) -> float | None:
+        """Reserve the next call for `key`; return seconds to wait before making it, or None if over `max_wait`."""
+        rate, _ = self._limits(key)
+        if rate <= 0:
+            return 0.0
+        wait = self._with_buckets(lambda buckets: self._take(buckets, key, max_wait))
+        with self._lock:
+            if wait is None:
+                self.rejected += 1
+            else:
+                self.granted += 1
+                if wait > 0:
+                    self.throttled += 1
+                    self.wait_seconds += wait
+                    self.max_wait_seconds = max(self.max_wait_seconds, wait)
+        return wait
+
+    def penalize(self, key: str, seconds: float) -> None:
+        """Hold back every caller of `key` for `seconds` (upstream answered 429)."""
+        rate, _ = self._limits(key)
+        if rate > 0 and seconds > 0:
+            self._with_buckets(lambda buckets: self._penalize(buckets, key, seconds))
+
+    def stats(self) -> Dict[str, Any]:
+        """Return throttling counters (granted, throttled, rejected, wait seconds)."""
+        with self._lock:
+            return {
+                "granted": self.granted,
+                "throttled": self.throttled,
+                "rejected": self.rejected,
+                "wait_seconds": round(self.wait_seconds, 3),
+                "max_wait_seconds": round(self.max_wait_seconds, 3),
+                "avg_wait_seconds": round(self.wait_seconds / self.throttled, 3) if self.throttled else 0.0,
+            }
+
+
+class _RateLimited:
+    """Shared budget bookkeeping for the sync/async wrappers."""
+
+    def __init__(
+        self,
+        provider,
+        limiter: RateLimiter,
+        *,
+        key: str = DEFAULT_KEY,
+        max_wait: float | None = None,
+        bypass: Callable[[], bool] | None = None,
+    ):
+        self._provider = provider
+        self._limiter = limiter
+        self._key = key
+        self._max_wait = settings.PROVIDER_RATE_LIMIT_MAX_WAIT_SECONDS if max_wait is None else max_wait
+        self._bypass = bypass
+        self._lock = threading.Lock()  # one wrapper is shared by every server thread
+        self.upstream_429 = 0
+        self.bypassed = 0
+
+    def _bypassing(self) -> bool:
+        if self._bypass is None or not self._bypass():
+            return False
+        with self._lock:
+            self.bypassed += 1
+        return True
+
+    def _reserve(self, city: str) -> float:
+        # Never queue past the client deadline of the RPC being served
+        left = deadlines.remaining()
+        wait = self._limiter.reserve(self._key, self._max_wait if left is None else max(0.0, min(self._max_wait, left)))
+        if wait is None:
+            raise UpstreamRateLimitedError(f"Rate limit budget '{self._key}' exhausted for '{city}'")
+        return wait
+
+    def _rate_limited_upstream(self, error: UpstreamRateLimitedError) -> None:
+        with self._lock:
+            self.upstream_429 += 1
+        retry_after = error.retry_after or 60.0
+        logger.warning("Upstream rate limited '%s'; holding calls for %.1fs", self._key, retry_after)
+        self._limiter.penalize(self._key, retry_after)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = {"upstream_429": self.upstream_429, "bypassed": self.bypassed}
+        return {"key": self._key, **counters, **self._limiter.stats()}
+
+
+class RateLimitedProvider(_RateLimited):
+    """Provider wrapper spending one `limiter` token per upstream `get_current` call."""
+
+    def __init__(self, provider, limiter: RateLimiter, *, sleep: Callable[[float], None] = time.sleep, **kwargs):
+        super().__init__(provider, limiter, **kwargs)
+        self._sleep = sleep
+
+    def get_current(self, city: str) -> Dict[str, Any]:  # noqa: D401
+        if self._bypassing():
+            return self._provider.get_current(city)
+        wait = self._reserve(city)
+        if wait > 0:
+            self._sleep(wait)
+        try:
+            return self._provider.get_current(city)
+        except UpstreamRateLimitedError as e:
+            self._rate_limited_upstream(e)
+            raise
+
+
+class AsyncRateLimitedProvider(_RateLimited):
+    """Asyncio variant of `RateLimitedProvider`; waiting callers do not block the event loop.
+
+    With a shared (state file) limiter, reservations and 429 penalties take a
+    blocking file lock, so they run in a worker thread instead of on the loop.
+    """
+
+    async def get_current(self, city: str) -> Dict[str, Any]:  # noqa: D401
+        if self._bypassing():
+            return await self._provider.get_current(city)
+        if self._limiter.shared:
+            wait = await asyncio.to_thread(self._reserve, city)
+        else:
+            wait = self._reserve(city)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        try:
+            return await self._provider.get_current(city)
+        except UpstreamRateLimitedError as e:
+            if self._limiter.shared:
+                await asyncio.to_thread(self._rate_limited_upstream, e)
+            else:
+                self._rate_limited_upstream(e)
+            raise
@@ -1,7 +1,12 @@
-"""Server bootstrap wiring for Weather gRPC service only."""
+"""Server bootstrap wiring for Weather gRPC service only.
+
+`serve` runs the classic thread-pool server; `serve_async` runs the same
+service on `grpc.aio` so in-flight RPCs are coroutines rather than threads.
+"""
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import time
 from concurrent import futures
@@ -10,24 +15,118 @@ import grpc
 
 from core.settings import settings
 from db.mongo_repository import MongoRepository
+from db.write_behind import WriteBehindRepository
 import proto.weather_pb2_grpc as weather_pb2_grpc
-from weather_service.interceptors import ApiKeyInterceptor
+from weather_service.interceptors import ApiKeyInterceptor, AsyncApiKeyInterceptor
 from weather_service.service import WeatherService
-from weather_service.providers.openweather_client import OpenWeatherClient
+from weather_service.async_service import AsyncWeatherService
+from weather_service.providers.base import create_async_provider, create_provider, provider_names
+from weather_service.providers.cache import CachedProvider, AsyncCachedProvider
+from weather_service.providers.circuit_breaker import CircuitBreakerProvider, AsyncCircuitBreakerProvider
+from weather_service.providers.composite import CompositeProvider, AsyncCompositeProvider
+from weather_service.providers.hedging import HedgedProvider, AsyncHedgedProvider
+from weather_service.providers.rate_limit import RateLimiter, RateLimitedProvider, AsyncRateLimitedProvider
 
 logger = logging.getLogger("weather_service.server")
 
 
+def prepare_storage(repo) -> None:
+    """Create the time-series collection / indexes as configured; failures are logged so the server can still start."""
+    try:
+        if settings.MONGO_TIMESERIES and repo.ensure_collection():
+            logger.info("Created time-series observation collection")
+        if settings.MONGO_ENSURE_INDEXES:
+            logger.info("Ensured Mongo indexes: %s", repo.ensure_indexes())
+    except Exception as e:
+        logger.warning("Could not prepare Mongo storage: %s", e)
+
+
+async def prepare_storage_async(repo) -> None:
+    """`prepare_storage` for the async repository."""
+    try:
+        if settings.MONGO_TIMESERIES and await repo.ensure_collection():
+            logger.info("Created time-series observation collection")
+        if settings.MONGO_ENSURE_INDEXES:
+            logger.info("Ensured Mongo indexes: %s", await repo.ensure_indexes())
+    except Exception as e:
+        logger.warning("Could not prepare Mongo storage: %s", e)
+
+
+def build_provider(*, asynchronous: bool = False):
+    """Build the provider stack configured in settings.
+
+    Every backend in WEATHER_PROVIDERS gets its own circuit breaker, rate limit
+    budget (keyed by provider name) and hedging, innermost first; the limiter
+    lets calls through untouched while the breaker rejects them, so an outage
+    spends no budget. Several backends are combined by a composite provider,
+    and the result is cached.
+    Returns `(provider, clients, wrappers)`: the backend clients to close and
+    `(label, wrapper)` pairs whose `stats()` are logged at shutdown.
+    """
+    if asynchronous:
+        create, breaking, limiting, hedging, composite, caching = (
+            create_async_provider, AsyncCircuitBreakerProvider, AsyncRateLimitedProvider,
+            AsyncHedgedProvider, AsyncCompositeProvider, AsyncCachedProvider,
+        )
+    else:
+        create, breaking, limiting, hedging, composite, caching = (
+            create_provider, CircuitBreakerProvider, RateLimitedProvider, HedgedProvider, CompositeProvider, CachedProvider,
+        )
+    names = provider_names(settings.WEATHER_PROVIDERS)
+    if not names:
+        raise ValueError("WEATHER_PROVIDERS names no provider")
+    limiter = RateLimiter.from_settings() if settings.PROVIDER_RATE_LIMIT_PER_MINUTE > 0 else None
+    clients, wrappers, chains = [], [], {}
+    for name in names:
+        provider = client = create(name)
+        clients.append(client)
+        bypass = None
+        if settings.PROVIDER_BREAKER_FAILURE_THRESHOLD > 0:
+            provider = breaking(provider)
+            bypass = lambda breaker=provider.breaker: breaker.rejecting  # noqa: E731
+            wrappers.append((f"{name} circuit breaker", provider))
+        if limiter is not None:
+            # The breaker stays inside so its slow-call timing excludes queueing for a token
+            provider = limiting(provider, limiter, key=name, bypass=bypass)
+            wrappers.append((f"{name} rate limit", provider))
+        if settings.PROVIDER_HEDGE_ENABLED:
+            # Outside the rate limiter so hedges spend the budget too
+            provider = hedging(provider)
+            wrappers.append((f"{name} hedging", provider))
+        chains[name] = provider
+    provider = chains[names[0]]
+    if len(chains) > 1:
+        provider = composite(chains)
+        wrappers.append(("composite", provider))
+    if settings.PROVIDER_CACHE_TTL_SECONDS > 0:
+        provider = caching(provider)
+        wrappers.append(("cache", provider))
+    return provider, clients, wrappers
+
+
+def log_provider_stats(wrappers) -> None:
+    for label, wrapper in wrappers:
+        logger.info("Provider %s stats: %s", label, wrapper.stats())
+
+
 def serve(*, port: int | None = None, repo=None, provider=None) -> None: 
     """Start the gRPC server with injected dependencies (optional overrides)."""
     settings.configure_logging()  
     server = grpc.server(
-        futures.ThreadPoolExecutor(max_workers=10),
+        futures.ThreadPoolExecutor(max_workers=settings.GRPC_MAX_WORKERS),
         interceptors=[ApiKeyInterceptor()],
     )
-    repo = repo or MongoRepository(settings.MONGO_URI)
-    provider = provider or OpenWeatherClient()
-    weather_pb2_grpc.add_WeatherServiceServicer_to_server(WeatherService(repo, provider), server)
+    write_behind = None
+    if repo is None:
+        repo = MongoRepository(settings.MONGO_URI)
+        prepare_storage(repo)
+        if settings.WRITE_BEHIND_ENABLED:
+            repo = write_behind = WriteBehindRepository(repo)
+    clients, wrappers = [], []
+    if provider is None:
+        provider, clients, wrappers = build_provider()
+    service = WeatherService(repo, provider)
+    weather_pb2_grpc.add_WeatherServiceServicer_to_server(service, server)
     run_port = port or settings.GRPC_PORT
     server.add_insecure_port(f"[::]:{run_port}")
     server.start()
@@ -36,8 +135,63 @@ def serve(*, port: int | None = None, repo=None, provider=None) -> None:
         while True:
             time.sleep(86400)
     except KeyboardInterrupt:
-        server.stop(0)
+        service.close()
+        # Let in-flight RPCs enqueue their observations before the final flush
+        server.stop(settings.GRPC_SHUTDOWN_GRACE_SECONDS).wait()
+        if write_behind is not None:
+            write_behind.close()
+        log_provider_stats(wrappers)
+        for _, wrapper in wrappers:
+            if hasattr(wrapper, "close"):  # thread pools of hedging / composite providers
+                wrapper.close()
+        for client in clients:
+            client.close()
+
+
+async def serve_async(*, port: int | None = None, repo=None, provider=None) -> None:
+    """Start the `grpc.aio` server; `repo` / `provider` overrides must be async."""
+    settings.configure_logging()
+    server = grpc.aio.server(
+        interceptors=[AsyncApiKeyInterceptor()],
+        maximum_concurrent_rpcs=settings.GRPC_AIO_MAX_CONCURRENT_RPCS or None,
+    )
+    owned_repo = None
+    if repo is None:
+        # Imported lazily so the sync server does not require Motor
+        from db.async_mongo_repository import AsyncMongoRepository
+        repo = owned_repo = AsyncMongoRepository(settings.MONGO_URI)
+        await prepare_storage_async(repo)
+    clients, wrappers = [], []
+    if provider is None:
+        provider, clients, wrappers = build_provider(asynchronous=True)
+    service = AsyncWeatherService(repo, provider)
+    weather_pb2_grpc.add_WeatherServiceServicer_to_server(service, server)
+    run_port = port or settings.GRPC_PORT
+    server.add_insecure_port(f"[::]:{run_port}")
+    await server.start()
+    logger.info("gRPC WeatherService (asyncio) running on port %s", run_port)
+    try:
+        await server.wait_for_termination()
+    finally:
+        await service.aclose()
+        await server.stop(settings.GRPC_SHUTDOWN_GRACE_SECONDS)
+        log_provider_stats(wrappers)
+        for client in clients:
+            await client.aclose()
+        if owned_repo is not None:
+            owned_repo.close()
+
+
+def main() -> None:
+    """Run the asyncio server when GRPC_ASYNC is enabled, else the thread-pool server."""
+    if settings.GRPC_ASYNC:
+        try:
+            asyncio.run(serve_async())
+        except KeyboardInterrupt:
+            pass
+    else:
+        serve()
 
 
 if __name__ == "__main__": 
-    serve()
+    main()
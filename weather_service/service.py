@@ -2,77 +2,291 @@
 
 from __future__ import annotations
 
+import contextvars
 import logging
 import unicodedata
-from datetime import UTC, datetime
+from concurrent import futures
+from datetime import UTC, datetime, timezone
+from typing import Any, Dict, List, Tuple
 
 import grpc
 
+from core.settings import settings
+
 import proto.weather_pb2 as weather_pb2
 import proto.weather_pb2_grpc as weather_pb2_grpc
+from weather_service import deadlines
 from weather_service.models import WeatherNormalized
+from weather_service.providers.base import PROVIDER_KEY, provider_names
+from weather_service.subscriptions import SubscriptionHub, SubscriptionLimitError, stream_limit
 from weather_service.errors import (
+    UpstreamCircuitOpenError,
+    UpstreamDeadlineExceededError,
     UpstreamNotFoundError,
     UpstreamHttpError,
     UpstreamInvalidResponse,
+    UpstreamRateLimitedError,
     UpstreamRequestError,
 )
 
 logger = logging.getLogger("weather_service.service")
 
+UPSTREAM_ERRORS = (UpstreamNotFoundError, UpstreamRequestError, UpstreamHttpError, UpstreamInvalidResponse)
+
+# Stored fields needed to answer from the last observation while the provider circuit is open
+STALE_FIELDS = ("city", "observation_time", "temp_c", "humidity_pct", "conditions", "wind_speed_ms")
+
+
+def upstream_error_status(error: Exception) -> Tuple[grpc.StatusCode, str]:
+    """Map a typed upstream exception to the gRPC status code and detail to abort with."""
+    if isinstance(error, UpstreamNotFoundError):
+        return grpc.StatusCode.NOT_FOUND, str(error)
+    if isinstance(error, UpstreamDeadlineExceededError):
+        return grpc.StatusCode.DEADLINE_EXCEEDED, str(error)
+    if isinstance(error, UpstreamRequestError):
+        return grpc.StatusCode.UNAVAILABLE, f"HTTP error: {error}"
+    if isinstance(error, UpstreamRateLimitedError):
+        return grpc.StatusCode.RESOURCE_EXHAUSTED, str(error)
+    if isinstance(error, UpstreamHttpError):
+        return grpc.StatusCode.INTERNAL, f"Upstream error {error.status_code}"
+    return grpc.StatusCode.INTERNAL, str(error)
+
+
+def ascii_city(name: str) -> str:
+    """City name as persisted: diacritics stripped (the name itself if nothing ASCII remains)."""
+    return unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode("ascii") or name
+
+
+def normalize_payload(city: str, data: Dict[str, Any]) -> WeatherNormalized:
+    """Build the normalized domain model from an upstream payload."""
+    # Normalize / strip diacritics from city name for persistence consistency
+    return WeatherNormalized(
+        city=ascii_city(data.get("name", city)),
+        temp_c=data.get("main", {}).get("temp"),
+        humidity_pct=data.get("main", {}).get("humidity"),
+        conditions=(data.get("weather") or [{}])[0].get("description"),
+        wind_speed_ms=(data.get("wind") or {}).get("speed"),
+        fetched_at=datetime.now(UTC),
+    )
+
+
+def default_provider_name() -> str:
+    """Provider stored for untagged payloads: the first configured one (historically "openweathermap")."""
+    names = provider_names(settings.WEATHER_PROVIDERS)
+    return names[0] if names else "openweathermap"
+
+
+def observation_document(normalized: WeatherNormalized, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the Mongo document persisted for one observation."""
+    # The provider tag is internal; keep the stored payload exactly as upstream sent it
+    raw = {key: value for key, value in data.items() if key != PROVIDER_KEY}
+    return {
+        "city": normalized.city,
+        "provider": data.get(PROVIDER_KEY) or default_provider_name(),
+        "observation_time": normalized.fetched_at,
+        "fetched_at": normalized.fetched_at,
+        "temp_c": normalized.temp_c,
+        "humidity_pct": normalized.humidity_pct,
+        "wind_speed_ms": normalized.wind_speed_ms,
+        "conditions": normalized.conditions,
+        "raw": raw,
+    }
+
+
+def to_response(normalized: WeatherNormalized) -> weather_pb2.GetWeatherResponse:
+    """Convert the normalized model into the protobuf response message."""
+    return weather_pb2.GetWeatherResponse(
+        city=normalized.city,
+        temp_c=normalized.temp_c or 0.0,
+        humidity_pct=normalized.humidity_pct or 0,
+        conditions=normalized.conditions or "",
+        wind_speed_ms=normalized.wind_speed_ms or 0.0,
+        fetched_at_iso=normalized.fetched_at.isoformat(),
+    )
+
+
+def stale_response(doc: Dict[str, Any] | None, now: datetime | None = None) -> weather_pb2.GetWeatherResponse | None:
+    """Response flagged `stale` from a stored observation, or None if missing / older than the allowed age."""
+    if not doc or doc.get("observation_time") is None:
+        return None
+    observed = doc["observation_time"]
+    if observed.tzinfo is None:  # repository datetimes are naive UTC
+        observed = observed.replace(tzinfo=timezone.utc)
+    max_age = settings.PROVIDER_BREAKER_STALE_MAX_AGE_SECONDS
+    if max_age > 0 and ((now or datetime.now(UTC)) - observed).total_seconds() > max_age:
+        return None
+    response = to_response(WeatherNormalized(
+        city=doc.get("city") or "",
+        temp_c=doc.get("temp_c"),
+        humidity_pct=doc.get("humidity_pct"),
+        conditions=doc.get("conditions"),
+        wind_speed_ms=doc.get("wind_speed_ms"),
+        fetched_at=observed,
+    ))
+    response.stale = True
+    return response
+
+
+def unique_cities(cities) -> List[str]:
+    """Return stripped, non-empty city names without duplicates (request order kept)."""
+    return list(dict.fromkeys(c.strip() for c in cities if c.strip()))
+
+
+def batch_parallelism(requested: int, unique_count: int) -> int:
+    """Clamp the client-requested fan-out to the server limit and batch size."""
+    limit = settings.BATCH_MAX_PARALLELISM
+    if requested > 0:
+        limit = min(limit, requested)
+    return max(1, min(limit, unique_count))
+
+
+def batch_result(requested_city: str, outcome) -> weather_pb2.CityWeatherResult:
+    """Build a per-city batch result from a `(normalized, payload)` outcome, a stale response or an upstream error."""
+    if not requested_city.strip():
+        return weather_pb2.CityWeatherResult(
+            requested_city=requested_city,
+            status_code=grpc.StatusCode.INVALID_ARGUMENT.value[0],
+            error="City required",
+        )
+    if isinstance(outcome, Exception):
+        code, message = upstream_error_status(outcome)
+        return weather_pb2.CityWeatherResult(requested_city=requested_city, status_code=code.value[0], error=message)
+    return weather_pb2.CityWeatherResult(
+        requested_city=requested_city,
+        status_code=grpc.StatusCode.OK.value[0],
+        weather=outcome if isinstance(outcome, weather_pb2.GetWeatherResponse) else to_response(outcome[0]),
+    )
+
+
+def validate_subscription_cities(cities) -> Tuple[List[str], str | None]:
+    """Return de-duplicated cities and an INVALID_ARGUMENT detail if the request is unusable."""
+    unique = unique_cities(cities)
+    if not unique:
+        return unique, "At least one city required"
+    if len(unique) > settings.SUBSCRIBE_MAX_CITIES:
+        return unique, f"At most {settings.SUBSCRIBE_MAX_CITIES} cities per subscription"
+    return unique, None
+
 
 class WeatherService(weather_pb2_grpc.WeatherServiceServicer):
-    def __init__(self, repo, provider): 
+    def __init__(self, repo, provider):
         # Store repository and provider references for later use
         self.repo = repo
         self.provider = provider
+        # Shared upstream poller for SubscribeWeather streams (thread started lazily); each
+        # stream holds a worker thread, so their number is capped below GRPC_MAX_WORKERS
+        self.subscriptions = SubscriptionHub(self._poll_city, max_streams=stream_limit())
 
-    def GetCurrentWeather(self, request, context): 
+    def GetCurrentWeather(self, request, context):
         city = request.city.strip()
         if not city:
             context.abort(grpc.StatusCode.INVALID_ARGUMENT, "City required")
+        with deadlines.deadline_scope(context):
+            # The client may have given up while the request waited for a worker thread
+            if not context.is_active():
+                context.abort(grpc.StatusCode.CANCELLED, "Request cancelled or past its deadline")
+            try:
+                data = self.provider.get_current(city)
+            except UpstreamCircuitOpenError as e:
+                stale = self._stale_response(city)
+                if stale is None:
+                    context.abort(*upstream_error_status(e))
+                return stale
+            except UPSTREAM_ERRORS as e:
+                context.abort(*upstream_error_status(e))
+
+            normalized = normalize_payload(city, data)
+            self._persist(normalized, data)
+            return to_response(normalized)
+
+    def GetCurrentWeatherBatch(self, request, context):
+        if not request.cities:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, "At least one city required")
+        if len(request.cities) > settings.BATCH_MAX_CITIES:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, f"At most {settings.BATCH_MAX_CITIES} cities per batch")
+        cities = unique_cities(request.cities)
+        outcomes: Dict[str, Any] = {}
+        with deadlines.deadline_scope(context):
+            if cities:
+                workers = batch_parallelism(request.max_parallelism, len(cities))
+                with futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix="weather-batch") as pool:
+                    # One context copy per city: each carries the deadline into its worker thread
+                    pending = [pool.submit(contextvars.copy_context().run, self._fetch_outcome, c, context) for c in cities]
+                    outcomes = dict(zip(cities, (f.result() for f in pending)))
+
+            # Fresh outcomes only: errors and stale answers are not persisted
+            docs = [observation_document(*o) for o in outcomes.values() if isinstance(o, tuple)]
+            if docs:
+                try:
+                    with deadlines.write_budget():
+                        self.repo.insert_observations(docs)
+                except Exception as persist_err:
+                    logger.warning("Failed to persist %d batch observations: %s", len(docs), persist_err, exc_info=True)
+        return weather_pb2.GetWeatherBatchResponse(results=[
+            batch_result(c, outcomes.get(c.strip())) for c in request.cities
+        ])
+
+    def SubscribeWeather(self, request, context):
+        cities, invalid = validate_subscription_cities(request.cities)
+        if invalid:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, invalid)
         try:
-            data = self.provider.get_current(city)
-        except UpstreamNotFoundError as e:
-            context.abort(grpc.StatusCode.NOT_FOUND, str(e))
-        except UpstreamRequestError as e:
-            context.abort(grpc.StatusCode.UNAVAILABLE, f"HTTP error: {e}")
-        except UpstreamHttpError as e:
-            context.abort(grpc.StatusCode.INTERNAL, f"Upstream error {e.status_code}")
-        except UpstreamInvalidResponse as e:
-            context.abort(grpc.StatusCode.INTERNAL, str(e))
-
-        # Normalize / strip diacritics from city name for persistence consistency
-        upstream_city = data.get("name", city)
-        ascii_city = unicodedata.normalize("NFKD", upstream_city).encode("ascii", "ignore").decode("ascii")
-
-        normalized = WeatherNormalized(
-            city=ascii_city or upstream_city,
-            temp_c=data.get("main", {}).get("temp"),
-            humidity_pct=data.get("main", {}).get("humidity"),
-            conditions=(data.get("weather") or [{}])[0].get("description"),
-            wind_speed_ms=(data.get("wind") or {}).get("speed"),
-            fetched_at=datetime.now(UTC),
-        )
+            sub = self.subscriptions.subscribe(cities, request.min_interval_seconds)
+        except SubscriptionLimitError as e:
+            context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, str(e))
+        # Wake the waiting stream as soon as the client cancels / disconnects
+        context.add_callback(sub.close)
         try:
-            self.repo.insert_observation({
-                "city": normalized.city,
-                "provider": "openweathermap",
-                "observation_time": normalized.fetched_at,
-                "fetched_at": normalized.fetched_at,
-                "temp_c": normalized.temp_c,
-                "humidity_pct": normalized.humidity_pct,
-                "wind_speed_ms": normalized.wind_speed_ms,
-                "conditions": normalized.conditions,
-                "raw": data,
-            })
-        except Exception as persist_err:  
+            while context.is_active() and not sub.closed:
+                update = sub.get(timeout=1.0)
+                if update is not None:
+                    yield update
+        finally:
+            self.subscriptions.unsubscribe(sub)
+
+    def close(self) -> None:
+        """Stop background work (subscription polling)."""
+        self.subscriptions.stop()
+
+    def _persist(self, normalized: WeatherNormalized, data: Dict[str, Any]) -> None:
+        try:
+            with deadlines.write_budget():
+                self.repo.insert_observation(observation_document(normalized, data))
+        except Exception as persist_err:
             logger.warning("Failed to persist observation: %s", persist_err, exc_info=True)
-        return weather_pb2.GetWeatherResponse(
-            city=normalized.city,
-            temp_c=normalized.temp_c or 0.0,
-            humidity_pct=normalized.humidity_pct or 0,
-            conditions=normalized.conditions or "",
-            wind_speed_ms=normalized.wind_speed_ms or 0.0,
-            fetched_at_iso=normalized.fetched_at.isoformat(),
-        )
+
+    def _stale_response(self, city: str) -> weather_pb2.GetWeatherResponse | None:
+        """Last stored observation of a city flagged `stale` (None if unavailable or too old)."""
+        # Stored names use the upstream spelling ("London"), so match the client's ignoring case
+        try:
+            doc = self.repo.get_latest_observation(ascii_city(city), fields=STALE_FIELDS, ignore_case=True)
+        except Exception as e:
+            logger.warning("Could not read the last observation of '%s': %s", city, e)
+            return None
+        return stale_response(doc)
+
+    def _poll_city(self, city: str) -> weather_pb2.GetWeatherResponse:
+        """Fetch + persist one city for the subscription hub (errors propagate to the hub)."""
+        data = self.provider.get_current(city)
+        normalized = normalize_payload(city, data)
+        self._persist(normalized, data)
+        return to_response(normalized)
+
+    def _fetch_outcome(self, city: str, context=None):
+        """Fetch one city, returning (normalized, payload), a stale response while the circuit is open, or the upstream exception."""
+        if context is not None and not context.is_active():
+            # Remaining cities of an abandoned batch are not fetched
+            return UpstreamDeadlineExceededError(f"Request cancelled or past its deadline; '{city}' not fetched")
+        try:
+            data = self.provider.get_current(city)
+            return normalize_payload(city, data), data
+        except UpstreamCircuitOpenError as e:
+            # Same fallback as GetCurrentWeather: the last stored observation, flagged stale
+            stale = self._stale_response(city)
+            return e if stale is None else stale
+        except UPSTREAM_ERRORS as e:
+            return e
+        except Exception as e:
+            # A provider bug or malformed payload fails this city only (INTERNAL), not the whole batch
+            logger.exception("Unexpected error fetching '%s' for a batch", city)
+            return e
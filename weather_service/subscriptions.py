@@ -0,0 +1,383 @@
+"""Shared upstream polling for `SubscribeWeather` streams.
+
+A hub tracks every distinct subscribed city (keyed like the provider cache)
+and polls it at most once per interval, no matter how many streams subscribe
+to it. The interval of a city is the shortest one requested by its current
+subscribers, never below `SUBSCRIBE_MIN_INTERVAL_SECONDS`. A poll result is
+fanned out to every subscriber queue only when the observed values differ
+from the previous poll; new subscribers immediately receive the latest value.
+
+`SubscriptionHub` drives polls from a background thread (thread-pool server);
+`AsyncSubscriptionHub` drives them from an asyncio task (`grpc.aio` server).
+
+On the thread-pool server every open stream holds a worker thread for its
+whole lifetime, so the number of concurrent streams is capped (see
+`stream_limit`) and `subscribe` raises `SubscriptionLimitError` beyond it;
+the remaining workers stay available for unary RPCs.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import queue
+import threading
+import time
+from concurrent import futures
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+import proto.weather_pb2 as weather_pb2
+from core.settings import settings
+from weather_service.providers.cache import normalize_city_key
+
+logger = logging.getLogger("weather_service.subscriptions")
+
+_CLOSED = object()
+# Upper bound on how long a poll loop sleeps, so new subscriptions are picked up promptly
+_MAX_IDLE_SECONDS = 1.0
+
+
+class SubscriptionLimitError(RuntimeError):
+    """Raised when the hub already serves its maximum number of streams."""
+
+
+def stream_limit(asynchronous: bool = False) -> int:
+    """Most concurrent SubscribeWeather streams a server accepts (0 = unlimited).
+
+    `SUBSCRIBE_MAX_STREAMS` of 0 means half of `GRPC_MAX_WORKERS` on the
+    thread-pool server and no limit on `grpc.aio`. The thread-pool server
+    always keeps at least one worker for unary RPCs.
+    """
+    limit = settings.SUBSCRIBE_MAX_STREAMS
+    if asynchronous:
+        return max(0, limit)
+    workers = max(1, settings.GRPC_MAX_WORKERS)
+    if limit <= 0:
+        limit = workers // 2
+    return max(1, min(limit, workers - 1))
+
+
+def clamp_interval(requested_seconds: int) -> float:
+    """Return the effective poll interval for a subscription request."""
+    interval = requested_seconds if requested_seconds > 0 else settings.SUBSCRIBE_DEFAULT_INTERVAL_SECONDS
+    return max(float(interval), settings.SUBSCRIBE_MIN_INTERVAL_SECONDS)
+
+
+def update_signature(resp: weather_pb2.GetWeatherResponse) -> Tuple[Any, ...]:
+    """Values compared between polls; `fetched_at_iso` is ignored on purpose."""
+    return resp.city, resp.temp_c, resp.humidity_pct, resp.conditions, resp.wind_speed_ms
+
+
+class _SubscriptionBase:
+    """Subscriber state shared by the sync/async handles."""
+
+    def __init__(self, cities: Iterable[str], interval: float):
+        self.interval = interval
+        # normalized key -> city spelling requested by this subscriber
+        self.names: Dict[str, str] = {}
+        for city in cities:
+            self.names.setdefault(normalize_city_key(city), city)
+        self.closed = False
+
+    def _wrap(self, key: str, resp: weather_pb2.GetWeatherResponse) -> weather_pb2.WeatherUpdate:
+        return weather_pb2.WeatherUpdate(requested_city=self.names[key], weather=resp)
+
+
+class Subscription(_SubscriptionBase):
+    """Handle for one sync stream; bounded queue dropping the oldest update when full."""
+
+    def __init__(self, cities: Iterable[str], interval: float):
+        super().__init__(cities, interval)
+        self._queue: queue.Queue = queue.Queue(maxsize=settings.SUBSCRIBE_QUEUE_SIZE)
+
+    def offer(self, key: str, resp: weather_pb2.GetWeatherResponse | None) -> None:
+        item = _CLOSED if resp is None else self._wrap(key, resp)
+        while True:
+            try:
+                self._queue.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout: float) -> weather_pb2.WeatherUpdate | None:
+        """Return the next update, or None on timeout / after close."""
+        try:
+            item = self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        if item is _CLOSED:
+            self.closed = True
+            return None
+        return item
+
+    def close(self) -> None:
+        self.closed = True
+        self.offer("", None)
+
+
+class AsyncSubscription(_SubscriptionBase):
+    """Handle for one `grpc.aio` stream (same drop-oldest policy)."""
+
+    def __init__(self, cities: Iterable[str], interval: float):
+        super().__init__(cities, interval)
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=settings.SUBSCRIBE_QUEUE_SIZE)
+
+    def offer(self, key: str, resp: weather_pb2.GetWeatherResponse | None) -> None:
+        item = _CLOSED if resp is None else self._wrap(key, resp)
+        while True:
+            try:
+                self._queue.put_nowait(item)
+                return
+            except asyncio.QueueFull:
+                try:
+                    self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    pass
+
+    async def get(self) -> weather_pb2.WeatherUpdate | None:
+        """Wait for the next update; None once the subscription is closed."""
+        item = await self._queue.get()
+        if item is _CLOSED:
+            self.closed = True
+            return None
+        return item
+
+    def close(self) -> None:
+        self.closed = True
+        self.offer("", None)
+
+
+class _CityState:
+    def __init__(self, city: str):
+        self.city = city
+        self.subscribers: set = set()
+        self.next_due = 0.0
+        self.last_polled: float | None = None
+        self.polling = False
+        self.signature: Tuple[Any, ...] | None = None
+        self.latest: weather_pb2.GetWeatherResponse | None = None
+
+    def interval(self) -> float:
+        return min(sub.interval for sub in self.subscribers)
+
+
+class _HubBase:
+    """City bookkeeping, scheduling and fan-out shared by both hubs."""
+
+    def __init__(self, *, max_streams: int = 0, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._max_streams = max_streams
+        self._lock = threading.Lock()
+        self._cities: Dict[str, _CityState] = {}
+        self._streams: set = set()
+        self.polls = 0
+        self.pushed = 0
+        self.rejected = 0
+
+    def _register(self, sub) -> None:
+        with self._lock:
+            if self._max_streams and len(self._streams) >= self._max_streams:
+                self.rejected += 1
+                raise SubscriptionLimitError(f"At most {self._max_streams} concurrent subscriptions")
+            self._streams.add(sub)
+            for key, city in sub.names.items():
+                state = self._cities.get(key)
+                if state is None:
+                    state = self._cities[key] = _CityState(city)
+                state.subscribers.add(sub)
+                if state.last_polled is not None:
+                    state.next_due = min(state.next_due, state.last_polled + state.interval())
+                if state.latest is not None:
+                    sub.offer(key, state.latest)
+
+    def _unregister(self, sub) -> None:
+        with self._lock:
+            self._streams.discard(sub)
+            for key in sub.names:
+                state = self._cities.get(key)
+                if state is None:
+                    continue
+                state.subscribers.discard(sub)
+                if not state.subscribers:
+                    del self._cities[key]
+
+    def _claim_due(self) -> List[Tuple[str, str]]:
+        """Mark cities whose poll is due as in-flight and return them."""
+        now = self._clock()
+        due = []
+        with self._lock:
+            for key, state in self._cities.items():
+                if not state.polling and state.next_due <= now:
+                    state.polling = True
+                    due.append((key, state.city))
+        return due
+
+    def _complete(self, key: str, resp: weather_pb2.GetWeatherResponse | None) -> None:
+        """Record a finished poll and fan the result out if it changed."""
+        targets = []
+        with self._lock:
+            self.polls += 1
+            state = self._cities.get(key)
+            if state is None:  # last subscriber left while polling
+                return
+            now = self._clock()
+            state.polling = False
+            state.last_polled = now
+            state.next_due = now + state.interval()
+            if resp is not None and update_signature(resp) != state.signature:
+                state.signature = update_signature(resp)
+                state.latest = resp
+                targets = list(state.subscribers)
+                self.pushed += len(targets)
+        for sub in targets:
+            sub.offer(key, resp)
+
+    def _seconds_until_next_poll(self) -> float:
+        now = self._clock()
+        with self._lock:
+            waits = [s.next_due - now for s in self._cities.values() if not s.polling]
+        return max(0.0, min(waits + [_MAX_IDLE_SECONDS]))
+
+    def stats(self) -> Dict[str, int]:
+        """Return hub counters (distinct cities, subscribers, polls, pushed updates, rejected streams)."""
+        with self._lock:
+            return {
+                "cities": len(self._cities),
+                "subscribers": len(self._streams),
+                "polls": self.polls,
+                "pushed": self.pushed,
+                "rejected": self.rejected,
+            }
+
+
+class SubscriptionHub(_HubBase):
+    """Thread-driven hub for the thread-pool server.
+
+    `fetch(city)` must return a `GetWeatherResponse` (or raise); it runs on a
+    small dedicated executor so one slow city does not delay the others.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[str], weather_pb2.GetWeatherResponse],
+        *,
+        max_streams: int = 0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        super().__init__(max_streams=max_streams, clock=clock)
+        self._fetch = fetch
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._executor = futures.ThreadPoolExecutor(
+            max_workers=settings.SUBSCRIBE_POLL_WORKERS, thread_name_prefix="weather-subscribe"
+        )
+
+    def subscribe(self, cities: Iterable[str], min_interval_seconds: int = 0) -> Subscription:
+        sub = Subscription(cities, clamp_interval(min_interval_seconds))
+        self._register(sub)
+        self._ensure_running()
+        self._wake.set()
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        self._unregister(sub)
+
+    def _ensure_running(self) -> None:
+        with self._lock:
+            if self._thread is None and not self._stopped.is_set():
+                self._thread = threading.Thread(target=self._run, name="weather-subscribe-hub", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            for key, city in self._claim_due():
+                try:
+                    self._executor.submit(self._poll, key, city)
+                except RuntimeError:  # executor shut down by stop()
+                    return
+            self._wake.wait(self._seconds_until_next_poll())
+            self._wake.clear()
+
+    def _poll(self, key: str, city: str) -> None:
+        resp = None
+        try:
+            resp = self._fetch(city)
+        except Exception as e:
+            logger.warning("Subscription poll failed for %s: %s", city, e)
+        finally:
+            self._complete(key, resp)
+            self._wake.set()
+
+    def stop(self) -> None:
+        """Stop polling and release every open subscription."""
+        self._stopped.set()
+        self._wake.set()
+        with self._lock:
+            subs = {sub for state in self._cities.values() for sub in state.subscribers}
+        for sub in subs:
+            sub.close()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class AsyncSubscriptionHub(_HubBase):
+    """Asyncio-driven hub for the `grpc.aio` server; `fetch` is a coroutine function."""
+
+    def __init__(self, fetch, *, max_streams: int = 0, clock: Callable[[], float] = time.monotonic):
+        super().__init__(max_streams=max_streams, clock=clock)
+        self._fetch = fetch
+        self._wake: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+        self._polls: set = set()
+        self._limit: asyncio.Semaphore | None = None
+
+    def subscribe(self, cities: Iterable[str], min_interval_seconds: int = 0) -> AsyncSubscription:
+        sub = AsyncSubscription(cities, clamp_interval(min_interval_seconds))
+        self._register(sub)
+        if self._task is None:
+            self._wake = asyncio.Event()
+            self._limit = asyncio.Semaphore(settings.SUBSCRIBE_POLL_WORKERS)
+            self._task = asyncio.ensure_future(self._run())
+        self._wake.set()
+        return sub
+
+    def unsubscribe(self, sub: AsyncSubscription) -> None:
+        self._unregister(sub)
+
+    async def _run(self) -> None:
+        while True:
+            for key, city in self._claim_due():
+                task = asyncio.ensure_future(self._poll(key, city))
+                self._polls.add(task)
+                task.add_done_callback(self._polls.discard)
+            try:
+                await asyncio.wait_for(self._wake.wait(), self._seconds_until_next_poll())
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    async def _poll(self, key: str, city: str) -> None:
+        resp = None
+        try:
+            async with self._limit:
+                resp = await self._fetch(city)
+        except Exception as e:
+            logger.warning("Subscription poll failed for %s: %s", city, e)
+        finally:
+            self._complete(key, resp)
+            self._wake.set()
+
+    async def stop(self) -> None:
+        """Cancel the poll loop and release every open subscription."""
+        with self._lock:
+            subs = {sub for state in self._cities.values() for sub in state.subscribers}
+        for sub in subs:
+            sub.close()
+        tasks = [t for t in [self._task, *self._polls] if t is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None